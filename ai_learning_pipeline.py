@@ -2,18 +2,45 @@
 import os
 import json
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
 import google.generativeai as genai
 from reddit_training_data_processor import RedditTrainingDataProcessor
 from news_youtube_training_processor import NewsYoutubeTrainingProcessor
+from report_exporter import ReportExporter
+from cost_meter import CostMeter
+from checkpoint_store import CheckpointStore, item_hash
+from analysis_cache import AnalysisCache
+from batch_planner import BatchPlanner
+from near_duplicate import NearDuplicateFilter
+from quota_governor import gemini_governor, BATCH
 
 class AILearningPipeline:
     def __init__(self, budget_usd=3.0):
         self.budget_usd = budget_usd
-        self.cost_per_request = 0.005  # Gemini Flash 비용 최적화
-        self.max_requests = int(budget_usd / self.cost_per_request)
+        self.model_name = 'gemini-2.0-flash'
+        # 응답의 실제 토큰 수로 비용을 계산 (요청당 고정 비용 추정 대신)
+        self.cost_meter = CostMeter(self.model_name, budget_usd)
         self.requests_used = 0
+        # 동시에 보낼 배치 수
+        self.max_concurrency = int(os.environ.get('AI_LEARNING_CONCURRENCY', 4))
+        # 요청 1회의 목표 토큰 수 (입력 + 예상 출력)에 맞춰 배치 크기를 정합니다.
+        self.target_tokens_per_request = int(os.environ.get('AI_LEARNING_TARGET_TOKENS', 8000))
+        self.max_batch_size = 50
+        # 항목별 응답 결과 체크포인트 (프롬프트를 바꾸면 버전을 올려 이전 결과를 재사용하지 않도록)
+        self.prompt_version = 'batch_learning_v1'
+        self.checkpoint_store = CheckpointStore('ai_learning')
+        self.resumed_items = 0
+        # 실행 간 항목별 분석 결과 캐시 (이미 학습한 샘플은 다시 보내지 않음)
+        self.analysis_cache = AnalysisCache('learning_item_cache', self.prompt_version)
+        self.cached_items = 0
+        # 소스 간 근접 중복 샘플은 하나로 묶어 한 번만 학습
+        self.near_duplicate_filter = NearDuplicateFilter()
+        self.collapsed_duplicates = 0
+        # 진행률 보고 콜백 (fraction, message) - 작업 실행기에서 설정
+        self.progress_callback = None
         
         # API 설정
         self.api_key = os.environ.get("GEMINI_API_KEY")
@@ -23,7 +50,8 @@ class AILearningPipeline:
         self.learning_data = []
         self.insights = {}
         
-        logging.info(f"💰 AI 학습 예산: ${budget_usd}, 최대 요청: {self.max_requests}회")
+        logging.info(f"💰 AI 학습 예산: ${budget_usd}, 모델: {self.model_name}, "
+                     f"요청당 목표 토큰: {self.target_tokens_per_request}")
     
     def load_existing_training_data(self):
         """기존 학습 데이터 로드"""
@@ -72,7 +100,10 @@ class AILearningPipeline:
                 }
             ])
             
-            self.learning_data = reddit_data + news_data
+            combined = reddit_data + news_data
+            self.learning_data = self.near_duplicate_filter.deduplicate(
+                combined, lambda item: f"{item['raw_data'].get('title', '')} {item['raw_data']['content']}")
+            self.collapsed_duplicates = len(combined) - len(self.learning_data)
             logging.info(f"✅ {len(self.learning_data)}개 학습 데이터 로드 완료")
             
         except Exception as e:
@@ -81,52 +112,80 @@ class AILearningPipeline:
         
         return True
     
-    def optimize_training_prompts(self):
-        """3$ 예산 내에서 최적화된 학습 진행"""
+    def optimize_training_prompts(self, resume=False):
+        """3$ 예산 내에서 최적화된 학습 진행 (resume=True면 체크포인트된 항목은 다시 요청하지 않음)"""
         if not self.api_key:
             logging.error("Gemini API 키가 설정되지 않았습니다.")
             return False
         
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash')
+            model = genai.GenerativeModel(self.model_name)
+            self.successful_batches = 0
+            self.resumed_items = 0
             
-            # 배치 처리로 비용 효율성 극대화
-            batch_size = 20  # 한 번에 20개씩 처리
-            successful_batches = 0
+            # 캐시에 있는 항목은 결과를 바로 붙이고, 처음 보는 항목만 배치로 보냅니다.
+            pending = []
+            for item in self.learning_data:
+                cached = self.analysis_cache.lookup(item['raw_data']['content'])
+                if cached is None:
+                    pending.append(item)
+                else:
+                    item['ai_learning_result'] = cached
+            self.cached_items = len(self.learning_data) - len(pending)
+            logging.info(f"🗂️ 분석 캐시 적중 {self.cached_items}개, 새로 분석할 항목 {len(pending)}개")
             
-            for i in range(0, len(self.learning_data), batch_size):
-                if self.requests_used >= self.max_requests:
-                    logging.warning(f"💰 예산 한도 도달. 총 {successful_batches}개 배치 처리 완료")
-                    break
-                
-                batch = self.learning_data[i:i + batch_size]
-                
-                # 배치 데이터를 하나의 프롬프트로 통합
-                batch_prompt = self._create_batch_learning_prompt(batch)
-                
-                response = model.generate_content(
-                    batch_prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        response_mime_type="application/json",
-                        temperature=0.3
-                    )
-                )
-                
-                # 학습 결과 처리
-                learning_result = json.loads(response.text)
-                self._process_learning_result(learning_result, batch)
-                
-                self.requests_used += 1
-                successful_batches += 1
-                
-                current_cost = self.requests_used * self.cost_per_request
-                logging.info(f"배치 {successful_batches} 완료 (비용: ${current_cost:.3f})")
+            item_hashes = [item_hash(self._batch_item_text(item)) for item in pending]
+            if resume:
+                # 이전 실행에서 응답을 받아 둔 항목은 배치 구성과 무관하게 항목 해시로 복원
+                restored = self._restore_checkpointed(pending, item_hashes)
+                pending = [item for i, item in enumerate(pending) if i not in restored]
+                item_hashes = [h for i, h in enumerate(item_hashes) if i not in restored]
+            self._pending_total = len(pending)
+            self._committed_items = 0
+            
+            # 아직 보내지 않은 항목 (순서 유지). 응답으로 토큰 추정치가 보정될 때마다 남은 항목을 다시 묶습니다.
+            remaining = dict.fromkeys(range(len(pending)))
+            plan, calibration = deque(), None
+            
+            # 최대 max_concurrency개 배치를 동시에 보내고, 결과는 배치 순서대로 반영
+            in_flight = deque()
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                try:
+                    while remaining:
+                        current = (self.cost_meter.tokens_per_char, self.cost_meter.output_tokens_per_item)
+                        if current != calibration:
+                            calibration = current
+                            plan = deque(self._plan_batches(pending, list(remaining)))
+                        indices = plan.popleft()
+                        for i in indices:
+                            del remaining[i]
+                        # 배치 안의 순서가 곧 응답 배열의 순서 → 항목 객체를 그대로 넘겨 결과를 연결
+                        batch = [pending[i] for i in indices]
+                        batch_hashes = [item_hashes[i] for i in indices]
+                        batch_prompt = self._create_batch_learning_prompt(batch)
+                        reservation = self.cost_meter.estimate_request(batch_prompt, len(batch))[2]
+                        if not self.cost_meter.reserve(reservation):
+                            logging.warning(f"💰 예산 한도 도달. {len(in_flight)}개 진행 중 배치만 마무리합니다.")
+                            break
+                        future = executor.submit(self._request_batch_learning, model, batch_prompt,
+                                                 batch_hashes, reservation)
+                        in_flight.append((batch, future))
+                        if len(in_flight) >= self.max_concurrency:
+                            self._commit_batch(*in_flight.popleft())
+                    
+                    while in_flight:
+                        self._commit_batch(*in_flight.popleft())
+                except Exception:
+                    # 아직 시작하지 않은 배치는 취소 (이미 보낸 요청은 끝날 때까지 대기)
+                    for *_, future in in_flight:
+                        future.cancel()
+                    raise
             
             # 최종 인사이트 생성
             self._generate_final_insights()
             
-            total_cost = self.requests_used * self.cost_per_request
-            logging.info(f"🎉 AI 학습 완료! 총 비용: ${total_cost:.3f}")
+            total_cost = self.cost_meter.total_cost()
+            logging.info(f"🎉 AI 학습 완료! 총 비용: ${total_cost:.4f}")
             
             return True
             
@@ -134,13 +193,97 @@ class AILearningPipeline:
             logging.error(f"AI 학습 실패: {str(e)}")
             return False
     
+    def _plan_batches(self, pending, indices):
+        """현재 보정된 추정치(입력 + 예상 출력 토큰)로 요청당 목표 토큰에 맞춰 남은 항목을 묶습니다."""
+        sizes = [self.cost_meter.estimate_tokens(self._batch_item_text(pending[i]))
+                 + int(self.cost_meter.output_tokens_per_item) for i in indices]
+        planner = BatchPlanner(
+            self.target_tokens_per_request,
+            overhead_tokens=self.cost_meter.estimate_tokens(self._create_batch_learning_prompt([])),
+            max_items=self.max_batch_size)
+        plan = planner.plan(sizes)
+        logging.info(f"📦 배치 계획 (글자당 토큰 {self.cost_meter.tokens_per_char:.3f}, "
+                     f"항목당 출력 {self.cost_meter.output_tokens_per_item:.0f}): {planner.describe(plan, sizes)}")
+        return [[indices[position] for position in batch] for batch in plan]
+    
+    def _restore_checkpointed(self, pending, item_hashes):
+        """체크포인트에 결과가 있는 항목에 저장된 분석을 붙이고, 복원한 위치 집합을 반환합니다."""
+        restored = set()
+        for i, (item, hash_) in enumerate(zip(pending, item_hashes)):
+            checkpoint = self.checkpoint_store.get(self.prompt_version, [hash_])
+            if not checkpoint:
+                continue
+            item['ai_learning_result'] = checkpoint['result']['analysis']
+            self._process_learning_result({'batch_insights': checkpoint['result'].get('batch_insights', {})}, [])
+            restored.add(i)
+        if restored:
+            self._cache_item_results([pending[i] for i in sorted(restored)])
+            self.resumed_items = len(restored)
+            logging.info(f"📌 체크포인트에서 항목 {len(restored)}개 복원 (비용 없음)")
+        return restored
+    
+    def _request_batch_learning(self, model, batch_prompt, batch_hashes, reservation):
+        """작업 스레드에서 배치를 전송하고, 응답을 파싱하자마자 항목별로 체크포인트합니다.
+        
+        앞 배치의 반영이 실패해도 이미 비용을 낸 응답은 디스크에 남아 다음 실행에서 재사용됩니다.
+        """
+        try:
+            response = gemini_governor.call(
+                model.generate_content,
+                batch_prompt,
+                lane=BATCH,
+                generation_config=genai.types.GenerationConfig(
+                    response_mime_type="application/json",
+                    temperature=0.3
+                )
+            )
+        finally:
+            self.cost_meter.release(reservation)
+        
+        batch_cost = self.cost_meter.record('batch_learning', response, batch_prompt, len(batch_hashes))
+        learning_result = json.loads(response.text)
+        # 배치 인사이트는 첫 항목에만 붙여 복원 시 한 번만 누적되도록
+        batch_insights = learning_result.get('batch_insights', {})
+        self.checkpoint_store.put_many([
+            (self.prompt_version, [hash_],
+             {'analysis': analysis, 'batch_insights': batch_insights if i == 0 else {}},
+             {'model': self.model_name, 'cost_usd': batch_cost / len(batch_hashes)})
+            for i, (hash_, analysis) in enumerate(zip(batch_hashes, learning_result.get('batch_analysis', [])))
+        ])
+        return learning_result, batch_cost
+    
+    def _commit_batch(self, batch, future):
+        """배치 응답을 기다렸다가 순서대로 학습 결과에 반영합니다."""
+        learning_result, batch_cost = future.result()
+        self.requests_used += 1
+        self._process_learning_result(learning_result, batch)
+        self._cache_item_results(batch)
+        self.successful_batches += 1
+        self._report_progress(len(batch))
+        
+        logging.info(f"배치 {self.successful_batches} 완료 ({len(batch)}개, 배치 비용: ${batch_cost:.4f}, "
+                     f"누적: ${self.cost_meter.total_cost():.4f})")
+    
+    def _report_progress(self, committed):
+        """반영된 항목 수 기준 진행률을 콜백으로 알립니다."""
+        self._committed_items += committed
+        if self.progress_callback:
+            self.progress_callback(0.1 + 0.8 * self._committed_items / max(self._pending_total, 1),
+                                   f"배치 {self.successful_batches}개 반영 ({self._committed_items}/{self._pending_total})")
+    
+    def _cache_item_results(self, batch):
+        """배치에서 결과가 붙은 항목들을 다음 실행을 위해 항목 캐시에 저장합니다."""
+        self.analysis_cache.store_many(
+            [(item['raw_data']['content'], item['ai_learning_result'])
+             for item in batch if 'ai_learning_result' in item],
+            model=self.model_name)
+    
+    def _batch_item_text(self, item):
+        return f"소스: {item['raw_data'].get('source', 'unknown')}\n내용: {item['raw_data']['content']}"
+    
     def _create_batch_learning_prompt(self, batch_data):
         """배치 데이터용 학습 프롬프트 생성"""
-        batch_texts = []
-        for item in batch_data:
-            content = item['raw_data']['content']
-            source = item['raw_data'].get('source', 'unknown')
-            batch_texts.append(f"소스: {source}\n내용: {content}")
+        batch_texts = [self._batch_item_text(item) for item in batch_data]
         
         combined_text = "\n\n---\n\n".join(batch_texts)
         
@@ -201,13 +344,16 @@ class AILearningPipeline:
             'learning_summary': {
                 'total_data_processed': len(self.learning_data),
                 'requests_used': self.requests_used,
-                'total_cost': self.requests_used * self.cost_per_request,
+                'cached_items': self.cached_items,
+                'collapsed_duplicates': self.collapsed_duplicates,
+                'total_cost': self.cost_meter.total_cost(),
+                'cost_breakdown': self.cost_meter.summary(),
                 'efficiency_score': len(self.learning_data) / max(self.requests_used, 1)
             },
-            'pattern_analysis': self.accumulated_insights,
+            'pattern_analysis': getattr(self, 'accumulated_insights', {}),
             'optimization_recommendations': [
                 "배치 처리로 비용 효율성 75% 향상",
-                f"총 {len(self.learning_data)}개 데이터를 ${self.requests_used * self.cost_per_request:.3f}로 처리",
+                f"총 {len(self.learning_data)}개 데이터를 ${self.cost_meter.total_cost():.3f}로 처리",
                 "커뮤니티별 특화 패턴 식별 완료",
                 "바이럴 요소 예측 모델 개선"
             ],
@@ -218,35 +364,36 @@ class AILearningPipeline:
             ]
         }
     
-    def export_learning_results(self, filename=None):
-        """학습 결과를 파일로 저장"""
+    def export_learning_results(self, filename=None, compression=None, ndjson=False):
+        """학습 결과를 파일로 저장 (learning_data는 행 단위로 스트리밍)"""
+        exporter = ReportExporter(compression, ndjson)
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ai_learning_results_{timestamp}.json"
+            filename = f"ai_learning_results_{timestamp}{exporter.default_extension()}"
         
         export_data = {
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
-                'budget_used': self.requests_used * self.cost_per_request,
+                'budget_used': self.cost_meter.total_cost(),
                 'total_budget': self.budget_usd,
+                'cost_breakdown': self.cost_meter.summary(),
                 'efficiency_rate': (len(self.learning_data) / max(self.requests_used, 1))
             },
             'learning_data': self.learning_data,
             'insights': self.insights,
             'performance_metrics': {
-                'data_per_dollar': len(self.learning_data) / max(self.requests_used * self.cost_per_request, 0.001),
-                'cost_efficiency': 'excellent' if self.requests_used * self.cost_per_request < 2.0 else 'good'
+                'data_per_dollar': len(self.learning_data) / max(self.cost_meter.total_cost(), 0.001),
+                'cost_efficiency': 'excellent' if self.cost_meter.total_cost() < 2.0 else 'good'
             }
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2, default=str)
+        exporter.export(export_data, filename)
         
         logging.info(f"📁 학습 결과 저장: {filename}")
         return filename
     
-    def run_full_pipeline(self):
-        """전체 학습 파이프라인 실행"""
+    def run_full_pipeline(self, resume=False):
+        """전체 학습 파이프라인 실행 (resume=True면 이전 실행의 완료 배치를 재사용)"""
         logging.info("🚀 AI 학습 파이프라인 시작")
         
         # 1단계: 데이터 로드
@@ -254,23 +401,28 @@ class AILearningPipeline:
             return False
         
         # 2단계: AI 학습 실행
-        if not self.optimize_training_prompts():
+        if not self.optimize_training_prompts(resume=resume):
             return False
         
         # 3단계: 결과 저장
         result_file = self.export_learning_results()
         
         # 결과 요약
-        total_cost = self.requests_used * self.cost_per_request
+        total_cost = self.cost_meter.total_cost()
         efficiency = len(self.learning_data) / max(self.requests_used, 1)
         
         summary = {
             'status': 'success',
             'data_processed': len(self.learning_data),
             'requests_used': self.requests_used,
+            'resumed_items': self.resumed_items,
+            'cached_items': self.cached_items,
+            'collapsed_duplicates': self.collapsed_duplicates,
             'total_cost': total_cost,
             'remaining_budget': self.budget_usd - total_cost,
             'efficiency_score': efficiency,
+            'cost_breakdown': self.cost_meter.summary(),
+            'quota': gemini_governor.summary(),
             'result_file': result_file
         }
         
@@ -278,8 +430,9 @@ class AILearningPipeline:
         return summary
 
 if __name__ == "__main__":
+    import sys
     pipeline = AILearningPipeline(budget_usd=3.0)
-    results = pipeline.run_full_pipeline()
+    results = pipeline.run_full_pipeline(resume='--resume' in sys.argv)
     
     if results:
         print("\n" + "="*60)
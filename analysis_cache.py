@@ -0,0 +1,44 @@
+import re
+import unicodedata
+
+from checkpoint_store import CheckpointStore, item_hash
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_content(text):
+    """표기 차이(전각/반각, 공백, 대소문자)만 다른 같은 글이 같은 키가 되도록 정규화합니다."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip().lower()
+
+
+class AnalysisCache:
+    """항목별 AI 분석 결과를 (정규화 내용 해시, 프롬프트 버전)으로 실행 간에 재사용하는 캐시"""
+
+    def __init__(self, name, prompt_version):
+        self.prompt_version = prompt_version
+        self.store = CheckpointStore(name)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        return item_hash(normalize_content(text))
+
+    def lookup(self, text):
+        entry = self.store.get(self.prompt_version, [self.key(text)])
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['result']
+
+    def store_many(self, pairs, **metadata):
+        """[(원문, 분석 결과)]를 한 번에 저장합니다. 이미 있는 키는 건너뜁니다."""
+        records = []
+        for text, result in pairs:
+            hashes = [self.key(text)]
+            if self.store.get(self.prompt_version, hashes) is None:
+                records.append((self.prompt_version, hashes, result, metadata))
+        return len(self.store.put_many(records))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.store.entries)}
@@ -3,12 +3,15 @@ import json
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 from database_setup import TauntResearchDB
-import matplotlib.pyplot as plt
+from report_engine import ReportQueryEngine
+from incremental_report import IncrementalReportBuilder
+from report_exporter import ReportExporter
 import pandas as pd
 
 class UserAnalytics:
     def __init__(self):
         self.db = TauntResearchDB()
+        self.report_engine = ReportQueryEngine(self.db)
     
     def analyze_user_patterns(self, days=30):
         """사용자 사용 패턴을 분석합니다."""
@@ -196,15 +199,16 @@ class UserAnalytics:
             'keyword_trends': keyword_trends
         }
     
-    def generate_comprehensive_report(self):
+    def generate_comprehensive_report(self, days=30):
         """종합 분석 보고서 생성"""
         print("📋 종합 분석 보고서 생성 중...")
         
-        # 모든 분석 데이터 수집
-        usage_patterns = self.analyze_user_patterns()
-        technique_analysis = self.analyze_advanced_techniques()
-        safety_analysis = self.analyze_safety_patterns()
-        preference_analysis = self.analyze_user_preferences()
+        # 모든 분석 데이터를 하나의 스냅샷에서 병렬로 수집
+        sections = self.report_engine.run(days=days)
+        usage_patterns = sections['usage_patterns']
+        technique_analysis = sections['technique_analysis']
+        safety_analysis = sections['safety_analysis']
+        preference_analysis = sections['preference_analysis']
         
         # 보고서 구성
         report = {
@@ -218,7 +222,8 @@ class UserAnalytics:
             'usage_patterns': usage_patterns,
             'technique_analysis': technique_analysis,
             'safety_analysis': safety_analysis,
-            'preference_analysis': preference_analysis
+            'preference_analysis': preference_analysis,
+            'section_timings_ms': sections['timings_ms']
         }
         
         # 인사이트 생성
@@ -227,6 +232,11 @@ class UserAnalytics:
         
         return report
     
+    def generate_incremental_report(self, days=30):
+        """워터마크 이후 새 데이터만 반영하는 증분 종합 보고서 생성"""
+        print("📋 증분 종합 분석 보고서 갱신 중...")
+        return IncrementalReportBuilder(self, days=days).refresh()
+    
     def generate_insights(self, report_data):
         """데이터 기반 인사이트 생성"""
         insights = []
@@ -260,14 +270,14 @@ class UserAnalytics:
         
         return insights
     
-    def export_report_to_file(self, report, filename=None):
-        """보고서를 파일로 저장"""
+    def export_report_to_file(self, report, filename=None, compression=None, ndjson=False):
+        """보고서를 파일로 저장 (섹션 단위 스트리밍, compression='gzip'|'zstd', ndjson=True면 행 단위)"""
+        exporter = ReportExporter(compression, ndjson)
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"user_analytics_report_{timestamp}.json"
+            filename = f"user_analytics_report_{timestamp}{exporter.default_extension()}"
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        exporter.export(report, filename)
         
         print(f"📁 분석 보고서가 {filename}에 저장되었습니다.")
         return filename
@@ -287,6 +297,7 @@ if __name__ == "__main__":
     print(f"  • 총 요청 수: {summary['total_requests']}회")
     print(f"  • 가장 인기있는 톤: {summary['most_popular_tone']}")
     print(f"  • 고급 기법 사용 종류: {summary['advanced_technique_usage']}가지")
+    print(f"  • 쿼리 소요 시간: {report['section_timings_ms']['total']:.0f}ms")
     
     # 톤별 사용 통계
     if report['usage_patterns']['tone_stats']:
@@ -0,0 +1,51 @@
+import logging
+
+
+class BatchPlanner:
+    """항목별 예상 토큰 수로 요청당 토큰 예산에 맞춰 배치를 묶는 플래너 (First-Fit Decreasing)"""
+
+    def __init__(self, target_tokens, overhead_tokens=0, max_items=None):
+        self.capacity = target_tokens - overhead_tokens
+        self.max_items = max_items
+        if self.capacity <= 0:
+            raise ValueError("프롬프트 고정 토큰이 요청당 목표 토큰보다 큽니다.")
+
+    def plan(self, sizes):
+        """sizes[i] = i번째 항목의 예상 토큰 수. 원래 항목 인덱스의 리스트들을 반환합니다.
+
+        큰 항목부터 들어갈 수 있는 첫 배치에 넣고, 어디에도 안 들어가면 새 배치를 엽니다.
+        예산보다 큰 항목은 단독 배치로 보냅니다. 결과 배치 안의 인덱스는 오름차순이고,
+        배치들은 가장 앞 항목 기준으로 정렬되어 같은 입력에는 항상 같은 계획이 나옵니다.
+        """
+        batches = []     # [사용 토큰, [인덱스...]]
+        oversize = 0
+        for index in sorted(range(len(sizes)), key=lambda i: (-sizes[i], i)):
+            size = sizes[index]
+            if size > self.capacity:
+                oversize += 1
+                batches.append([size, [index]])
+                continue
+            for batch in batches:
+                if batch[0] + size <= self.capacity and (self.max_items is None or len(batch[1]) < self.max_items):
+                    batch[0] += size
+                    batch[1].append(index)
+                    break
+            else:
+                batches.append([size, [index]])
+
+        if oversize:
+            logging.warning(f"⚠️ 요청당 토큰 예산({self.capacity})보다 큰 항목 {oversize}개는 단독 배치로 처리합니다.")
+        plan = [sorted(indices) for _, indices in batches]
+        plan.sort(key=lambda indices: indices[0])
+        return plan
+
+    def describe(self, plan, sizes):
+        """계획 요약 (배치 수, 평균 채움률, 최대 배치 토큰)"""
+        loads = [sum(sizes[i] for i in indices) for indices in plan]
+        return {
+            'items': len(sizes),
+            'batches': len(plan),
+            'capacity_tokens': self.capacity,
+            'avg_fill_ratio': round(sum(loads) / (len(plan) * self.capacity), 3) if plan else 0,
+            'max_batch_tokens': max(loads) if loads else 0
+        }
@@ -0,0 +1,146 @@
+import sys
+import time
+import random
+import logging
+from datetime import datetime
+
+from reddit_training_data_processor import RedditTrainingDataProcessor
+
+BENCHMARK_POSTS = 100000
+
+_TITLES = ['서울 월세 실화?', '요즘 MZ 직장 문화', '이번 드라마 결말 미쳤다', '정부 정책 또 바뀜', '집값 언제 내려가냐']
+_PHRASES = ['진짜 스트레스 받아요', '다들 어떻게 사세요?', '세대 차이 너무 심함 ㅋㅋㅋㅋ', '생활비가 감당이 안 됩니다.',
+            '완전 레전드 ㅋㅋ', '숨이 막히다...', '공감 100% 저도 그래요', '부동산 격차가 수준이 다름', 'ㅠㅠ 힘들다 정말',
+            'Seoul rent is crazy', '아이돌 콘서트 티켓 헐', '상대적 박탈감 느낍니다']
+
+
+def build_corpus(count, seed=7):
+    """재현 가능한 합성 Reddit 게시물 목록"""
+    rng = random.Random(seed)
+    return [{
+        'id': f"t3_{number:06d}",
+        'title': f"{rng.choice(_TITLES)} #{number}",
+        'content': ' '.join(rng.choice(_PHRASES) for _ in range(rng.randint(2, 8))),
+        'score': rng.randint(0, 2000),
+        'num_comments': rng.randint(0, 400)
+    } for number in range(count)]
+
+
+# 기준선: 병합 전 RedditTrainingDataProcessor.process_reddit_data (9ac6e3f) 그대로.
+# 행마다 raw_data/processed_at + 4개 특징만 만들고, 트렌드는 본문(content)만 보고 분류했습니다.
+# 현재 처리기는 여기에 viral_analysis/tone_recommendations/linguistic_features/duplicate_count를 더 만들고
+# trend_category를 제목+본문으로 분류하므로, 결과 비교는 공통 필드만 하고 트렌드 차이는 따로 셉니다.
+_BASELINE_TREND_CATEGORIES = {
+    'cost_of_living': ['월세', '물가', '생활비', '집값', '경제'],
+    'entertainment': ['영화', '드라마', '아이돌', '연예인'],
+    'social_dynamics': ['세대', '직장', '문화', 'MZ'],
+    'politics': ['정부', '정책', '법', '민주주의'],
+    'inequality': ['부동산', '상대적 박탈감', '서민']
+}
+_BASELINE_TRIGGER_PATTERNS = {
+    'frustration': ['진짜', '정말', '숨이 막히다', '스트레스'],
+    'empathy': ['다들', '여러분', '우리'],
+    'superiority': ['차이', '수준', '격차'],
+    'validation': ['맞다', '공감', '동감']
+}
+SHARED_FIELDS = ('emotion_triggers', 'viral_potential', 'recommended_tones')
+
+
+def _baseline_categorize_trend(content):
+    content_lower = content.lower()
+    for category, keywords in _BASELINE_TREND_CATEGORIES.items():
+        if any(keyword in content_lower for keyword in keywords):
+            return category
+    return 'general'
+
+
+def _baseline_extract_emotion_triggers(item):
+    content = item.get('content', '').lower()
+    return [trigger_type for trigger_type, patterns in _BASELINE_TRIGGER_PATTERNS.items()
+            if any(pattern in content for pattern in patterns)]
+
+
+def _baseline_calculate_viral_potential(item):
+    viral_score = (item.get('score', 0) * 0.7 + item.get('num_comments', 0) * 0.3) / 1000
+    return min(viral_score, 10.0)
+
+
+def _baseline_suggest_tones(item):
+    content = item.get('content', '').lower()
+    suggested_tones = []
+    if '스트레스' in content or '힘들다' in content:
+        suggested_tones.append('공감 톤')
+    if '차이' in content or '세대' in content:
+        suggested_tones.append('풍자적')
+    if '진짜' in content or '정말' in content:
+        suggested_tones.append('MZ 반말 톤')
+    return suggested_tones[:3]
+
+
+def baseline_process_reddit_data(raw_data):
+    """병합 전 process_reddit_data: 항목마다 4개 특징을 따로 계산"""
+    processed_data = []
+    for item in raw_data:
+        processed_data.append({
+            'raw_data': item,
+            'processed_at': datetime.now().isoformat(),
+            'trend_category': _baseline_categorize_trend(item.get('content', '')),
+            'emotion_triggers': _baseline_extract_emotion_triggers(item),
+            'viral_potential': _baseline_calculate_viral_potential(item),
+            'recommended_tones': _baseline_suggest_tones(item)
+        })
+    return processed_data
+
+
+def run_benchmark(count=BENCHMARK_POSTS):
+    corpus = build_corpus(count)
+    processor = RedditTrainingDataProcessor()
+
+    started = time.perf_counter()
+    baseline = baseline_process_reddit_data(corpus)
+    baseline_seconds = time.perf_counter() - started
+
+    # 현재 경로 전체 (근접 중복 묶기 + 게시물 처리)와, 그중 게시물 처리 단계만 따로 잽니다.
+    started = time.perf_counter()
+    current = processor.process_reddit_data(corpus)
+    current_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for item in corpus:
+        processor.process_post(item)
+    process_post_seconds = time.perf_counter() - started
+
+    # 근접 중복으로 묶인 게시물은 대표 행만 남으므로 게시물 id로 맞춰 비교합니다.
+    baseline_by_id = {row['raw_data']['id']: row for row in baseline}
+    pairs = [(baseline_by_id[row['raw_data']['id']], row) for row in current]
+    mismatches = sum(1 for old, new in pairs if any(old[field] != new[field] for field in SHARED_FIELDS))
+    trend_changes = sum(1 for old, new in pairs if old['trend_category'] != new['trend_category'])
+    return {
+        'posts': count,
+        'baseline_rows': len(baseline),
+        'current_rows': len(current),
+        'baseline_seconds': round(baseline_seconds, 3),
+        'current_seconds': round(current_seconds, 3),
+        'process_post_seconds': round(process_post_seconds, 3),
+        'dedupe_seconds': round(max(current_seconds - process_post_seconds, 0.0), 3),
+        'baseline_posts_per_second': round(count / baseline_seconds),
+        'current_posts_per_second': round(count / current_seconds),
+        'added_fields': sorted(set(current[0]) - set(baseline[0])) if current and baseline else [],
+        'mismatches': mismatches,
+        'trend_category_changes': trend_changes
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else BENCHMARK_POSTS
+    result = run_benchmark(count)
+    print(f"📊 게시물 {result['posts']:,}개")
+    print(f"  • 기준선 process_reddit_data: {result['baseline_seconds']}초 "
+          f"({result['baseline_posts_per_second']:,}개/초, {result['baseline_rows']:,}행)")
+    print(f"  • 현재 process_reddit_data: {result['current_seconds']}초 "
+          f"({result['current_posts_per_second']:,}개/초, {result['current_rows']:,}행)")
+    print(f"    - 게시물 처리 {result['process_post_seconds']}초 + 근접 중복 묶기 약 {result['dedupe_seconds']}초")
+    print(f"    - 추가 필드: {', '.join(result['added_fields'])}")
+    print(f"  • 공통 필드 불일치 {result['mismatches']}건, "
+          f"트렌드 분류 변경(본문 → 제목+본문) {result['trend_category_changes']}건")
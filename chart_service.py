@@ -0,0 +1,206 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+CHART_CACHE_DIR = os.environ.get('CHART_CACHE_DIR', 'chart_cache')
+CHART_WORKERS = int(os.environ.get('CHART_WORKERS', 1))
+CHART_FORMATS = ('svg', 'png')
+# 그리는 방식이 바뀌면 올려서 기존 캐시를 무효화합니다.
+CHART_VERSION = 2
+# 한글 글리프가 있는 글꼴을 앞에 두고, 설치된 것만 골라 순서대로 대체 글꼴로 씁니다.
+CHART_FONT_FAMILIES = [family.strip() for family in os.environ.get(
+    'CHART_FONT_FAMILIES',
+    'NanumGothic,Noto Sans CJK KR,Noto Sans KR,Malgun Gothic,AppleGothic,DejaVu Sans').split(',')
+    if family.strip()]
+
+
+def _tone_usage_over_time(report):
+    rows = report.get('usage_patterns', {}).get('tone_daily_stats', [])
+    series = {}
+    for date, tone, count in rows:
+        series.setdefault(tone, {})[str(date)[:10]] = count
+    dates = sorted({date for points in series.values() for date in points})
+    return {
+        'title': '톤별 사용 추이',
+        'dates': dates,
+        'series': {tone: [points.get(date, 0) for date in dates] for tone, points in sorted(series.items())}
+    }
+
+
+def _safety_ratio_by_tone(report):
+    counts = {}
+    for is_safe, count, tone, _avg_length in report.get('safety_analysis', {}).get('safety_stats', []):
+        safe, total = counts.get(tone or '미지정', (0, 0))
+        counts[tone or '미지정'] = (safe + (count if is_safe else 0), total + count)
+    return {
+        'title': '톤별 안전 비율',
+        'tones': sorted(counts),
+        'ratios': [round(counts[tone][0] / counts[tone][1], 4) if counts[tone][1] else 0
+                   for tone in sorted(counts)]
+    }
+
+
+def _daily_requests(report):
+    rows = sorted(report.get('usage_patterns', {}).get('daily_stats', []), key=lambda row: str(row[3]))
+    return {
+        'title': '일별 요청 수',
+        'dates': [str(row[3])[:10] for row in rows],
+        'requests': [row[0] for row in rows],
+        'unique_users': [row[1] for row in rows]
+    }
+
+
+# 차트 이름 → 보고서에서 차트 입력(집계값)만 뽑아내는 함수
+CHART_DATA_EXTRACTORS = {
+    'tone_usage_over_time': _tone_usage_over_time,
+    'safety_ratio_by_tone': _safety_ratio_by_tone,
+    'daily_requests': _daily_requests
+}
+
+
+def _init_render_worker():
+    """렌더링 프로세스에서만 비대화형 백엔드로 matplotlib을 불러오고 한글 글꼴을 설정합니다."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    families = [family for family in CHART_FONT_FAMILIES if family in installed]
+    if not any(family != 'DejaVu Sans' for family in families):
+        logging.warning("⚠️ 한글 글꼴(NanumGothic/Noto Sans CJK)을 찾지 못해 차트의 한글이 깨질 수 있습니다.")
+    matplotlib.rcParams['font.family'] = families or ['sans-serif']
+    # 한글 글꼴에는 유니코드 마이너스(U+2212)가 없는 경우가 많아 ASCII '-'로 그립니다.
+    matplotlib.rcParams['axes.unicode_minus'] = False
+
+
+def _render_chart(chart_name, data, fmt, path):
+    """별도 프로세스에서 실행되는 렌더러. 임시 파일에 그린 뒤 rename 합니다."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    try:
+        if chart_name == 'tone_usage_over_time':
+            for tone, values in data['series'].items():
+                ax.plot(data['dates'], values, marker='o', label=tone)
+            ax.set_ylabel('사용 횟수')
+            if data['series']:
+                ax.legend(fontsize='small', ncol=2)
+        elif chart_name == 'safety_ratio_by_tone':
+            ax.bar(data['tones'], data['ratios'])
+            ax.set_ylim(0, 1)
+            ax.set_ylabel('안전 비율')
+        elif chart_name == 'daily_requests':
+            ax.plot(data['dates'], data['requests'], marker='o', label='요청 수')
+            ax.plot(data['dates'], data['unique_users'], marker='s', label='고유 사용자')
+            ax.legend()
+        ax.set_title(data['title'])
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        fig.savefig(temp_path, format=fmt)
+        os.replace(temp_path, path)
+    finally:
+        plt.close(fig)
+    return path
+
+
+class ChartService:
+    """보고서 차트를 별도 프로세스에서 렌더링하고 집계 해시로 캐시하는 서비스"""
+
+    def __init__(self, cache_dir=CHART_CACHE_DIR, max_workers=CHART_WORKERS):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.pending = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # 웹 워커의 스레드/소켓을 물려받지 않도록 spawn으로 시작합니다.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_render_worker)
+            return self._executor
+
+    @staticmethod
+    def aggregate_hash(chart_name, data, fmt):
+        canonical = json.dumps([CHART_VERSION, chart_name, fmt, data], sort_keys=True,
+                               ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:24]
+
+    def chart_path(self, filename):
+        return os.path.join(self.cache_dir, os.path.basename(filename))
+
+    def request_charts(self, report, fmt='svg'):
+        """보고서의 차트들을 캐시에서 찾고, 없으면 렌더링을 예약만 하고 바로 반환합니다."""
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"지원하지 않는 차트 형식입니다: {fmt}")
+        charts = {}
+        for chart_name, extract in CHART_DATA_EXTRACTORS.items():
+            data = extract(report)
+            filename = f"{chart_name}-{self.aggregate_hash(chart_name, data, fmt)}.{fmt}"
+            charts[chart_name] = {'filename': filename, 'status': self._schedule(chart_name, data, fmt, filename)}
+        return charts
+
+    def _schedule(self, chart_name, data, fmt, filename):
+        path = self.chart_path(filename)
+        if os.path.exists(path):
+            return 'ready'
+        with self._lock:
+            future = self.pending.get(filename)
+            if future is not None and not future.done():
+                return 'pending'
+        future = self._get_executor().submit(_render_chart, chart_name, data, fmt, path)
+        future.add_done_callback(lambda done: self._finished(filename, done))
+        with self._lock:
+            self.pending[filename] = future
+        return 'pending'
+
+    def _finished(self, filename, future):
+        with self._lock:
+            self.pending.pop(filename, None)
+        if future.exception() is not None:
+            logging.error(f"차트 렌더링 실패 ({filename}): {future.exception()}")
+
+    def chart_status(self, filename):
+        """캐시 파일 상태: 'ready' / 'pending' / 'missing'"""
+        if os.path.exists(self.chart_path(filename)):
+            return 'ready'
+        with self._lock:
+            return 'pending' if filename in self.pending else 'missing'
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    sample_report = {
+        'usage_patterns': {
+            'daily_stats': [(12, 5, 410.0, '2025-07-01'), (18, 7, 380.5, '2025-07-02')],
+            'tone_daily_stats': [('2025-07-01', '풍자적', 7), ('2025-07-01', '유머러스하게', 5),
+                                 ('2025-07-02', '풍자적', 10), ('2025-07-02', '유머러스하게', 8)]
+        },
+        'safety_analysis': {
+            'safety_stats': [(True, 20, '풍자적', 400.0), (False, 3, '풍자적', 520.0),
+                             (True, 12, '유머러스하게', 350.0)]
+        }
+    }
+    service = ChartService(cache_dir=tempfile.mkdtemp(prefix='charts_'))
+    started = time.perf_counter()
+    charts = service.request_charts(sample_report)
+    print(f"⚡ 예약 반환: {(time.perf_counter() - started) * 1000:.1f}ms → {charts}")
+    service.shutdown(wait=True)
+    print(f"✅ 렌더링 후: {service.request_charts(sample_report)}")
@@ -0,0 +1,78 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', 'checkpoints')
+
+
+def item_hash(text):
+    """배치에 들어가는 항목 하나의 내용 해시"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def batch_key(prompt_version, item_hashes):
+    """프롬프트 버전 + 배치 항목 내용으로 만든 체크포인트 키"""
+    return hashlib.sha256('\n'.join([prompt_version, *item_hashes]).encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    """배치 단위 AI 응답 결과를 JSONL에 덧붙여 저장하는 체크포인트 저장소"""
+
+    def __init__(self, name, checkpoint_dir=CHECKPOINT_DIR):
+        self.path = os.path.join(checkpoint_dir, f"{name}.jsonl")
+        self.entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        skipped = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 기록 도중 중단돼 잘린 마지막 줄 등
+                    skipped += 1
+                    continue
+                self._index(entry)
+        logging.info(f"📌 체크포인트 {len(self.entries)}개 로드 ({self.path})"
+                     + (f", 손상된 줄 {skipped}개 무시" if skipped else ""))
+
+    def _index(self, entry):
+        self.entries[entry['key']] = entry
+
+    def get(self, prompt_version, item_hashes):
+        return self.entries.get(batch_key(prompt_version, item_hashes))
+
+    def put(self, prompt_version, item_hashes, result, **metadata):
+        """배치 결과를 한 줄로 덧붙이고 디스크에 바로 반영합니다."""
+        return self.put_many([(prompt_version, item_hashes, result, metadata)])[0]
+
+    def put_many(self, records):
+        """[(프롬프트 버전, 항목 해시들, 결과, 메타데이터)] 여러 건을 한 번의 fsync로 덧붙입니다."""
+        created_at = datetime.now().isoformat()
+        entries = [{
+            'key': batch_key(prompt_version, item_hashes),
+            'prompt_version': prompt_version,
+            'item_hashes': list(item_hashes),
+            'result': result,
+            'created_at': created_at,
+            **metadata
+        } for prompt_version, item_hashes, result, metadata in records]
+        if not entries:
+            return entries
+        lines = ''.join(json.dumps(entry, ensure_ascii=False, default=str) + '\n' for entry in entries)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            for entry in entries:
+                self._index(entry)
+        return entries
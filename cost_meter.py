@@ -0,0 +1,118 @@
+import math
+import threading
+import uuid
+from datetime import datetime
+
+# 모델별 100만 토큰당 가격 (USD). 가격이 바뀌면 여기만 고칩니다.
+MODEL_PRICES_PER_MILLION_TOKENS = {
+    'gemini-2.0-flash': {'input': 0.10, 'output': 0.40},
+    'gemini-1.5-flash': {'input': 0.075, 'output': 0.30},
+    'gemini-1.5-pro': {'input': 1.25, 'output': 5.00}
+}
+
+# 응답에 토큰 수가 없을 때 쓰는 초기 추정치 (한국어 위주 텍스트 기준, 응답으로 보정됨)
+DEFAULT_TOKENS_PER_CHAR = 0.7
+DEFAULT_OUTPUT_TOKENS_PER_ITEM = 150
+CALIBRATION_WEIGHT = 0.2    # 지수이동평균 가중치
+
+
+class CostMeter:
+    """응답의 실제 입력/출력 토큰 수로 비용을 계산하고 단계별로 누적하는 계량기"""
+
+    def __init__(self, model_name, budget_usd, run_id=None):
+        if model_name not in MODEL_PRICES_PER_MILLION_TOKENS:
+            raise ValueError(f"가격표에 없는 모델입니다: {model_name}")
+        self.model_name = model_name
+        self.prices = MODEL_PRICES_PER_MILLION_TOKENS[model_name]
+        self.budget_usd = budget_usd
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat()
+        self.stages = {}
+        self.reserved_usd = 0.0
+        self.tokens_per_char = DEFAULT_TOKENS_PER_CHAR
+        self.output_tokens_per_item = DEFAULT_OUTPUT_TOKENS_PER_ITEM
+        self._lock = threading.Lock()
+
+    def price(self, input_tokens, output_tokens):
+        return (input_tokens * self.prices['input'] + output_tokens * self.prices['output']) / 1_000_000
+
+    def estimate_tokens(self, text):
+        """보정된 글자당 토큰 비율로 텍스트의 입력 토큰 수를 추정합니다."""
+        return int(math.ceil(len(text) * self.tokens_per_char))
+
+    def estimate_request(self, prompt, item_count):
+        """(예상 입력 토큰, 예상 출력 토큰, 예상 비용)"""
+        input_tokens = self.estimate_tokens(prompt)
+        output_tokens = int(math.ceil(item_count * self.output_tokens_per_item))
+        return input_tokens, output_tokens, self.price(input_tokens, output_tokens)
+
+    def record(self, stage, response, prompt=None, item_count=None):
+        """응답의 usage_metadata로 실제 비용을 기록하고 추정 비율을 보정합니다. 비용을 반환합니다."""
+        usage = getattr(response, 'usage_metadata', None)
+        input_tokens = getattr(usage, 'prompt_token_count', None)
+        output_tokens = getattr(usage, 'candidates_token_count', None)
+        estimated = input_tokens is None or output_tokens is None
+        if input_tokens is None:
+            input_tokens = self.estimate_tokens(prompt or '')
+        if output_tokens is None:
+            output_tokens = self.estimate_tokens(getattr(response, 'text', '') or '')
+        cost = self.price(input_tokens, output_tokens)
+
+        with self._lock:
+            totals = self.stages.setdefault(stage, {
+                'requests': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0, 'estimated_requests': 0
+            })
+            totals['requests'] += 1
+            totals['input_tokens'] += input_tokens
+            totals['output_tokens'] += output_tokens
+            totals['cost_usd'] += cost
+            totals['estimated_requests'] += int(estimated)
+            if not estimated:
+                if prompt:
+                    self.tokens_per_char += CALIBRATION_WEIGHT * (input_tokens / len(prompt) - self.tokens_per_char)
+                if item_count:
+                    self.output_tokens_per_item += CALIBRATION_WEIGHT * (
+                        output_tokens / item_count - self.output_tokens_per_item)
+        return cost
+
+    def total_cost(self):
+        with self._lock:
+            return sum(totals['cost_usd'] for totals in self.stages.values())
+
+    def remaining_budget(self):
+        return self.budget_usd - self.total_cost()
+
+    def reserve(self, amount):
+        """예상 비용만큼 예산을 선점합니다. 실제 지출 + 선점액이 예산을 넘으면 False."""
+        with self._lock:
+            spent = sum(totals['cost_usd'] for totals in self.stages.values())
+            if spent + self.reserved_usd + amount > self.budget_usd:
+                return False
+            self.reserved_usd += amount
+            return True
+
+    def release(self, amount):
+        with self._lock:
+            self.reserved_usd = max(0.0, self.reserved_usd - amount)
+
+    def summary(self):
+        """실행 단위 / 단계별 토큰·비용 합계"""
+        with self._lock:
+            stages = {stage: {**totals, 'cost_usd': round(totals['cost_usd'], 6)}
+                      for stage, totals in self.stages.items()}
+            total = sum(totals['cost_usd'] for totals in self.stages.values())
+        return {
+            'run_id': self.run_id,
+            'model': self.model_name,
+            'started_at': self.started_at,
+            'budget_usd': self.budget_usd,
+            'total_cost_usd': round(total, 6),
+            'remaining_budget_usd': round(self.budget_usd - total, 6),
+            'total_input_tokens': sum(totals['input_tokens'] for totals in stages.values()),
+            'total_output_tokens': sum(totals['output_tokens'] for totals in stages.values()),
+            'stages': stages,
+            'calibration': {
+                'tokens_per_char': round(self.tokens_per_char, 4),
+                'output_tokens_per_item': round(self.output_tokens_per_item, 1)
+            }
+        }
@@ -0,0 +1,258 @@
+import os
+import json
+import zlib
+import fcntl
+import struct
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+CRAWL_ARCHIVE_DIR = os.environ.get('CRAWL_ARCHIVE_DIR', 'crawl_archive')
+SEGMENT_MAX_BYTES = int(os.environ.get('CRAWL_SEGMENT_MAX_BYTES', 64 * 1024 * 1024))
+BLOCK_RECORDS = int(os.environ.get('CRAWL_BLOCK_RECORDS', 256))
+
+# 블록 머리: 매직, 압축 길이, 압축 전 crc32. 본문은 레코드 JSON 줄들을 zlib으로 압축한 것입니다.
+_BLOCK_MAGIC = b'CRB1'
+_BLOCK_HEADER = struct.Struct('<4sII')
+
+
+class CrawlArchive:
+    """원본 수집 결과를 압축 블록 단위로 세그먼트 파일 끝에 덧붙이는 보관소
+
+    세그먼트가 segment_max_bytes를 넘으면 다음 파일로 넘어갑니다. (source, item_id) → (세그먼트, 블록 위치)
+    색인은 SQLite에 두고, replay()는 세그먼트를 처음부터 순서대로 읽되 색인이 가리키는 최신 레코드만 흘려보냅니다.
+    열 때 마지막 세그먼트 끝의 잘린 블록은 잘라내어 새 블록이 쓰레기 뒤에 붙지 않게 합니다.
+    같은 디렉터리를 여는 여러 프로세스는 보관소 잠금 파일(.lock)의 flock으로 꼬리 복구와 블록 쓰기를 직렬화합니다.
+    """
+
+    def __init__(self, archive_dir=CRAWL_ARCHIVE_DIR, segment_max_bytes=SEGMENT_MAX_BYTES,
+                 block_records=BLOCK_RECORDS):
+        self.archive_dir = archive_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.block_records = block_records
+        self.pending = []
+        self.stats = {'records_written': 0, 'blocks_written': 0, 'bytes_raw': 0, 'bytes_compressed': 0}
+        self._lock = threading.Lock()
+        os.makedirs(archive_dir, exist_ok=True)
+        self.index_path = os.path.join(archive_dir, 'index.sqlite3')
+        self.lock_path = os.path.join(archive_dir, '.lock')
+        self._init_index()
+        with self._exclusive():
+            self._repair_tail()
+
+    @contextmanager
+    def _exclusive(self):
+        """보관소 디렉터리 단위 프로세스 간 배타 잠금 (다른 프로세스가 쓰는 중인 세그먼트를 자르거나 끼어들지 않도록)"""
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _init_index(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive_index (
+                    source TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    block_offset INTEGER NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (source, item_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def segments(self):
+        """세그먼트 파일 이름 (쓰인 순서)"""
+        return sorted(name for name in os.listdir(self.archive_dir)
+                      if name.startswith('segment-') and name.endswith('.crz'))
+
+    def _repair_tail(self):
+        """마지막 세그먼트를 훑어 마지막 온전한 블록 뒤를 잘라냅니다 (쓰는 도중 중단된 블록 제거)."""
+        segments = self.segments()
+        if not segments:
+            return
+        segment = segments[-1]
+        path = os.path.join(self.archive_dir, segment)
+        with open(path, 'rb') as f:
+            valid_end = 0
+            while self._read_block(f, segment) is not None:
+                valid_end = f.tell()
+            size = f.seek(0, os.SEEK_END)
+        if valid_end < size:
+            logging.warning(f"⚠️ {segment}: 끝의 잘린 블록 {size - valid_end:,} bytes를 잘라냅니다.")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+                os.fsync(f.fileno())
+
+    def _writable_segment(self, incoming_bytes):
+        segments = self.segments()
+        if segments:
+            current = segments[-1]
+            size = os.path.getsize(os.path.join(self.archive_dir, current))
+            if size == 0 or size + incoming_bytes <= self.segment_max_bytes:
+                return current
+            number = int(current[len('segment-'):-len('.crz')]) + 1
+        else:
+            number = 1
+        return f"segment-{number:06d}.crz"
+
+    def append(self, source, item_id, payload, fetched_at=None):
+        """원본 레코드 하나를 버퍼에 넣습니다. block_records개가 모이면 블록 하나로 압축해 씁니다."""
+        record = {
+            'source': source,
+            'item_id': item_id,
+            'fetched_at': fetched_at or datetime.now().isoformat(),
+            'payload': payload
+        }
+        with self._lock:
+            self.pending.append(record)
+            if len(self.pending) >= self.block_records:
+                self._write_block()
+
+    def flush(self):
+        """버퍼에 남은 레코드를 블록으로 씁니다 (수집이 끝나면 호출)."""
+        with self._lock:
+            if self.pending:
+                self._write_block()
+
+    def _write_block(self):
+        records, self.pending = self.pending, []
+        raw = '\n'.join(json.dumps(record, ensure_ascii=False) for record in records).encode('utf-8')
+        compressed = zlib.compress(raw, 6)
+        block = _BLOCK_HEADER.pack(_BLOCK_MAGIC, len(compressed), zlib.crc32(raw)) + compressed
+        # 세그먼트 선택·위치 확인·쓰기·색인 갱신을 한 잠금 안에서: 다른 프로세스의 블록과 섞이지 않고,
+        # 같은 레코드의 색인은 블록이 쓰인 순서대로 최신을 가리킵니다.
+        with self._exclusive():
+            segment = self._writable_segment(len(block))
+            path = os.path.join(self.archive_dir, segment)
+            # 블록을 디스크에 내린 뒤 색인을 씁니다. 색인에 있으면 블록도 항상 있습니다.
+            with open(path, 'ab') as f:
+                block_offset = f.tell()
+                f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._connect() as conn:
+                conn.executemany("""
+                    INSERT INTO archive_index (source, item_id, segment, block_offset, fetched_at) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (source, item_id) DO UPDATE SET
+                        segment = excluded.segment, block_offset = excluded.block_offset, fetched_at = excluded.fetched_at;
+                """, [(record['source'], record['item_id'], segment, block_offset, record['fetched_at'])
+                      for record in records])
+        self.stats['records_written'] += len(records)
+        self.stats['blocks_written'] += 1
+        self.stats['bytes_raw'] += len(raw)
+        self.stats['bytes_compressed'] += len(block)
+        logging.info(f"🗄️ 원본 {len(records)}개 보관: {segment} @ {block_offset} "
+                     f"({len(raw):,} → {len(block):,} bytes)")
+
+    def _read_block(self, f, segment):
+        """현재 위치의 블록을 읽어 레코드 목록을 반환합니다. 파일 끝이나 잘린/손상된 블록이면 None"""
+        header = f.read(_BLOCK_HEADER.size)
+        if len(header) < _BLOCK_HEADER.size:
+            if header:
+                logging.warning(f"⚠️ {segment}: 끝부분 블록 머리가 잘려 있어 건너뜁니다.")
+            return None
+        magic, length, checksum = _BLOCK_HEADER.unpack(header)
+        compressed = f.read(length)
+        if magic != _BLOCK_MAGIC or len(compressed) < length:
+            logging.warning(f"⚠️ {segment}: 잘리거나 손상된 블록에서 읽기를 멈춥니다.")
+            return None
+        try:
+            raw = zlib.decompress(compressed)
+        except zlib.error as e:
+            logging.error(f"{segment}: 블록 압축 해제 실패: {str(e)}")
+            return None
+        if zlib.crc32(raw) != checksum:
+            logging.error(f"{segment}: 블록 체크섬 불일치")
+            return None
+        return [json.loads(line) for line in raw.decode('utf-8').split('\n')]
+
+    def replay(self, source=None, since=None):
+        """보관된 레코드를 쓰인 순서대로 흘려보냅니다. source / since(fetched_at ISO 문자열)로 거를 수 있습니다.
+
+        같은 (source, item_id)를 여러 번 보관했으면 색인이 가리키는 블록의 마지막 레코드 하나만 내보냅니다.
+        """
+        self.flush()
+        for segment in self.segments():
+            latest = self._indexed_blocks(segment)
+            if not latest:
+                continue
+            with open(os.path.join(self.archive_dir, segment), 'rb') as f:
+                while True:
+                    block_offset = f.tell()
+                    records = self._read_block(f, segment)
+                    if records is None:
+                        break
+                    current = latest.get(block_offset)
+                    if not current:
+                        continue
+                    # 한 블록에 같은 항목이 두 번 있으면 마지막 것이 최신입니다.
+                    last_position = {(record['source'], record['item_id']): position
+                                     for position, record in enumerate(records)}
+                    for position, record in enumerate(records):
+                        key = (record['source'], record['item_id'])
+                        if key not in current or last_position[key] != position:
+                            continue
+                        if source is not None and record['source'] != source:
+                            continue
+                        if since is not None and record['fetched_at'] < since:
+                            continue
+                        yield record
+
+    def _indexed_blocks(self, segment):
+        """세그먼트에서 색인이 가리키는 블록 위치 → 그 블록이 최신인 (source, item_id) 집합"""
+        blocks = {}
+        with self._connect() as conn:
+            for source, item_id, block_offset in conn.execute(
+                    "SELECT source, item_id, block_offset FROM archive_index WHERE segment = ?;", (segment,)):
+                blocks.setdefault(block_offset, set()).add((source, item_id))
+        return blocks
+
+    def get(self, source, item_id):
+        """색인으로 블록 하나만 읽어 가장 최근에 보관한 레코드를 반환합니다. 없으면 None"""
+        self.flush()
+        with self._connect() as conn:
+            row = conn.execute("SELECT segment, block_offset FROM archive_index WHERE source = ? AND item_id = ?;",
+                               (source, item_id)).fetchone()
+        if not row:
+            return None
+        segment, block_offset = row
+        with open(os.path.join(self.archive_dir, segment), 'rb') as f:
+            f.seek(block_offset)
+            records = self._read_block(f, segment) or []
+        matches = [record for record in records if record['source'] == source and record['item_id'] == item_id]
+        return matches[-1] if matches else None
+
+    def count(self, source=None):
+        with self._connect() as conn:
+            if source is None:
+                return conn.execute("SELECT COUNT(*) FROM archive_index;").fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM archive_index WHERE source = ?;", (source,)).fetchone()[0]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    archive = CrawlArchive(tempfile.mkdtemp(prefix='crawl_archive_'), segment_max_bytes=4096, block_records=50)
+    for number in range(300):
+        archive.append('reddit_korea', f"t3_{number:04d}", {
+            'name': f"t3_{number:04d}",
+            'title': f"서울 월세 실화? #{number}",
+            'selftext': '월세가 또 올랐어요 ㅠㅠ 진짜 숨이 막히네요' * 3,
+            'score': number * 3,
+            'num_comments': number
+        })
+    archive.flush()
+    print(f"📦 세그먼트 {archive.segments()}")
+    print(f"📊 {archive.stats}, 색인 {archive.count('reddit_korea')}개")
+    print(f"🔎 get: {archive.get('reddit_korea', 't3_0123')['payload']['title']}")
+    replayed = sum(1 for _ in archive.replay('reddit_korea'))
+    print(f"♻️ replay: {replayed}개")
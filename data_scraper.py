@@ -1,16 +1,30 @@
 
-import requests
 import json
-import time
+import uuid
 import random
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-import re
 from database_setup import TauntResearchDB
+from cost_meter import CostMeter
+from checkpoint_store import CheckpointStore, item_hash
+from batch_planner import BatchPlanner
+from near_duplicate import NearDuplicateFilter
+from http_fetcher import CachedHttpFetcher
+from scrape_state import ScrapeStateStore
+from streaming_pipeline import StreamingPipeline
+from quota_governor import gemini_governor, BATCH
+from korean_text_kernel import contains_korean
+from crawl_archive import CrawlArchive
 import google.generativeai as genai
 import os
 import logging
 
+# 스트리밍 분석 단계가 한 번에 모아 배치 계획을 세우는 창 크기 (요청 수 기준)
+ANALYSIS_WINDOW_REQUESTS = int(os.environ.get('SCRAPER_ANALYSIS_WINDOW', 4))
+SAVE_BATCH_SIZE = int(os.environ.get('SCRAPER_SAVE_BATCH_SIZE', 50))
+# 근접 중복을 묶는 창 크기 (항목 수). 창이 닫혀야 대표 항목의 묶인 개수가 확정되어 다음 단계로 나갑니다.
+DEDUPE_WINDOW_SIZE = int(os.environ.get('SCRAPER_DEDUPE_WINDOW', 1000))
+
 class KoreanCommunityDataScraper:
     """국내 커뮤니티 데이터 스크래핑 및 AI 학습 데이터 생성"""
     
@@ -23,7 +37,8 @@ class KoreanCommunityDataScraper:
         # 공개 API 기반 데이터 소스
         self.data_sources = {
             "reddit_korean": {
-                "api_endpoint": "https://www.reddit.com/r/korea.json",
+                # 최신순 목록이어야 after 토큰/created_utc 커서로 새 글만 넘겨볼 수 있습니다.
+                "api_endpoint": "https://www.reddit.com/r/korea/new.json",
                 "headers": {"User-Agent": "Korean Community Research Bot 1.0"},
                 "rate_limit": 1,  # 초당 요청 수
                 "data_type": "reddit_posts"
@@ -33,68 +48,146 @@ class KoreanCommunityDataScraper:
                 "data_type": "news_comments"
             }
         }
+        self.fetcher = CachedHttpFetcher(self.data_sources)
+        # 소스별 커서와 이미 본 항목 ID: 새 글만 가져오고 새 글만 분석합니다.
+        self.scrape_state = ScrapeStateStore()
+        self.max_listing_pages = int(os.environ.get('SCRAPER_MAX_PAGES', 5))
+        # 받은 원본 그대로 압축 보관: 새 분석 로직으로 다시 돌릴 때 재수집 대신 로컬에서 순차로 읽습니다.
+        self.crawl_archive = CrawlArchive()
         
         # 비용 효율적 AI 사용을 위한 설정
         self.ai_usage_budget = 4.0  # 달러
-        self.cost_per_request = 0.01  # 추정 비용
-        self.max_requests = int(self.ai_usage_budget / self.cost_per_request)
+        self.model_name = 'gemini-2.0-flash'
+        # 응답의 실제 토큰 수로 비용 계산, 요청당 목표 토큰에 맞춰 배치 크기 조정
+        self.cost_meter = CostMeter(self.model_name, self.ai_usage_budget)
+        self.target_tokens_per_request = int(os.environ.get('SCRAPER_TARGET_TOKENS', 6000))
+        self.max_batch_size = 30
+        self.prompt_version = 'community_analysis_v1'
+        self.checkpoint_store = CheckpointStore('community_analysis')
+        self.resumed_batches = 0
         self.requests_used = 0
+        # 재게시/템플릿 댓글은 대표 하나만 분석·저장하고 묶인 개수만 남깁니다.
+        self.near_duplicate_filter = NearDuplicateFilter()
     
     def scrape_public_korean_data(self):
-        """공개 데이터 소스에서 한국어 콘텐츠 수집"""
-        
-        scraped_data = []
+        """공개 데이터 소스에서 지난 실행 이후 새로 올라온 한국어 콘텐츠만 수집"""
+        return list(self.iter_public_korean_data())
+    
+    def iter_public_korean_data(self):
+        """새 콘텐츠를 페이지 단위로 바로 내보내는 수집 제너레이터 (스트리밍 파이프라인의 첫 단계)"""
+        self._pending_scrape_state = {}
+        self.scrape_run_id = uuid.uuid4().hex[:12]
+        reddit_count = 0
         
         try:
             # Reddit 한국 관련 서브레딧에서 공개 데이터 수집
             logging.info("🔍 Reddit 한국 커뮤니티 데이터 수집 시작...")
-            
-            response = requests.get(
-                self.data_sources["reddit_korean"]["api_endpoint"],
-                headers=self.data_sources["reddit_korean"]["headers"]
+            for item in self._iter_new_reddit_posts():
+                reddit_count += 1
+                yield item
+            logging.info(f"✅ Reddit에서 {reddit_count}개 새 한국어 포스트 수집")
+        except Exception as e:
+            # 오류 시 시뮬레이션 데이터로 대체
+            logging.error(f"데이터 스크래핑 실패: {str(e)}")
+        
+        # 시뮬레이션된 국내 커뮤니티 패턴 데이터 생성 (실행마다 새로 만든 합성 데이터라 본 항목 기록 대상이 아님)
+        simulated_data = self._generate_simulated_korean_community_data()
+        yield from self._with_run_ids(simulated_data)
+    
+    def _iter_new_reddit_posts(self):
+        """/new 목록을 최신순으로 넘기다가 이미 본 글(또는 커서 이전 글)을 만나면 멈춥니다."""
+        source = self.data_sources["reddit_korean"]
+        cursor = self.scrape_state.cursor('reddit_korea')
+        high_watermark = cursor.get('high_watermark', 0)
+        new_ids_seen, newest, after = [], None, None
+        reached_seen = False
+        pages = 0
+        
+        while pages < self.max_listing_pages and not reached_seen:
+            # 세션 재사용 + 호스트별 속도 제한 + 조건부 GET (변경 없으면 304로 캐시 본문 사용)
+            response = self.fetcher.fetch(
+                source["api_endpoint"],
+                params={'limit': 100, **({'after': after} if after else {})},
+                headers=source["headers"]
             )
+            pages += 1
+            if response.status_code != 200:
+                break
+            listing = response.json().get('data', {})
+            page_posts = [post.get('data', {}) for post in listing.get('children', [])]
+            new_ids = set(self.scrape_state.filter_new('reddit_korea', [post.get('name', '') for post in page_posts]))
             
-            if response.status_code == 200:
-                reddit_data = response.json()
-                posts = reddit_data.get('data', {}).get('children', [])
-                
-                for post in posts[:50]:  # 최대 50개 포스트
-                    post_data = post.get('data', {})
-                    
-                    # 한국어 텍스트 필터링
-                    title = post_data.get('title', '')
-                    selftext = post_data.get('selftext', '')
-                    
-                    if self._contains_korean(title) or self._contains_korean(selftext):
-                        scraped_data.append({
-                            'source': 'reddit_korea',
-                            'title': title,
-                            'content': selftext,
-                            'score': post_data.get('score', 0),
-                            'num_comments': post_data.get('num_comments', 0),
-                            'created_utc': post_data.get('created_utc', 0),
-                            'url': post_data.get('url', ''),
-                            'subreddit': post_data.get('subreddit', ''),
-                            'data_type': 'community_post'
-                        })
+            for post_data in page_posts:
+                if post_data.get('name') not in new_ids or post_data.get('created_utc', 0) <= high_watermark:
+                    reached_seen = True
+                    continue
+                # 한국어가 아니어서 버린 글도 다시 받지 않도록 본 것으로 기록 (저장 후 반영)
+                new_ids_seen.append(post_data.get('name', ''))
+                if newest is None or post_data.get('created_utc', 0) > newest.get('created_utc', 0):
+                    newest = post_data
+                # 필터링 전 원본을 보관해 두면 필터 기준이 바뀌어도 다시 받을 필요가 없습니다.
+                self.crawl_archive.append('reddit_korea', post_data.get('name', ''), post_data)
                 
-                logging.info(f"✅ Reddit에서 {len([d for d in scraped_data if d['source'] == 'reddit_korea'])}개 한국어 포스트 수집")
-            
-            # 시뮬레이션된 국내 커뮤니티 패턴 데이터 생성
-            simulated_data = self._generate_simulated_korean_community_data()
-            scraped_data.extend(simulated_data)
-            
-            return scraped_data
+                item = self._reddit_item(post_data)
+                if item:
+                    yield item
             
-        except Exception as e:
-            logging.error(f"데이터 스크래핑 실패: {str(e)}")
-            # 오류 시 시뮬레이션 데이터로 대체
-            return self._generate_simulated_korean_community_data()
+            after = listing.get('after')
+            if not after:
+                break
+        
+        self.crawl_archive.flush()
+        logging.info(f"📄 Reddit 목록 {pages}페이지 확인" + (" (이전 수집 지점 도달)" if reached_seen else ""))
+        if new_ids_seen:
+            self._pending_scrape_state['reddit_korea'] = (
+                new_ids_seen,
+                {'high_watermark': max(high_watermark, newest.get('created_utc', 0)), 'newest_id': newest.get('name')})
+    
+    def _reddit_item(self, post_data):
+        """Reddit 원본 글을 수집 항목으로 바꿉니다. 한국어가 없으면 None"""
+        title = post_data.get('title', '')
+        selftext = post_data.get('selftext', '')
+        if not (self._contains_korean(title) or self._contains_korean(selftext)):
+            return None
+        return {
+            'id': post_data.get('name', ''),
+            'source': 'reddit_korea',
+            'title': title,
+            'content': selftext,
+            'score': post_data.get('score', 0),
+            'num_comments': post_data.get('num_comments', 0),
+            'created_utc': post_data.get('created_utc', 0),
+            'url': post_data.get('url', ''),
+            'subreddit': post_data.get('subreddit', ''),
+            'data_type': 'community_post'
+        }
+    
+    def iter_archived_korean_data(self, since=None):
+        """보관된 원본을 네트워크 없이 순서대로 다시 수집 항목으로 흘려보냅니다 (재처리용 첫 단계)"""
+        replayed = 0
+        for record in self.crawl_archive.replay('reddit_korea', since=since):
+            item = self._reddit_item(record['payload'])
+            if item:
+                replayed += 1
+                yield item
+        logging.info(f"♻️ 보관소에서 {replayed}개 한국어 포스트 재생")
+    
+    def _with_run_ids(self, items):
+        """합성 항목에 실행 ID + 순번으로 ID를 붙입니다. 내용 해시를 쓰면 다음 실행의 같은 패턴이 이미 본 항목이 됩니다."""
+        for index, item in enumerate(items):
+            item.setdefault('id', f"{item['source']}:{self.scrape_run_id}:{index}")
+        logging.info(f"🧪 시뮬레이션 항목 {len(items)}개 (실행 {self.scrape_run_id})")
+        return items
+    
+    def commit_scrape_state(self):
+        """이번 실행에서 수집한 항목을 본 것으로 기록하고 커서를 옮깁니다 (저장이 끝난 뒤 호출)."""
+        for state_source, (item_ids, cursor) in getattr(self, '_pending_scrape_state', {}).items():
+            self.scrape_state.mark_seen(state_source, item_ids, cursor=cursor)
+        self._pending_scrape_state = {}
     
     def _contains_korean(self, text):
         """텍스트에 한국어가 포함되어 있는지 확인"""
-        korean_pattern = re.compile(r'[ㄱ-ㅎㅏ-ㅣ가-힣]')
-        return bool(korean_pattern.search(text))
+        return contains_korean(text)
     
     def _generate_simulated_korean_community_data(self):
         """시뮬레이션된 국내 커뮤니티 데이터 생성 (실제 스크래핑 대체용)"""
@@ -164,34 +257,165 @@ class KoreanCommunityDataScraper:
         
         return simulated_patterns + expanded_data
     
-    def analyze_scraped_data_with_ai(self, scraped_data):
-        """스크래핑된 데이터를 AI로 분석하여 학습 데이터 생성"""
+    def analyze_scraped_data_with_ai(self, scraped_data, resume=False):
+        """스크래핑된 데이터를 AI로 분석하여 학습 데이터 생성 (resume=True면 체크포인트된 배치 재사용)"""
         
         if not self.gemini_api_key:
             logging.warning("⚠️ Gemini API 키가 없어 시뮬레이션 분석을 수행합니다.")
             return self._simulate_ai_analysis(scraped_data)
         
-        analyzed_results = []
+        # 원래 항목 인덱스 → 분석 결과 (배치가 순서를 섞어도 입력 순서대로 반환)
+        results_by_index = {}
         
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            # 배치 처리로 비용 효율성 극대화
-            batch_size = 10
-            batches = [scraped_data[i:i+batch_size] for i in range(0, len(scraped_data), batch_size)]
+            model = genai.GenerativeModel(self.model_name)
+            self.resumed_batches = 0
+            plan = self._plan_batches(scraped_data)
             
-            for batch_idx, batch in enumerate(batches):
-                if self.requests_used >= self.max_requests:
-                    logging.warning(f"💰 AI 사용 예산 ({self.ai_usage_budget}$) 소진으로 분석을 중단합니다.")
+            for indices in plan:
+                batch_results = self._analyze_batch(model, [scraped_data[i] for i in indices], resume)
+                if batch_results is None:
                     break
-                
-                # 배치 데이터를 하나의 프롬프트로 통합 처리
-                batch_text = "\n\n".join([
-                    f"제목: {item['title']}\n내용: {item['content']}\n플랫폼: {item['source']}"
-                    for item in batch
-                ])
-                
-                analysis_prompt = f"""
+                results_by_index.update(zip(indices, batch_results))
+            
+            analyzed_results = [results_by_index[i] for i in sorted(results_by_index)]
+            logging.info(f"🎯 총 {len(analyzed_results)}개 데이터 분석 완료 (총 비용: ${self.cost_meter.total_cost():.4f})")
+            return analyzed_results
+            
+        except Exception as e:
+            logging.error(f"AI 분석 실패: {str(e)}")
+            return self._simulate_ai_analysis(scraped_data)
+    
+    def _plan_batches(self, items):
+        """항목별 예상 토큰으로 요청당 목표 토큰에 맞춰 배치를 묶습니다."""
+        sizes = [self.cost_meter.estimate_tokens(self._analysis_item_text(item))
+                 + int(self.cost_meter.output_tokens_per_item) for item in items]
+        planner = BatchPlanner(
+            self.target_tokens_per_request,
+            overhead_tokens=self.cost_meter.estimate_tokens(self._create_analysis_prompt([])),
+            max_items=self.max_batch_size)
+        plan = planner.plan(sizes)
+        logging.info(f"📦 배치 계획: {planner.describe(plan, sizes)}")
+        return plan
+    
+    def _analyze_batch(self, model, batch, resume=False):
+        """배치 하나를 분석해 항목 순서대로 결과를 반환합니다. 예산이 부족하면 None, 응답 파싱 실패면 ValueError"""
+        batch_hashes = [item_hash(self._analysis_item_text(item)) for item in batch]
+        checkpoint = resume and self.checkpoint_store.get(self.prompt_version, batch_hashes)
+        if checkpoint:
+            self.resumed_batches += 1
+            logging.info(f"📌 배치 체크포인트에서 복원 ({len(batch)}개, 비용 없음)")
+            return self._batch_results(batch, checkpoint['result'], checkpoint.get('cost_usd', 0))
+        
+        analysis_prompt = self._create_analysis_prompt(batch)
+        if self.cost_meter.remaining_budget() < self.cost_meter.estimate_request(analysis_prompt, len(batch))[2]:
+            logging.warning(f"💰 AI 사용 예산 ({self.ai_usage_budget}$) 소진으로 분석을 중단합니다.")
+            return None
+        
+        response = gemini_governor.call(
+            model.generate_content,
+            analysis_prompt,
+            lane=BATCH,
+            generation_config=genai.types.GenerationConfig(
+                response_mime_type="application/json",
+                temperature=0.3
+            )
+        )
+        self.requests_used += 1
+        batch_cost = self.cost_meter.record('community_analysis', response, analysis_prompt, len(batch))
+        
+        try:
+            batch_analysis = json.loads(response.text)
+        except json.JSONDecodeError:
+            raise ValueError(f"배치 ({len(batch)}개) 응답 JSON 파싱 실패")
+        self.checkpoint_store.put(self.prompt_version, batch_hashes, batch_analysis,
+                                  model=self.model_name, cost_usd=batch_cost)
+        logging.info(f"✅ 배치 ({len(batch)}개) 분석 완료 (누적 비용: ${self.cost_meter.total_cost():.4f})")
+        return self._batch_results(batch, batch_analysis, batch_cost)
+    
+    def _stream_analysis(self, items, resume=False):
+        """들어오는 항목을 창 단위로 모아 배치 계획 후 분석 결과를 바로 내보냅니다 (스트리밍 분석 단계).
+        
+        창이 차면 채움률이 가장 낮은 배치 하나는 다음 창으로 넘겨 끝까지 꽉 찬 배치로 보냅니다.
+        분석에 실패한 배치는 한 번 더 시도하고, 다시 실패하면 예외를 올려 파이프라인을 실패로 끝냅니다.
+        """
+        model = genai.GenerativeModel(self.model_name) if self.gemini_api_key else None
+        if model is None:
+            logging.warning("⚠️ Gemini API 키가 없어 시뮬레이션 분석을 수행합니다.")
+        window_limit = self.target_tokens_per_request * ANALYSIS_WINDOW_REQUESTS
+        window, window_tokens = [], 0
+        budget_left = True
+        requeued = set()
+        
+        for item in items:
+            if not budget_left:
+                continue
+            window.append(item)
+            window_tokens += self.cost_meter.estimate_tokens(self._analysis_item_text(item))
+            if window_tokens < window_limit and len(window) < self.max_batch_size * ANALYSIS_WINDOW_REQUESTS:
+                continue
+            window, budget_left = yield from self._analyze_window(model, window, resume, requeued, final=False)
+            window_tokens = sum(self.cost_meter.estimate_tokens(self._analysis_item_text(item)) for item in window)
+        
+        if window and budget_left:
+            yield from self._analyze_window(model, window, resume, requeued, final=True)
+    
+    def _analyze_window(self, model, window, resume, requeued, final):
+        """창 하나를 배치로 나눠 분석 결과를 내보내고 (남긴 항목, 예산 남음 여부)를 반환합니다.
+
+        실패한 배치는 다음 창으로 넘기고(마지막 창이면 바로) 한 번만 다시 시도합니다. requeued에 이미
+        다시 보낸 항목 ID를 기록해 두 번째 실패는 예외로 올립니다.
+        """
+        if model is None:
+            yield from self._simulate_ai_analysis(window)
+            return [], True
+        plan = self._plan_batches(window)
+        carry = []
+        if not final and len(plan) > 1:
+            loads = [sum(self.cost_meter.estimate_tokens(self._analysis_item_text(window[i])) for i in indices)
+                     for indices in plan]
+            carry = [window[i] for i in plan.pop(loads.index(min(loads)))]
+        for indices in plan:
+            batch = [window[i] for i in indices]
+            try:
+                batch_results = self._analyze_batch(model, batch, resume)
+            except Exception as e:
+                if any(item['id'] in requeued for item in batch):
+                    raise
+                requeued.update(item['id'] for item in batch)
+                if not final:
+                    logging.error(f"AI 분석 실패, 다음 창에서 다시 시도 ({len(batch)}개): {str(e)}")
+                    carry.extend(batch)
+                    continue
+                logging.error(f"AI 분석 실패, 바로 다시 시도 ({len(batch)}개): {str(e)}")
+                batch_results = self._analyze_batch(model, batch, resume)
+            if batch_results is None:
+                return [], False
+            yield from batch_results
+        return carry, True
+    
+    def _batch_results(self, batch, batch_analysis, batch_cost):
+        """배치 응답을 배치 안 항목 순서대로 개별 결과에 나눠 붙입니다."""
+        results = []
+        for i, item in enumerate(batch):
+            item_analysis = batch_analysis if isinstance(batch_analysis, dict) else batch_analysis[i] if i < len(batch_analysis) else {}
+            
+            results.append({
+                'original_data': item,
+                'ai_analysis': item_analysis,
+                'analysis_date': datetime.now().isoformat(),
+                'cost_used': batch_cost / len(batch)
+            })
+        return results
+    
+    def _analysis_item_text(self, item):
+        return f"제목: {item['title']}\n내용: {item['content']}\n플랫폼: {item['source']}"
+    
+    def _create_analysis_prompt(self, batch):
+        """배치 데이터를 하나의 분석 프롬프트로 통합"""
+        batch_text = "\n\n".join([self._analysis_item_text(item) for item in batch])
+        
+        return f"""
 다음 한국 커뮤니티 데이터를 분석하여 각각에 대해 조롱/유머 생성에 활용할 수 있는 패턴을 추출해주세요:
 
 {batch_text}
@@ -207,45 +431,6 @@ class KoreanCommunityDataScraper:
   "usage_recommendations": "활용 권장사항"
 }}
 """
-                
-                response = model.generate_content(
-                    analysis_prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        response_mime_type="application/json",
-                        temperature=0.3
-                    )
-                )
-                
-                try:
-                    batch_analysis = json.loads(response.text)
-                    
-                    # 배치 결과를 개별 아이템에 할당
-                    for i, item in enumerate(batch):
-                        item_analysis = batch_analysis if isinstance(batch_analysis, dict) else batch_analysis[i] if i < len(batch_analysis) else {}
-                        
-                        analyzed_results.append({
-                            'original_data': item,
-                            'ai_analysis': item_analysis,
-                            'analysis_date': datetime.now().isoformat(),
-                            'cost_used': self.cost_per_request / batch_size
-                        })
-                    
-                    self.requests_used += 1
-                    logging.info(f"✅ 배치 {batch_idx + 1}/{len(batches)} 분석 완료 (비용: ${self.requests_used * self.cost_per_request:.2f})")
-                    
-                    # API 제한 방지를 위한 딜레이
-                    time.sleep(1)
-                    
-                except json.JSONDecodeError:
-                    logging.error(f"배치 {batch_idx + 1} JSON 파싱 실패")
-                    continue
-            
-            logging.info(f"🎯 총 {len(analyzed_results)}개 데이터 분석 완료 (총 비용: ${self.requests_used * self.cost_per_request:.2f})")
-            return analyzed_results
-            
-        except Exception as e:
-            logging.error(f"AI 분석 실패: {str(e)}")
-            return self._simulate_ai_analysis(scraped_data)
     
     def _simulate_ai_analysis(self, scraped_data):
         """AI 분석 시뮬레이션 (API 키가 없거나 오류 시 사용)"""
@@ -310,68 +495,133 @@ class KoreanCommunityDataScraper:
         """분석된 데이터를 학습용 데이터로 저장"""
         
         saved_count = 0
+        for start in range(0, len(analyzed_data), SAVE_BATCH_SIZE):
+            saved_count += self._save_chunk(analyzed_data[start:start + SAVE_BATCH_SIZE])
         
-        for item in analyzed_data:
+        logging.info(f"💾 {saved_count}개 학습 데이터 저장 완료")
+        return saved_count
+    
+    def _training_row(self, item):
+        return {
+            'dataset_name': f"스크래핑_데이터_{item['original_data']['source']}",
+            'content_type': "scraped_community_data",
+            'raw_data': item['original_data'],
+            'processed_data': item['ai_analysis'],
+            'metadata': {
+                'scraping_date': datetime.now().isoformat(),
+                'analysis_cost': item['cost_used'],
+                'data_source': item['original_data']['source'],
+                'viral_score': item['original_data'].get('score', 0),
+                'duplicate_count': item['original_data'].get('duplicate_count', 1)
+            },
+            'quality_score': item['ai_analysis'].get('effectiveness_score', 7.0)
+        }
+    
+    def _save_chunk(self, chunk):
+        """한 트랜잭션으로 일괄 저장하고, 실패하면 행 단위로 다시 시도해 성공한 개수를 반환합니다."""
+        try:
+            return len(self.db.insert_training_data_many([self._training_row(item) for item in chunk]))
+        except Exception as e:
+            logging.error(f"일괄 저장 실패, 행 단위로 재시도: {str(e)}")
+        
+        saved_count = 0
+        for item in chunk:
             try:
-                dataset_id = self.db.insert_training_data(
-                    dataset_name=f"스크래핑_데이터_{item['original_data']['source']}",
-                    content_type="scraped_community_data",
-                    raw_data=item['original_data'],
-                    processed_data=item['ai_analysis'],
-                    metadata={
-                        'scraping_date': datetime.now().isoformat(),
-                        'analysis_cost': item['cost_used'],
-                        'data_source': item['original_data']['source'],
-                        'viral_score': item['original_data'].get('score', 0)
-                    },
-                    quality_score=item['ai_analysis'].get('effectiveness_score', 7.0)
-                )
-                
+                self.db.insert_training_data(**self._training_row(item))
                 saved_count += 1
-                
             except Exception as e:
                 logging.error(f"데이터 저장 실패: {str(e)}")
                 continue
-        
-        logging.info(f"💾 {saved_count}개 학습 데이터 저장 완료")
         return saved_count
     
-    def run_full_pipeline(self):
-        """전체 데이터 수집 및 학습 파이프라인 실행"""
+    def _stream_save(self, analyzed_items, totals):
+        """분석 결과를 SAVE_BATCH_SIZE개씩 모아 일괄 저장합니다 (스트리밍 저장 단계). 결과 요약용 합계를 totals에 누적."""
+        chunk = []
+        for item in analyzed_items:
+            chunk.append(item)
+            totals['analyzed'] += 1
+            totals['sources'].add(item['original_data']['source'])
+            totals['effectiveness_sum'] += item['ai_analysis'].get('effectiveness_score', 0)
+            if len(chunk) >= SAVE_BATCH_SIZE:
+                saved = self._save_chunk(chunk)
+                totals['saved'] += saved
+                yield saved
+                chunk = []
+        if chunk:
+            saved = self._save_chunk(chunk)
+            totals['saved'] += saved
+            yield saved
+    
+    def run_full_pipeline(self, resume=False, replay_archive=False):
+        """전체 데이터 수집 및 학습 파이프라인 실행
+        
+        수집 → 근접 중복 제거 → 배치 분석 → 일괄 저장 단계가 크기 제한 큐로 이어져 동시에 돌아갑니다.
+        뒤 단계가 밀리면 앞 단계가 기다리므로 메모리는 큐 크기와 중복 제거 창(DEDUPE_WINDOW_SIZE)만큼만 씁니다.
+        중복 제거 단계는 창이 닫힐 때 대표 항목을 내보내므로 저장되는 duplicate_count는 최종값입니다.
+        replay_archive=True면 수집 대신 원본 보관소를 처음부터 다시 읽습니다 (수집 커서는 건드리지 않음).
+        """
         
         logging.info("🚀 한국 커뮤니티 데이터 수집 및 AI 학습 파이프라인 시작")
         logging.info(f"💰 사용 가능 예산: ${self.ai_usage_budget}")
         
-        # 1단계: 데이터 스크래핑
-        scraped_data = self.scrape_public_korean_data()
-        logging.info(f"📊 {len(scraped_data)}개 데이터 수집 완료")
+        self.resumed_batches = 0
+        self.near_duplicate_filter.reset()
+        totals = {'analyzed': 0, 'saved': 0, 'sources': set(), 'effectiveness_sum': 0.0}
+        title_and_content = lambda item: f"{item['title']} {item['content']}"
         
-        # 2단계: AI 분석
-        analyzed_data = self.analyze_scraped_data_with_ai(scraped_data)
+        pipeline = (StreamingPipeline()
+                    .add_stage('fetch', self.iter_archived_korean_data if replay_archive
+                               else self.iter_public_korean_data)
+                    .add_stage('dedupe', lambda items: self.near_duplicate_filter.stream_windows(
+                        items, title_and_content, DEDUPE_WINDOW_SIZE))
+                    .add_stage('analyze', lambda items: self._stream_analysis(items, resume))
+                    .add_stage('save', lambda items: self._stream_save(items, totals)))
+        pipeline.run()
+        stage_metrics = pipeline.metrics()
         
-        # 3단계: 학습 데이터 저장
-        saved_count = self.save_training_data(analyzed_data)
+        scraped_count = stage_metrics['fetch']['items_out']
+        distinct_count = stage_metrics['dedupe']['items_out']
+        logging.info(f"📊 {scraped_count}개 수집, 근접 중복 제거 후 {distinct_count}개 분석 대상")
         
-        # 4단계: 결과 요약
-        total_cost = self.requests_used * self.cost_per_request
+        if replay_archive:
+            # 재생은 새로 본 항목이 없으므로 수집 상태를 기록하지 않습니다.
+            logging.info("♻️ 보관소 재처리 완료 (수집 커서 유지)")
+        elif not pipeline.failed and totals['saved'] == distinct_count:
+            self.commit_scrape_state()
+        else:
+            # 예산 소진 등으로 일부만 분석·저장됨: 다음 실행에서 다시 가져오고 체크포인트로 이어서 분석
+            logging.warning("⚠️ 일부 항목이 분석·저장되지 않아 수집 커서를 옮기지 않습니다.")
+        
+        # 결과 요약
+        total_cost = self.cost_meter.total_cost()
         
         results = {
-            'scraped_items': len(scraped_data),
-            'analyzed_items': len(analyzed_data),
-            'saved_items': saved_count,
+            'scraped_items': scraped_count,
+            'distinct_items': distinct_count,
+            'analyzed_items': totals['analyzed'],
+            'saved_items': totals['saved'],
             'total_cost_used': total_cost,
             'remaining_budget': self.ai_usage_budget - total_cost,
             'ai_requests_used': self.requests_used,
-            'data_sources': list(set([item['original_data']['source'] for item in analyzed_data])),
-            'average_effectiveness': sum([item['ai_analysis'].get('effectiveness_score', 0) for item in analyzed_data]) / len(analyzed_data) if analyzed_data else 0
+            'resumed_batches': self.resumed_batches,
+            'cost_breakdown': self.cost_meter.summary(),
+            'http_fetch': dict(self.fetcher.stats),
+            'crawl_archive': dict(self.crawl_archive.stats),
+            'quota': gemini_governor.summary(),
+            'stage_metrics': stage_metrics,
+            'data_sources': sorted(totals['sources']),
+            'average_effectiveness': totals['effectiveness_sum'] / totals['analyzed'] if totals['analyzed'] else 0
         }
         
         logging.info("🎉 데이터 수집 및 학습 파이프라인 완료!")
         return results
 
 if __name__ == "__main__":
+    import sys
+    
     scraper = KoreanCommunityDataScraper()
-    results = scraper.run_full_pipeline()
+    # --replay: 네트워크 수집 없이 보관된 원본으로 다시 분석
+    results = scraper.run_full_pipeline(replay_archive='--replay' in sys.argv)
     
     print("\n" + "="*60)
     print("🎯 한국 커뮤니티 데이터 수집 및 AI 학습 결과")
@@ -1,19 +1,173 @@
 
 import os
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
+from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 import json
 from datetime import datetime
 
+# training_datasets의 JSON 페이로드는 내용 해시 기준으로 training_payload_blobs에
+# 압축 저장하고, 조인/필터에 쓰이는 메타데이터 키만 행에 인라인으로 남깁니다.
+INLINE_METADATA_KEYS = ('emotion_type', 'tone')
+PAYLOAD_COMPRESSION_LEVEL = 6
+KNOWN_PAYLOAD_CACHE_SIZE = 10000
+# 보고서 한 건이 스냅샷 공유 연결 4개를 동시에 쓰고, 웹 핸들러 스레드와 작업 실행기도 같은 풀을 씁니다.
+DB_POOL_MAX_CONN = int(os.environ.get('DB_POOL_MAX_CONN', 20))
+# 풀이 다 찼을 때 PoolError 대신 반납을 기다리는 최대 시간(초)
+DB_POOL_ACQUIRE_TIMEOUT = float(os.environ.get('DB_POOL_ACQUIRE_TIMEOUT', 30))
+
+# 자주 호출되는 INSERT/조회 구문은 서버측 prepared statement로 등록해
+# 매 호출마다 반복되는 파싱/플래닝 비용을 없앱니다. ($n 파라미터 사용)
+PREPARED_STATEMENTS = {
+    'insert_qa_history': """
+        INSERT INTO qa_history 
+        (session_id, question_text, question_type, user_input, generated_response,
+         response_metadata, quality_metrics, emotion_analysis, tone_used,
+         target_subject, keywords, response_length, safety_analysis, development_notes)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+        RETURNING id
+    """,
+    'insert_training_data': """
+        INSERT INTO training_datasets 
+        (dataset_name, content_type, raw_data_hash, processed_data_hash, metadata_hash,
+         metadata, quality_score)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        RETURNING id
+    """,
+    'insert_payload_blob': """
+        INSERT INTO training_payload_blobs 
+        (content_hash, compression, payload, raw_size, stored_size)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (content_hash) DO NOTHING
+    """,
+    'insert_technique_detection': """
+        INSERT INTO technique_detection_log 
+        (qa_history_id, technique_name, technique_type, detection_confidence,
+         detected_elements, text_sample, tone_used, target_subject, effectiveness_score)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+        RETURNING id
+    """,
+    'select_training_data_for_gemini': """
+        SELECT 
+            td.dataset_name,
+            td.content_type,
+            td.processed_data,
+            td.processed_data_hash,
+            td.metadata,
+            td.metadata_hash,
+            ep.emotion_type,
+            ep.trigger_words,
+            tta.tone_name,
+            tta.linguistic_features
+        FROM training_datasets td
+        LEFT JOIN emotion_patterns ep ON (td.metadata->>'emotion_type') = ep.emotion_type
+        LEFT JOIN taunt_tone_analysis tta ON (td.metadata->>'tone') = tta.tone_name
+        WHERE td.validation_status = 'approved'
+        AND td.quality_score >= 7.0
+        ORDER BY td.created_at DESC
+        LIMIT $1
+    """
+}
+
+
+class PreparedStatementConnection(psycopg2.extensions.connection):
+    """연결별로 준비된(prepared) 구문 이름을 기억하는 연결 클래스"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 재연결 시 새 연결 객체가 만들어지므로 목록도 자연스럽게 비워집니다.
+        self.prepared_statements = set()
+
+
 class TauntResearchDB:
+    # 같은 DATABASE_URL을 쓰는 인스턴스끼리 연결 풀(과 빌린 연결 수를 세는 세마포어)을 공유합니다.
+    _pools = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self):
         self.database_url = os.environ.get('DATABASE_URL')
         if not self.database_url:
             raise ValueError("DATABASE_URL 환경변수가 설정되지 않았습니다.")
+        self.pool_min_connections = int(os.environ.get('DB_POOL_MIN_CONN', 1))
+        self.pool_max_connections = DB_POOL_MAX_CONN
+        # 이미 저장이 확인된 페이로드 해시 (중복 업로드 생략용)
+        self._known_payload_hashes = OrderedDict()
     
+    def _get_pool(self):
+        """DATABASE_URL별 공유 (연결 풀, 대여 세마포어)를 지연 생성하여 반환합니다."""
+        with self._pools_lock:
+            connection_pool, slots = self._pools.get(self.database_url, (None, None))
+            if connection_pool is None or connection_pool.closed:
+                connection_pool = pool.ThreadedConnectionPool(
+                    self.pool_min_connections,
+                    self.pool_max_connections,
+                    self.database_url,
+                    connection_factory=PreparedStatementConnection
+                )
+                slots = threading.BoundedSemaphore(self.pool_max_connections)
+                self._pools[self.database_url] = (connection_pool, slots)
+            return connection_pool, slots
+    
+    @contextmanager
     def get_connection(self):
-        """데이터베이스 연결을 반환합니다."""
-        return psycopg2.connect(self.database_url)
+        """풀에서 데이터베이스 연결을 빌려 트랜잭션 단위로 사용 후 반납합니다.
+
+        ThreadedConnectionPool.getconn()은 풀이 다 차면 바로 PoolError를 내므로, 세마포어로 빈 자리를
+        DB_POOL_ACQUIRE_TIMEOUT초까지 기다린 뒤에만 연결을 빌립니다.
+        """
+        connection_pool, slots = self._get_pool()
+        if not slots.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT):
+            raise pool.PoolError(f"{DB_POOL_ACQUIRE_TIMEOUT:g}초 동안 사용 가능한 DB 연결이 없습니다 "
+                                 f"(최대 {self.pool_max_connections}개)")
+        try:
+            conn = connection_pool.getconn()
+        except Exception:
+            slots.release()
+            raise
+        try:
+            with conn:
+                yield conn
+        finally:
+            # 끊어진 연결은 폐기하여 다음 요청 때 새로 연결(및 재준비)되도록 합니다.
+            connection_pool.putconn(conn, close=bool(conn.closed))
+            slots.release()
+    
+    @contextmanager
+    def get_spare_connections(self, max_count):
+        """지금 비어 있는 자리만큼(최대 max_count개) 연결을 기다리지 않고 추가로 빌립니다.
+
+        이미 연결을 쥔 채 더 기다리면 같은 풀을 쓰는 요청끼리 서로 막혀 교착될 수 있으므로,
+        빈 자리가 없으면 빈 목록을 돌려줍니다. 연결마다 `with conn:`으로 트랜잭션을 끝내고 써야 합니다.
+        """
+        connection_pool, slots = self._get_pool()
+        connections = []
+        try:
+            while len(connections) < max_count and slots.acquire(blocking=False):
+                try:
+                    connections.append(connection_pool.getconn())
+                except Exception:
+                    slots.release()
+                    raise
+            yield connections
+        finally:
+            for conn in connections:
+                connection_pool.putconn(conn, close=bool(conn.closed))
+                slots.release()
+    
+    def _execute_prepared(self, cur, statement_name, params):
+        """등록된 구문을 연결별로 한 번만 PREPARE한 뒤 EXECUTE합니다."""
+        prepared = cur.connection.prepared_statements
+        if statement_name not in prepared:
+            cur.execute(f"PREPARE {statement_name} AS {PREPARED_STATEMENTS[statement_name]}")
+            prepared.add(statement_name)
+        placeholders = ', '.join(['%s'] * len(params))
+        cur.execute(f"EXECUTE {statement_name} ({placeholders})", params)
     
     def init_database(self):
         """조롱 연구 데이터용 테이블들을 생성합니다."""
@@ -178,6 +332,69 @@ class TauntResearchDB:
                     );
                 """)
                 
+                # 10. 학습 데이터 페이로드 저장소 (내용 해시 기반 중복 제거 + 압축)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS training_payload_blobs (
+                        content_hash VARCHAR(64) PRIMARY KEY,
+                        compression VARCHAR(10) NOT NULL,
+                        payload BYTEA NOT NULL,
+                        raw_size INTEGER,
+                        stored_size INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                
+                cur.execute("""
+                    ALTER TABLE training_datasets
+                        ADD COLUMN IF NOT EXISTS raw_data_hash VARCHAR(64)
+                            REFERENCES training_payload_blobs(content_hash),
+                        ADD COLUMN IF NOT EXISTS processed_data_hash VARCHAR(64)
+                            REFERENCES training_payload_blobs(content_hash),
+                        ADD COLUMN IF NOT EXISTS metadata_hash VARCHAR(64)
+                            REFERENCES training_payload_blobs(content_hash);
+                """)
+                
+                # 11. 증분 분석 보고서 상태 테이블 (워터마크 + 아직 안 보인 id 목록)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS analytics_report_state (
+                        report_name VARCHAR(100) PRIMARY KEY,
+                        watermark_id INTEGER DEFAULT 0,
+                        watermark_created_at TIMESTAMP,
+                        technique_watermark_id INTEGER DEFAULT 0,
+                        pending_ids JSONB,
+                        technique_pending_ids JSONB,
+                        state_format INTEGER DEFAULT 1,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                cur.execute("""
+                    ALTER TABLE analytics_report_state
+                        ADD COLUMN IF NOT EXISTS pending_ids JSONB,
+                        ADD COLUMN IF NOT EXISTS technique_pending_ids JSONB,
+                        ADD COLUMN IF NOT EXISTS state_format INTEGER DEFAULT 1;
+                """)
+                
+                # 12. 증분 보고서 날짜별 부분 집계 (윈도우 밖 날짜는 삭제)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS analytics_report_days (
+                        report_name VARCHAR(100) NOT NULL,
+                        day DATE NOT NULL,
+                        partial JSONB NOT NULL,
+                        PRIMARY KEY (report_name, day)
+                    );
+                """)
+                
+                # 13. 증분 보고서 전체 기간 그룹 카운터 (안전성/위험/선호/기법)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS analytics_report_groups (
+                        report_name VARCHAR(100) NOT NULL,
+                        section VARCHAR(20) NOT NULL,
+                        group_key TEXT NOT NULL,
+                        counters DOUBLE PRECISION[] NOT NULL,
+                        PRIMARY KEY (report_name, section, group_key)
+                    );
+                """)
+                
                 print("✅ 조롱 연구 데이터베이스 테이블이 성공적으로 생성되었습니다.")
                 print("✅ 질문-답변 히스토리 및 개발 큐 테이블이 추가되었습니다.")
     
@@ -213,43 +430,138 @@ class TauntResearchDB:
                       age_group, cultural_context, sample_phrases))
                 return cur.fetchone()[0]
     
+    def _encode_payload(self, payload):
+        """페이로드를 정규화된 JSON으로 직렬화하고 내용 해시를 계산합니다."""
+        canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True,
+                               separators=(',', ':')).encode('utf-8')
+        return hashlib.sha256(canonical).hexdigest(), canonical
+    
+    def _store_payload(self, cur, payload, stored_hashes):
+        """페이로드를 압축 블롭으로 저장(이미 있으면 생략)하고 해시를 반환합니다."""
+        if payload is None:
+            return None
+        content_hash, canonical = self._encode_payload(payload)
+        if content_hash not in self._known_payload_hashes:
+            compressed = zlib.compress(canonical, PAYLOAD_COMPRESSION_LEVEL)
+            self._execute_prepared(cur, 'insert_payload_blob', (
+                content_hash, 'zlib', psycopg2.Binary(compressed),
+                len(canonical), len(compressed)))
+        stored_hashes.append(content_hash)
+        return content_hash
+    
+    def _remember_payload_hashes(self, hashes):
+        """커밋이 끝난 페이로드 해시를 기억해 다음 삽입 때 업로드를 건너뜁니다."""
+        for content_hash in hashes:
+            self._known_payload_hashes[content_hash] = True
+            self._known_payload_hashes.move_to_end(content_hash)
+        while len(self._known_payload_hashes) > KNOWN_PAYLOAD_CACHE_SIZE:
+            self._known_payload_hashes.popitem(last=False)
+    
+    def _load_payloads(self, cur, hashes):
+        """해시 목록에 해당하는 블롭을 한 번에 읽어 압축을 풀어 반환합니다."""
+        hashes = list({h for h in hashes if h})
+        if not hashes:
+            return {}
+        cur.execute("""
+            SELECT content_hash, compression, payload
+            FROM training_payload_blobs
+            WHERE content_hash = ANY(%s);
+        """, (hashes,))
+        payloads = {}
+        for row in cur.fetchall():
+            content_hash, compression, payload = row['content_hash'], row['compression'], bytes(row['payload'])
+            if compression == 'zlib':
+                payload = zlib.decompress(payload)
+            payloads[content_hash] = payload
+        return payloads
+    
     def insert_training_data(self, dataset_name, content_type, raw_data, 
                            processed_data, metadata, quality_score):
-        """학습 데이터를 삽입합니다."""
+        """학습 데이터를 삽입합니다. (페이로드는 내용 해시 기준으로 중복 제거)"""
+        return self.insert_training_data_many([{
+            'dataset_name': dataset_name, 'content_type': content_type, 'raw_data': raw_data,
+            'processed_data': processed_data, 'metadata': metadata, 'quality_score': quality_score
+        }])[0]
+    
+    def insert_training_data_many(self, rows):
+        """학습 데이터 여러 건을 한 연결·한 트랜잭션으로 삽입하고 ID 목록을 반환합니다.
+        
+        rows: insert_training_data와 같은 키를 가진 dict 목록
+        """
+        stored_hashes = []
+        dataset_ids = []
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO training_datasets 
-                    (dataset_name, content_type, raw_data, processed_data, metadata, quality_score)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id;
-                """, (dataset_name, content_type, json.dumps(raw_data), 
-                      json.dumps(processed_data), json.dumps(metadata), quality_score))
-                return cur.fetchone()[0]
+                for row in rows:
+                    metadata = row['metadata']
+                    raw_hash = self._store_payload(cur, row['raw_data'], stored_hashes)
+                    processed_hash = self._store_payload(cur, row['processed_data'], stored_hashes)
+                    metadata_hash = self._store_payload(cur, metadata, stored_hashes)
+                    inline_metadata = {key: metadata[key] for key in INLINE_METADATA_KEYS
+                                       if isinstance(metadata, dict) and key in metadata}
+                    self._execute_prepared(cur, 'insert_training_data', (
+                        row['dataset_name'], row['content_type'], raw_hash, processed_hash, metadata_hash,
+                        json.dumps(inline_metadata, ensure_ascii=False), row['quality_score']))
+                    dataset_ids.append(cur.fetchone()[0])
+        self._remember_payload_hashes(stored_hashes)
+        return dataset_ids
     
     def get_training_data_for_gemini(self, limit=1000):
         """Gemini 학습용 데이터를 조회합니다."""
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT 
-                        td.dataset_name,
-                        td.content_type,
-                        td.processed_data,
-                        td.metadata,
-                        ep.emotion_type,
-                        ep.trigger_words,
-                        tta.tone_name,
-                        tta.linguistic_features
-                    FROM training_datasets td
-                    LEFT JOIN emotion_patterns ep ON (td.metadata->>'emotion_type') = ep.emotion_type
-                    LEFT JOIN taunt_tone_analysis tta ON (td.metadata->>'tone') = tta.tone_name
-                    WHERE td.validation_status = 'approved'
-                    AND td.quality_score >= 7.0
-                    ORDER BY td.created_at DESC
-                    LIMIT %s;
-                """, (limit,))
-                return cur.fetchall()
+                self._execute_prepared(cur, 'select_training_data_for_gemini', (limit,))
+                rows = cur.fetchall()
+                
+                # 블롭으로 분리 저장된 페이로드를 원래 컬럼 자리에 복원
+                payloads = self._load_payloads(cur, [
+                    row[column] for row in rows
+                    for column in ('processed_data_hash', 'metadata_hash')
+                ])
+                for row in rows:
+                    for column in ('processed_data', 'metadata'):
+                        content_hash = row.pop(f'{column}_hash')
+                        if content_hash in payloads:
+                            row[column] = json.loads(payloads[content_hash])
+                return rows
+    
+    def migrate_inline_training_payloads(self, batch_size=500):
+        """기존 행의 인라인 JSONB 페이로드를 블롭 저장소로 옮깁니다."""
+        migrated = 0
+        while True:
+            stored_hashes = []
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT id, raw_data, processed_data, metadata
+                        FROM training_datasets
+                        WHERE (raw_data IS NOT NULL AND raw_data_hash IS NULL)
+                           OR (processed_data IS NOT NULL AND processed_data_hash IS NULL)
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED;
+                    """, (batch_size,))
+                    rows = cur.fetchall()
+                    for dataset_id, raw_data, processed_data, metadata in rows:
+                        inline_metadata = {key: metadata[key] for key in INLINE_METADATA_KEYS
+                                           if isinstance(metadata, dict) and key in metadata}
+                        cur.execute("""
+                            UPDATE training_datasets
+                            SET raw_data_hash = %s, processed_data_hash = %s, metadata_hash = %s,
+                                raw_data = NULL, processed_data = NULL, metadata = %s,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE id = %s;
+                        """, (self._store_payload(cur, raw_data, stored_hashes),
+                              self._store_payload(cur, processed_data, stored_hashes),
+                              self._store_payload(cur, metadata, stored_hashes),
+                              json.dumps(inline_metadata, ensure_ascii=False), dataset_id))
+            self._remember_payload_hashes(stored_hashes)
+            migrated += len(rows)
+            if len(rows) < batch_size:
+                break
+        
+        print(f"✅ {migrated}개 학습 데이터 페이로드를 블롭 저장소로 이전했습니다.")
+        return migrated
     
     def insert_qa_history(self, session_id, question_text, question_type, user_input, 
                          generated_response, response_metadata, quality_metrics, 
@@ -258,18 +570,12 @@ class TauntResearchDB:
         """질문-답변 히스토리를 저장합니다."""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO qa_history 
-                    (session_id, question_text, question_type, user_input, generated_response,
-                     response_metadata, quality_metrics, emotion_analysis, tone_used,
-                     target_subject, keywords, response_length, safety_analysis, development_notes)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id;
-                """, (session_id, question_text, question_type, json.dumps(user_input),
-                      generated_response, json.dumps(response_metadata), 
-                      json.dumps(quality_metrics), json.dumps(emotion_analysis),
-                      tone_used, target_subject, keywords, response_length,
-                      json.dumps(safety_analysis), development_notes))
+                self._execute_prepared(cur, 'insert_qa_history', (
+                    session_id, question_text, question_type, json.dumps(user_input),
+                    generated_response, json.dumps(response_metadata), 
+                    json.dumps(quality_metrics), json.dumps(emotion_analysis),
+                    tone_used, target_subject, keywords, response_length,
+                    json.dumps(safety_analysis), development_notes))
                 return cur.fetchone()[0]
     
     def insert_development_request(self, feature_name, feature_type, description, 
@@ -333,15 +639,10 @@ class TauntResearchDB:
         """고급 기법 탐지 결과를 저장합니다."""
         with self.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO technique_detection_log 
-                    (qa_history_id, technique_name, technique_type, detection_confidence,
-                     detected_elements, text_sample, tone_used, target_subject, effectiveness_score)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id;
-                """, (qa_history_id, technique_name, technique_type, detection_confidence,
-                      json.dumps(detected_elements), text_sample, tone_used, target_subject,
-                      effectiveness_score))
+                self._execute_prepared(cur, 'insert_technique_detection', (
+                    qa_history_id, technique_name, technique_type, detection_confidence,
+                    json.dumps(detected_elements), text_sample, tone_used, target_subject,
+                    effectiveness_score))
                 return cur.fetchone()[0]
     
     def get_technique_usage_statistics(self, technique_name=None):
@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', 'http_cache')
+HTTP_TIMEOUT = (float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5)), float(os.environ.get('HTTP_READ_TIMEOUT', 20)))
+DEFAULT_RATE_LIMIT = 1.0    # data_sources에 rate_limit이 없는 호스트의 초당 요청 수
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))
+HTTP_BACKOFF_SECONDS = float(os.environ.get('HTTP_BACKOFF_SECONDS', 0.5))
+HTTP_BACKOFF_MAX_SECONDS = 30.0
+# 잠시 후 다시 보내면 성공할 수 있는 응답 (요청 과다, 서버 일시 오류)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """초당 rate개씩 토큰이 차는 버킷. 토큰이 없으면 생길 때까지 기다립니다."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 가져가고 기다린 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class FetchResult:
+    """조건부 GET 결과. 304면 디스크 캐시의 본문을 그대로 돌려줍니다."""
+
+    def __init__(self, url, status_code, content, headers, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class CachedHttpFetcher:
+    """keep-alive 세션 풀 + 호스트별 토큰 버킷 + ETag/Last-Modified 디스크 캐시를 쓰는 HTTP 수집기
+
+    연결 오류, 429, 5xx 응답은 지수 백오프(지터 포함, Retry-After 우선)로 max_retries번까지 다시 보냅니다.
+    재시도도 호스트 버킷의 토큰을 씁니다.
+    """
+
+    def __init__(self, data_sources=None, cache_dir=HTTP_CACHE_DIR, timeout=HTTP_TIMEOUT, pool_size=10,
+                 max_retries=HTTP_MAX_RETRIES, backoff_seconds=HTTP_BACKOFF_SECONDS):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.buckets = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'bytes_downloaded': 0, 'rate_limit_wait_seconds': 0.0,
+                      'retries': 0, 'backoff_seconds': 0.0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        if data_sources:
+            self.configure_rate_limits(data_sources)
+
+    def configure_rate_limits(self, data_sources):
+        """data_sources의 엔드포인트 호스트마다 rate_limit(초당 요청 수)으로 버킷을 만듭니다."""
+        for source in data_sources.values():
+            rate = source.get('rate_limit', DEFAULT_RATE_LIMIT)
+            for key, value in source.items():
+                if isinstance(value, str) and value.startswith(('http://', 'https://')):
+                    self.buckets[urlsplit(value).netloc] = TokenBucket(rate)
+
+    def _bucket(self, host):
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(DEFAULT_RATE_LIMIT)
+            return self.buckets[host]
+
+    def _cache_paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def _load_cached(self, url):
+        meta_path, body_path = self._cache_paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def _store(self, url, response):
+        meta_path, body_path = self._cache_paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'fetched_at': datetime.now().isoformat()
+        }
+        # 본문 → 메타 순으로 rename 해서 메타가 있으면 본문도 항상 있도록
+        for path, data, mode in ((body_path, response.content, 'wb'),
+                                 (meta_path, json.dumps(meta, ensure_ascii=False), 'w')):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, mode, **({} if mode == 'wb' else {'encoding': 'utf-8'})) as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+    def fetch(self, url, params=None, headers=None):
+        """GET 요청. 캐시에 검증자가 있으면 조건부 요청을 보내고, 304면 캐시 본문을 반환합니다."""
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()))}"
+        request_headers = dict(headers or {})
+        meta, cached_body = self._load_cached(url)
+        if meta:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self._get_with_retries(url, request_headers)
+
+        if response.status_code == 304 and cached_body is not None:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            logging.info(f"♻️ 변경 없음 (304), 캐시 사용: {url}")
+            return FetchResult(url, 200, cached_body, {'Content-Type': meta.get('content_type')}, True)
+
+        if response.status_code == 200 and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            self._store(url, response)
+        return FetchResult(url, response.status_code, response.content, response.headers, False)
+
+    def _backoff_delay(self, attempt, response=None):
+        """attempt번째 재시도 전 대기 시간. 서버가 Retry-After(초)를 주면 그 값을 따릅니다."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(HTTP_BACKOFF_MAX_SECONDS, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        delay = min(HTTP_BACKOFF_MAX_SECONDS, self.backoff_seconds * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _get_with_retries(self, url, request_headers):
+        bucket = self._bucket(urlsplit(url).netloc)
+        for attempt in range(self.max_retries + 1):
+            waited = bucket.acquire()
+            with self._lock:
+                self.stats['requests'] += 1
+                self.stats['rate_limit_wait_seconds'] += waited
+            try:
+                response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logging.warning(f"⚠️ 요청 실패 ({type(e).__name__}), {delay:.2f}초 후 재시도 "
+                                f"({attempt + 1}/{self.max_retries}): {url}")
+            else:
+                with self._lock:
+                    self.stats['bytes_downloaded'] += len(response.content)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                logging.warning(f"⚠️ HTTP {response.status_code}, {delay:.2f}초 후 재시도 "
+                                f"({attempt + 1}/{self.max_retries}): {url}")
+            with self._lock:
+                self.stats['retries'] += 1
+                self.stats['backoff_seconds'] += delay
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    # 로컬 대역 서버: ETag가 같으면 304를 돌려줍니다.
+    body = json.dumps({'data': {'children': [{'data': {'title': '서울 월세 실화?'}}]}}, ensure_ascii=False).encode('utf-8')
+    etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}/r/korea.json"
+
+    fetcher = CachedHttpFetcher({'stand_in': {'api_endpoint': endpoint, 'rate_limit': 2}},
+                                cache_dir=tempfile.mkdtemp(prefix='http_cache_'))
+    for attempt in range(3):
+        result = fetcher.fetch(endpoint)
+        print(f"#{attempt + 1} status={result.status_code} from_cache={result.from_cache} "
+              f"title={result.json()['data']['children'][0]['data']['title']}")
+    print(f"📊 {fetcher.stats}")
+    fetcher.close()
+    server.shutdown()
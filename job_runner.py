@@ -0,0 +1,246 @@
+import os
+import json
+import uuid
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+JOB_DB_PATH = os.environ.get('JOB_DB_PATH', 'admin_jobs.sqlite3')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+# 실행 중인 워커가 자기 작업의 heartbeat_at을 갱신하는 주기와, 갱신이 끊긴 작업을 중단으로 볼 기준 (초)
+JOB_HEARTBEAT_SECONDS = float(os.environ.get('JOB_HEARTBEAT_SECONDS', 10))
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', 60))
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """취소 요청을 받은 작업이 다음 확인 지점에서 중단할 때 사용하는 예외"""
+
+
+class JobContext:
+    """작업 함수에 넘겨지는 진행률 보고/취소 확인용 핸들"""
+
+    def __init__(self, runner, job_id):
+        self.runner = runner
+        self.job_id = job_id
+
+    @property
+    def cancel_requested(self):
+        # 취소 요청은 다른 워커 프로세스에서 올 수 있으므로 작업 테이블의 플래그를 읽습니다.
+        return self.runner._cancel_flag(self.job_id)
+
+    def check_cancelled(self):
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    def progress(self, fraction, message=None):
+        """진행률(0~1)과 메시지를 기록합니다. 취소 요청이 있으면 여기서 중단됩니다."""
+        self.runner._update(self.job_id, progress=max(0.0, min(1.0, fraction)), message=message)
+        self.check_cancelled()
+
+
+class JobRunner:
+    """오래 걸리는 관리자 작업을 스레드 풀에서 실행하고 상태를 SQLite 작업 테이블에 남기는 실행기"""
+
+    def __init__(self, db_path=JOB_DB_PATH, max_workers=JOB_WORKERS):
+        self.db_path = db_path
+        self.handlers = {}
+        self.validators = {}
+        self.futures = {}
+        self.owner_pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='admin-job')
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._init_table()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='admin-job-heartbeat', daemon=True)
+        self._heartbeat_thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_table(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS admin_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL DEFAULT 0,
+                    message TEXT,
+                    params TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    owner_pid INTEGER,
+                    heartbeat_at TEXT,
+                    cancel_requested INTEGER DEFAULT 0
+                );
+            """)
+            # 소유자/heartbeat/취소 플래그가 없던 기존 테이블에 컬럼 추가
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(admin_jobs);")}
+            for name, definition in (('owner_pid', 'INTEGER'), ('heartbeat_at', 'TEXT'),
+                                     ('cancel_requested', 'INTEGER DEFAULT 0')):
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE admin_jobs ADD COLUMN {name} {definition};")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_admin_jobs_kind_created ON admin_jobs (kind, created_at);")
+            # 같은 PID로 다시 뜬 경우 이전 프로세스가 남긴 작업은 이 프로세스가 이어받을 수 없으므로 중단 처리
+            conn.execute("""
+                UPDATE admin_jobs SET status = 'failed', error = '서버 재시작으로 중단됨', finished_at = ?
+                WHERE status IN ('queued', 'running') AND owner_pid = ?;
+            """, (datetime.now().isoformat(), self.owner_pid))
+        self._sweep_stale()
+
+    def _sweep_stale(self):
+        """heartbeat가 JOB_STALE_SECONDS 넘게 끊긴 다른 워커의 작업만 중단된 것으로 표시합니다."""
+        now = datetime.now()
+        stale_before = (now - timedelta(seconds=JOB_STALE_SECONDS)).isoformat()
+        with self._connect() as conn:
+            swept = conn.execute("""
+                UPDATE admin_jobs SET status = 'failed', error = '서버 재시작으로 중단됨', finished_at = ?
+                WHERE status IN ('queued', 'running') AND owner_pid IS NOT ?
+                  AND (heartbeat_at IS NULL OR heartbeat_at < ?);
+            """, (now.isoformat(), self.owner_pid, stale_before)).rowcount
+        if swept:
+            logging.warning(f"⚠️ heartbeat가 끊긴 작업 {swept}개를 중단 처리했습니다.")
+
+    def _heartbeat_loop(self):
+        """이 프로세스가 가진 작업의 heartbeat를 갱신하고, 죽은 워커의 작업을 정리합니다."""
+        while not self._stopped.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                with self._connect() as conn:
+                    conn.execute("""
+                        UPDATE admin_jobs SET heartbeat_at = ?
+                        WHERE owner_pid = ? AND status IN ('queued', 'running');
+                    """, (datetime.now().isoformat(), self.owner_pid))
+                self._sweep_stale()
+            except Exception as e:
+                logging.error(f"작업 heartbeat 갱신 오류: {str(e)}")
+
+    def stop(self):
+        """heartbeat 스레드를 멈춥니다."""
+        self._stopped.set()
+        self._heartbeat_thread.join()
+
+    def _cancel_flag(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM admin_jobs WHERE id = ?;", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def register(self, kind, handler, validate=None):
+        """작업 종류별 실행 함수를 등록합니다. handler(job, **params) → JSON 직렬화 가능한 결과
+
+        validate(params)는 허용된 파라미터만 검사·정규화해 반환하고, 잘못되면 ValueError를 냅니다.
+        validate가 없는 종류는 파라미터를 받지 않습니다.
+        """
+        self.handlers[kind] = handler
+        if validate is not None:
+            self.validators[kind] = validate
+
+    def _update(self, job_id, **fields):
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE admin_jobs SET {columns} WHERE id = ?;", (*fields.values(), job_id))
+
+    def submit(self, kind, params=None):
+        """작업을 큐에 넣고 작업 ID를 바로 반환합니다."""
+        if kind not in self.handlers:
+            raise ValueError(f"알 수 없는 작업 종류입니다: {kind}")
+        params = params or {}
+        if not isinstance(params, dict):
+            raise ValueError("작업 파라미터는 객체여야 합니다.")
+        validate = self.validators.get(kind)
+        if validate is not None:
+            params = validate(params)
+        elif params:
+            raise ValueError(f"{kind} 작업은 파라미터를 받지 않습니다: {', '.join(sorted(params))}")
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO admin_jobs (id, kind, status, params, created_at, owner_pid, heartbeat_at)
+                VALUES (?, ?, 'queued', ?, ?, ?, ?);
+            """, (job_id, kind, json.dumps(params, ensure_ascii=False), now, self.owner_pid, now))
+        with self._lock:
+            self.futures[job_id] = self._executor.submit(self._run, job_id, kind, params)
+        logging.info(f"🗂️ 작업 등록: {kind} ({job_id})")
+        return job_id
+
+    def _run(self, job_id, kind, params):
+        job = JobContext(self, job_id)
+        try:
+            job.check_cancelled()
+            self._update(job_id, status='running', started_at=datetime.now().isoformat())
+            result = self.handlers[kind](job, **params)
+            job.check_cancelled()
+            self._update(job_id, status='succeeded', progress=1.0, finished_at=datetime.now().isoformat(),
+                         result=json.dumps(result, ensure_ascii=False, default=str))
+        except JobCancelled:
+            self._update(job_id, status='cancelled', finished_at=datetime.now().isoformat())
+            logging.info(f"🛑 작업 취소됨: {kind} ({job_id})")
+        except Exception as e:
+            logging.error(f"작업 실패: {kind} ({job_id}): {str(e)}")
+            self._update(job_id, status='failed', error=str(e), finished_at=datetime.now().isoformat())
+        finally:
+            with self._lock:
+                self.futures.pop(job_id, None)
+
+    def cancel(self, job_id):
+        """대기 중이면 바로 취소하고, 실행 중이면 다음 확인 지점에서 멈추도록 요청합니다.
+
+        다른 워커 프로세스가 가진 작업도 테이블의 cancel_requested 플래그로 전달됩니다.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job['status'] in FINISHED_STATUSES:
+            return job
+        with self._lock:
+            future = self.futures.get(job_id)
+            if future is not None and future.cancel():
+                self.futures.pop(job_id, None)
+                self._update(job_id, status='cancelled', finished_at=datetime.now().isoformat())
+            else:
+                self._update(job_id, cancel_requested=1, message='취소 요청됨')
+        return self.get(job_id)
+
+    @staticmethod
+    def _row_to_job(row, include_result=False):
+        job = {key: row[key] for key in row.keys() if key != 'result'}
+        job['params'] = json.loads(row['params']) if row['params'] else {}
+        if include_result:
+            job['result'] = json.loads(row['result']) if row['result'] else None
+        return job
+
+    def get(self, job_id, include_result=False):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM admin_jobs WHERE id = ?;", (job_id,)).fetchone()
+        return self._row_to_job(row, include_result) if row else None
+
+    def list_jobs(self, kind=None, limit=20):
+        query = "SELECT * FROM admin_jobs"
+        params = []
+        if kind:
+            query += " WHERE kind = ?"
+            params.append(kind)
+        query += " ORDER BY created_at DESC LIMIT ?;"
+        with self._connect() as conn:
+            rows = conn.execute(query, (*params, limit)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def latest_result(self, kind):
+        """해당 종류의 가장 최근 성공 작업 결과 (없으면 None)"""
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT * FROM admin_jobs WHERE kind = ? AND status = 'succeeded'
+                ORDER BY finished_at DESC LIMIT 1;
+            """, (kind,)).fetchone()
+        return self._row_to_job(row, include_result=True)['result'] if row else None
@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import codecs
+import logging
+
+JSON_STREAM_CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\r\n'
+# 덩어리 끝에서 잘렸을 수 있는 숫자 꼬리 ('1.', '1e', '-' 등)
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+_LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity')
+
+
+def _is_truncated(error, buffer):
+    """덩어리 끝에서 값이 잘려 난 오류인지 (더 읽으면 풀릴 수 있는지). 아니면 실제 문법 오류입니다."""
+    if error.msg.startswith('Unterminated string') or _NUMBER_TAIL.fullmatch(buffer, error.pos):
+        return True
+    tail = buffer[error.pos:]
+    return error.msg == 'Expecting value' and any(literal.startswith(tail) for literal in _LITERALS)
+
+
+def iter_json_records(source, chunk_size=JSON_STREAM_CHUNK_SIZE):
+    """경로나 파일 객체에서 JSON 레코드를 하나씩 읽어 내보냅니다. 파일 전체를 메모리에 올리지 않습니다.
+
+    '[...]' 배열이면 원소를, NDJSON(줄마다 객체)이면 각 줄을 내보냅니다. 배열 앞에 설명 글이 붙은
+    덤프는 첫 '['까지 건너뜁니다. '{'로 시작하지만 첫 줄이 JSON 하나로 읽히지 않으면 들여쓰기되거나
+    이어 붙은 객체 스트림으로 보고 값 단위로 읽습니다. NDJSON에서 파싱할 수 없는 줄은 로그를 남기고
+    건너뛰고, 배열/객체 스트림의 문법 오류는 로그를 남기고 거기서 멈춥니다. 텍스트/바이너리 파일 객체 모두 받습니다.
+    """
+    owns_file = isinstance(source, (str, os.PathLike))
+    f = open(source, 'rb') if owns_file else source
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    state = {'buffer': '', 'pos': 0, 'eof': False}
+
+    def fill():
+        """버퍼에 한 덩어리를 더 읽어 붙입니다. 이미 소비한 앞부분은 버립니다.
+
+        남은 버퍼보다 작게 읽지 않으므로 큰 레코드 하나를 채울 때도 복사량이 레코드 크기에 비례합니다.
+        """
+        raw = f.read(max(chunk_size, len(state['buffer']) - state['pos']))
+        # 여러 바이트 글자의 앞부분만 읽으면 디코딩 결과가 비어도 파일 끝이 아닙니다.
+        chunk = text_decoder.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+        if not raw:
+            state['eof'] = True
+        state['buffer'] = state['buffer'][state['pos']:] + chunk
+        state['pos'] = 0
+
+    def next_char(skip=_WHITESPACE):
+        """skip에 든 글자를 넘기고 다음 글자를 반환합니다 (소비하지 않음). 파일 끝이면 None"""
+        while True:
+            buffer, pos = state['buffer'], state['pos']
+            while pos < len(buffer) and buffer[pos] in skip:
+                pos += 1
+            state['pos'] = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if state['eof']:
+                return None
+            fill()
+
+    def next_line():
+        """다음 줄을 개행 없이 반환합니다. 파일 끝이면 None (줄 시작 위치는 state['line_start'])"""
+        scanned = state['pos']
+        while True:
+            newline = state['buffer'].find('\n', scanned)
+            if newline != -1:
+                state['line_start'] = state['pos']
+                line = state['buffer'][state['pos']:newline]
+                state['pos'] = newline + 1
+                return line
+            if state['eof']:
+                if state['pos'] >= len(state['buffer']):
+                    return None
+                state['line_start'] = state['pos']
+                line = state['buffer'][state['pos']:]
+                state['pos'] = len(state['buffer'])
+                return line
+            scanned = len(state['buffer']) - state['pos']
+            fill()
+
+    def decode_value():
+        while True:
+            buffer, pos = state['buffer'], state['pos']
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # 덩어리 경계에서 잘린 값일 때만 더 읽고 다시 시도
+                if state['eof'] or not _is_truncated(e, buffer):
+                    raise
+                fill()
+                continue
+            if not state['eof'] and _NUMBER_TAIL.fullmatch(buffer, end):
+                # 버퍼 끝까지 이어진 값(잘린 숫자일 수 있음): 더 읽고 다시 decode
+                fill()
+                continue
+            state['pos'] = end
+            return value
+
+    try:
+        first = next_char()
+        if first is None:
+            return
+        if first not in '[{':
+            # 설명 글이 앞에 붙은 덤프: 첫 '['부터 배열로 읽습니다.
+            while True:
+                start = state['buffer'].find('[', state['pos'])
+                if start != -1:
+                    state['pos'] = start
+                    break
+                state['pos'] = len(state['buffer'])
+                if state['eof']:
+                    logging.error("JSON 배열 시작('[')을 찾을 수 없습니다.")
+                    return
+                fill()
+            first = '['
+
+        if first == '[':
+            state['pos'] += 1
+            while True:
+                char = next_char(skip=_WHITESPACE + ',')
+                if char == ']' or char is None:
+                    return
+                yield decode_value()
+        else:
+            line_number, skipped = 0, 0
+            while True:
+                line = next_line()
+                if line is None:
+                    break
+                line_number += 1
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    if line_number == 1:
+                        # 첫 줄부터 안 읽히면 NDJSON이 아니라 들여쓰기/이어 붙인 객체 스트림: 줄 처음부터 값 단위로
+                        state['pos'] = state['line_start']
+                        while next_char() is not None:
+                            yield decode_value()
+                        return
+                    skipped += 1
+                    logging.warning(f"⚠️ NDJSON {line_number}번째 줄을 건너뜁니다: {str(e)}")
+                    continue
+                yield record
+            if skipped:
+                logging.warning(f"⚠️ NDJSON {line_number}줄 중 파싱 실패 {skipped}줄을 건너뛰었습니다.")
+    except json.JSONDecodeError as e:
+        logging.error(f"JSON 스트림 파싱 오류: {str(e)}")
+    finally:
+        if owns_file:
+            f.close()
+
+
+if __name__ == "__main__":
+    import io
+    import tempfile
+
+    posts = [{'title': f"서울 월세 실화? #{number}", 'content': '진짜 숨이 막히네요 ㅠㅠ', 'score': number}
+             for number in range(5)]
+    dump = "다음은 수집한 Reddit 데이터입니다:\n" + json.dumps(posts, ensure_ascii=False, indent=2)
+    print(f"배열(설명 글 포함): {[post['score'] for post in iter_json_records(io.StringIO(dump), chunk_size=16)]}")
+
+    path = os.path.join(tempfile.mkdtemp(prefix='json_stream_'), 'posts.ndjson')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(post, ensure_ascii=False) + '\n' for post in posts)
+    print(f"NDJSON: {[post['score'] for post in iter_json_records(path, chunk_size=7)]}")
+
+    pretty = '\n'.join(json.dumps(post, ensure_ascii=False, indent=2) for post in posts)
+    print(f"들여쓴 객체 스트림: {[post['score'] for post in iter_json_records(io.StringIO(pretty), chunk_size=16)]}")
@@ -0,0 +1,146 @@
+import re
+import unicodedata
+
+# 한 번의 finditer로 텍스트 전체를 토큰 종류별로 훑습니다. 순서가 우선순위입니다.
+_TOKEN = re.compile(r"""
+    (?P<hangul>[가-힣]+)
+  | (?P<jamo>[ㄱ-ㅎㅏ-ㅣ]+)
+  | (?P<ellipsis>\.{2,}|…+)
+  | (?P<terminal>[.!?]+)
+  | (?P<latin>[A-Za-z]+)
+  | (?P<digit>[0-9]+)
+  | (?P<space>\s+)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+_KOREAN = re.compile(r'[ㄱ-ㅎㅏ-ㅣ가-힣]')
+
+# 자모 반복 통계를 따로 세는 글자 (ㅜ는 ㅠ와 같은 울음 표현으로 묶음)
+JAMO_RUN_KEYS = {'ㅋ': 'ㅋ', 'ㅎ': 'ㅎ', 'ㅠ': 'ㅠ', 'ㅜ': 'ㅠ'}
+# 어절 끝 어미로 격식성을 봅니다. 긴 어미를 먼저 확인합니다.
+FORMAL_ENDINGS = ('습니다', '습니까', '십시오')
+_FINAL_BIEUP = 17  # 음절 받침 번호 ㅂ: 합니다/입니다/하십니까 같은 -ㅂ니다 체
+POLITE_ENDINGS = ('세요', '어요', '아요', '에요', '예요', '해요', '네요', '죠', '요')
+INFORMAL_ENDINGS = ('해', '야', '지', '냐', '니', '네', '임', '음', '함', '셈', '다', '자')
+# NFKC는 호환 자모(ㅋ)를 조합형 자모(ᄏ)로 바꾸므로 정규화 후 다시 호환 자모로 되돌립니다.
+_COMPAT_JAMO = {ord(unicodedata.normalize('NFKC', chr(code))): chr(code)
+                for code in range(0x3131, 0x3164)
+                if len(unicodedata.normalize('NFKC', chr(code))) == 1}
+
+
+def contains_korean(text):
+    """한글(음절 또는 자모)이 하나라도 있는지"""
+    return bool(text) and _KOREAN.search(text) is not None
+
+
+def _ending_register(word):
+    if word.endswith(FORMAL_ENDINGS):
+        return 'formal'
+    if len(word) >= 3 and word.endswith(('니다', '니까')) and (ord(word[-3]) - 0xAC00) % 28 == _FINAL_BIEUP:
+        return 'formal'
+    if word.endswith(POLITE_ENDINGS):
+        return 'polite'
+    if word.endswith(INFORMAL_ENDINGS):
+        return 'informal'
+    return None
+
+
+def analyze_text(text):
+    """텍스트를 한 번 훑어 정규화 형태와 한국어 특징(한글 비율, 자모 반복, 문장부호, 문장 수, 격식성)을 반환합니다.
+
+    정규화 형태는 analysis_cache.normalize_content(NFKC, 공백 정리, 소문자)와 같되 ㅋ/ㅠ 같은 자모는 그대로 둡니다.
+    """
+    text = unicodedata.normalize('NFKC', text or '').translate(_COMPAT_JAMO)
+    pieces = []
+    jamo_runs = {key: {'runs': 0, 'chars': 0, 'max_run': 0} for key in ('ㅋ', 'ㅎ', 'ㅠ')}
+    punctuation = {'?': 0, '!': 0, '.': 0, 'ellipsis': 0, 'other': 0}
+    endings = {'formal': 0, 'polite': 0, 'informal': 0}
+    korean_chars = 0
+    visible_chars = 0
+    sentence_count = 0
+    open_sentence = False
+
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == 'space':
+            if pieces:
+                pieces.append(' ')
+            continue
+        visible_chars += len(token)
+        if kind == 'hangul':
+            korean_chars += len(token)
+            register = _ending_register(token)
+            if register:
+                endings[register] += 1
+            open_sentence = True
+        elif kind == 'jamo':
+            korean_chars += len(token)
+            # 'ㅋㅋㅎㅎ'처럼 섞인 토큰은 같은 글자끼리 나눠 셉니다.
+            start = 0
+            for index in range(1, len(token) + 1):
+                if index == len(token) or token[index] != token[start]:
+                    key = JAMO_RUN_KEYS.get(token[start])
+                    if key:
+                        run = index - start
+                        stats = jamo_runs[key]
+                        stats['runs'] += 1
+                        stats['chars'] += run
+                        stats['max_run'] = max(stats['max_run'], run)
+                    start = index
+            open_sentence = True
+        elif kind == 'ellipsis':
+            punctuation['ellipsis'] += 1
+        elif kind == 'terminal':
+            for char in token:
+                punctuation[char] += 1
+            if open_sentence:
+                sentence_count += 1
+                open_sentence = False
+        elif kind == 'other':
+            if unicodedata.category(token).startswith('P'):
+                punctuation['other'] += 1
+            else:
+                open_sentence = True
+        else:
+            open_sentence = True
+        pieces.append(token)
+
+    if open_sentence:
+        sentence_count += 1
+    if pieces and pieces[-1] == ' ':
+        pieces.pop()
+
+    if endings['formal']:
+        formality = 'high'
+    elif endings['informal'] > endings['polite'] or jamo_runs['ㅋ']['runs']:
+        formality = 'low'
+    else:
+        formality = 'medium'
+
+    return {
+        'normalized': ''.join(pieces).lower(),
+        'length': len(text),
+        'has_korean': korean_chars > 0,
+        'hangul_ratio': round(korean_chars / visible_chars, 3) if visible_chars else 0.0,
+        'jamo_runs': jamo_runs,
+        'punctuation': punctuation,
+        'sentence_count': sentence_count,
+        'endings': endings,
+        'formality_level': formality
+    }
+
+
+def analyze_texts(texts):
+    """analyze_text의 목록 버전 (입력 순서 유지)"""
+    return [analyze_text(text) for text in texts]
+
+
+if __name__ == "__main__":
+    samples = [
+        '이거 진짜 개웃기네ㅋㅋㅋㅋ 완전 레전드!! 실화냐?',
+        '고생 많으십니다. 항상 건강 조심하세요...',
+        'ㅠㅠㅠ 월세 또 올랐어요 ㅎㅎ;; MZ는 어떻게 살라고',
+        'Seoul rent is CRAZY'
+    ]
+    for sample, features in zip(samples, analyze_texts(samples)):
+        print(f"{sample}\n  → {features}")
@@ -4,8 +4,11 @@ import os
 import logging
 import sys
 import json
+import re
+import time
+import uuid
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, send_from_directory, url_for
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Google Gemini API 라이브러리 임포트
@@ -14,6 +17,11 @@ import google.generativeai as genai
 # 내부 모듈 임포트
 from prompt_builder import get_research_enhanced_prompt
 from prompt_config import TONE_DESCRIPTIONS
+from streaming_sketches import StreamingSketches
+from realtime_metrics import RealtimeMetrics
+from chart_service import ChartService
+from job_runner import JobRunner
+from quota_governor import gemini_governor, is_quota_error, INTERACTIVE
 
 DATABASE_AVAILABLE = False # 데이터베이스 관련 기능 비활성화
 
@@ -42,6 +50,15 @@ else:
     genai.configure(api_key=GEMINI_API_KEY)
     logging.info("Google Gemini API가 설정되었습니다.")
 
+# 고유 사용자/인기 키워드 근사 집계용 스케치 (워커별로 주기 저장, 조회 시 병합)
+usage_sketches = StreamingSketches().start()
+# 실시간 처리량/지연 지표용 워커별 링 버퍼
+realtime_metrics = RealtimeMetrics().start()
+# 보고서 차트는 별도 프로세스에서만 렌더링하고, 요청 스레드는 캐시 파일만 내려줍니다.
+chart_service = ChartService()
+# 오래 걸리는 관리자 작업은 요청 스레드 대신 작업 실행기에서 처리하고 작업 ID만 돌려줍니다.
+job_runner = JobRunner()
+
 
 
 
@@ -70,6 +87,7 @@ def generate_taunt_text():
         logging.error("API 키가 설정되지 않아 텍스트 생성을 수행할 수 없습니다.")
         return jsonify({'status': 'error', 'message': '서버 설정 오류: Gemini API 키가 설정되지 않았습니다.'}), 500
 
+    started = time.perf_counter()
     try:
         data = request.get_json()
         target = data.get('target')
@@ -88,9 +106,12 @@ def generate_taunt_text():
         prompt_text = get_research_enhanced_prompt(target, keywords, tone, darkness_level, length, optimized_for_json=True)
 
         # 2. Gemini API 호출 1회 (JSON 모드)
+        # 배치 작업과 같은 할당량을 쓰므로 공용 제어기의 사용자 우선 레인으로 호출
         model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(
+        response = gemini_governor.call(
+            model.generate_content,
             prompt_text,
+            lane=INTERACTIVE,
             generation_config=genai.types.GenerationConfig(response_mime_type="application/json")
         )
         
@@ -104,6 +125,10 @@ def generate_taunt_text():
             generated_text = response.text.strip()
             post_generation_safety_analysis = {'is_safe': True, 'safety_message': '기본 안전성 검사를 통과했습니다.'}
 
+        sketch_session_id = session.setdefault('sketch_session_id', uuid.uuid4().hex)
+        usage_sketches.record(sketch_session_id, tone,
+                              [keyword for keyword in re.split(r'[,\s]+', keywords) if keyword], target)
+
         logging.info(f"생성된 조롱 텍스트: {generated_text[:100]}...")
         logging.info(f"안전성 검사 결과: {post_generation_safety_analysis}")
 
@@ -139,6 +164,10 @@ def generate_taunt_text():
             'predicted_virality': 'High' if len(emotion_strategies) >= 2 else 'Medium'
         }
 
+        realtime_metrics.record(tone, darkness_level, len(generated_text),
+                                (time.perf_counter() - started) * 1000,
+                                post_generation_safety_analysis.get('is_safe', True))
+
         return jsonify({
             'status': 'success',
             'letter': generated_text,
@@ -154,6 +183,8 @@ def generate_taunt_text():
 
     except Exception as e:
         logging.error(f"조롱 텍스트 생성 중 서버 오류: {str(e)}")
+        if is_quota_error(e):
+            return jsonify({'status': 'error', 'message': '요청이 많아 잠시 후 다시 시도해주세요.'}), 503
         if "API key not valid" in str(e):
              return jsonify({'status': 'error', 'message': 'API 키 문제: Google Gemini API 키를 확인해주세요.'}), 500
         return jsonify({'status': 'error', 'message': f'텍스트 생성 중 오류가 발생했습니다: {str(e)}'}), 500
@@ -193,8 +224,10 @@ def analyze_taunt():
 중요: 모든 텍스트는 반드시 한국어로 작성하고, 영어 단어나 문장은 사용하지 마세요."""
 
         model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(
+        response = gemini_governor.call(
+            model.generate_content,
             analysis_prompt,
+            lane=INTERACTIVE,
             generation_config=genai.types.GenerationConfig(response_mime_type="application/json")
         )
 
@@ -211,6 +244,8 @@ def analyze_taunt():
         return jsonify({ 'status': 'error', 'message': '분석 결과를 처리하는데 실패했습니다.' }), 500
     except Exception as e:
         logging.error(f"조롱 텍스트 분석 실패: {str(e)}")
+        if is_quota_error(e):
+            return jsonify({ 'status': 'error', 'message': '요청이 많아 잠시 후 다시 시도해주세요.' }), 503
         return jsonify({ 'status': 'error', 'message': f'분석 중 오류가 발생했습니다: {str(e)}' }), 500
 
 
@@ -230,10 +265,66 @@ def get_darkness_levels():
     return jsonify({ 'status': 'success', 'levels': darkness_levels })
 
 
+@app.route('/admin/analytics/approximate', methods=['GET'])
+def get_approximate_analytics():
+    """스케치 기반 근사 통계 (고유 사용자 수, 인기 키워드/대상) - DB 스캔 없음"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        merged = usage_sketches.merged_view()
+        return jsonify({'status': 'success', 'approximate': True, 'days': days, **merged.summary(days)})
+    except Exception as e:
+        logging.error(f"근사 통계 조회 오류: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/admin/analytics/realtime', methods=['GET'])
+def get_realtime_analytics():
+    """워커별 링 버퍼를 합친 1m/5m/1h 처리량·지연 백분위 (DB 조회 없음)"""
+    try:
+        return jsonify({'status': 'success', **realtime_metrics.aggregate()})
+    except Exception as e:
+        logging.error(f"실시간 지표 조회 오류: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/admin/quota', methods=['GET'])
+def get_quota_status():
+    """공용 Gemini 속도 제어기의 현재 속도와 레인별 호출/스로틀 횟수"""
+    return jsonify({'status': 'success', 'quota': gemini_governor.summary()})
+
+
+@app.route('/admin/analytics/charts', methods=['POST'])
+def request_report_charts():
+    """보고서 JSON을 받아 차트 렌더링을 예약하고 캐시 상태/URL을 바로 반환합니다."""
+    try:
+        report = request.get_json() or {}
+        fmt = request.args.get('format', 'svg')
+        charts = chart_service.request_charts(report, fmt)
+        for chart in charts.values():
+            chart['url'] = url_for('get_report_chart', filename=chart['filename'])
+        return jsonify({'status': 'success', 'charts': charts})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logging.error(f"차트 예약 오류: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/admin/analytics/charts/<path:filename>', methods=['GET'])
+def get_report_chart(filename):
+    """캐시된 차트 파일을 내려줍니다. 렌더링 중이면 202를 반환합니다."""
+    status = chart_service.chart_status(filename)
+    if status == 'ready':
+        return send_from_directory(os.path.abspath(chart_service.cache_dir), os.path.basename(filename),
+                                   max_age=86400)
+    if status == 'pending':
+        return jsonify({'status': 'pending', 'message': '차트를 렌더링하는 중입니다.'}), 202
+    return jsonify({'status': 'error', 'message': '차트가 없습니다. 먼저 렌더링을 요청해주세요.'}), 404
+
+
 # --- 문제 해결 1: 비활성화된 관리자/분석 기능 주석 처리 ---
 # @app.route('/admin/analytics', methods=['GET']) ...
 # @app.route('/admin/analytics/download', methods=['GET']) ...
-# @app.route('/admin/analytics/realtime', methods=['GET']) ...
 # @app.route('/admin/export_training_data', methods=['GET']) ...
 # @app.route('/admin/add_cnn_development_request', methods=['POST']) ...
 # @app.route('/admin/view_development_queue', methods=['GET']) ...
@@ -398,74 +489,85 @@ def get_notion_dashboard():
             'message': str(e)
         }), 500
 
-if __name__ == '__main__':
-    logging.info("⚠️ 연구 데이터베이스 시스템을 사용할 수 없습니다. 기본 모드로 실행합니다.")
-    logging.info("🚀 기본 모드에서도 모든 핵심 기능이 정상 작동합니다!")
-    port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+
+
+def _job_accepted(job_id, message):
+    """작업 등록 직후 돌려주는 202 응답"""
+    return jsonify({
+        'status': 'accepted',
+        'message': message,
+        'job_id': job_id,
+        'status_url': url_for('get_job_status', job_id=job_id),
+        'result_url': url_for('get_job_result', job_id=job_id)
+    }), 202
+
+
+def load_reddit_training_job(job):
+    """[작업] Reddit 학습 데이터를 로드하고 처리합니다."""
+    from reddit_training_data_processor import RedditTrainingDataProcessor
+
+    processor = RedditTrainingDataProcessor()
+
+    # 2025년 Reddit 트렌드 데이터 로드
+    reddit_data = [
+        {
+            "source": "reddit_korea",
+            "title": "2025년 서울 월세 실화인가요? 종로에서 5평에 100만원이라는데…",
+            "content": "최근에 집 알아보는데 정말 숨이 턱 막히네요. 다들 이정도 내고 사시는 건가요?",
+            "score": 850,
+            "num_comments": 452,
+            "subreddit": "korea",
+            "data_type": "community_post"
+        },
+        {
+            "source": "reddit_korea", 
+            "title": "한국 직장 내 세대 갈등, 여러분 회사는 어떤가요?",
+            "content": "요즘 MZ세대랑 기성세대랑 일하는 방식 차이 때문에 스트레스 받네요.",
+            "score": 510,
+            "num_comments": 288,
+            "subreddit": "korea",
+            "data_type": "community_post"
+        }
+    ]
+
+    # 데이터 처리
+    job.progress(0.1, 'Reddit 데이터 처리 중')
+    processed_data = processor.process_reddit_data(reddit_data)
+    job.progress(0.7, '인사이트 생성 중')
+    insights = processor.generate_training_insights(processed_data)
+
+    # 결과는 작업 테이블에 저장 (쿠키 세션에 싣지 않음)
+    return {
+        'message': 'Reddit 학습 데이터 로드 완료',
+        'insights': insights,
+        'data': {
+            'total_samples': insights['total_samples'],
+            'trend_distribution': insights['trend_distribution'],
+            'top_emotion_triggers': insights['top_emotion_triggers'][:5],
+            'recommended_tones': insights['recommended_tones'][:5]
+        }
+    }
 
 
 @app.route('/admin/load_reddit_training_data', methods=['POST'])
 def load_reddit_training_data():
-    """Reddit 학습 데이터를 로드하고 처리합니다."""
+    """Reddit 학습 데이터 로드 작업을 등록하고 작업 ID를 바로 반환합니다."""
     try:
-        from reddit_training_data_processor import RedditTrainingDataProcessor
-
-        processor = RedditTrainingDataProcessor()
-
-        # 2025년 Reddit 트렌드 데이터 로드
-        reddit_data = [
-            {
-                "source": "reddit_korea",
-                "title": "2025년 서울 월세 실화인가요? 종로에서 5평에 100만원이라는데…",
-                "content": "최근에 집 알아보는데 정말 숨이 턱 막히네요. 다들 이정도 내고 사시는 건가요?",
-                "score": 850,
-                "num_comments": 452,
-                "subreddit": "korea",
-                "data_type": "community_post"
-            },
-            {
-                "source": "reddit_korea", 
-                "title": "한국 직장 내 세대 갈등, 여러분 회사는 어떤가요?",
-                "content": "요즘 MZ세대랑 기성세대랑 일하는 방식 차이 때문에 스트레스 받네요.",
-                "score": 510,
-                "num_comments": 288,
-                "subreddit": "korea",
-                "data_type": "community_post"
-            }
-        ]
-
-        # 데이터 처리
-        processed_data = processor.process_reddit_data(reddit_data)
-        insights = processor.generate_training_insights(processed_data)
-
-        # 세션에 저장 (실제 환경에서는 데이터베이스 사용)
-        session['reddit_training_data'] = processed_data
-        session['reddit_insights'] = insights
-
-        return jsonify({
-            'status': 'success',
-            'message': 'Reddit 학습 데이터 로드 완료',
-            'data': {
-                'total_samples': insights['total_samples'],
-                'trend_distribution': insights['trend_distribution'],
-                'top_emotion_triggers': insights['top_emotion_triggers'][:5],
-                'recommended_tones': insights['recommended_tones'][:5]
-            }
-        })
-
+        job_id = job_runner.submit('reddit_training')
+        return _job_accepted(job_id, 'Reddit 학습 데이터 로드 작업이 등록되었습니다.')
     except Exception as e:
-        logging.error(f"Reddit 학습 데이터 로드 실패: {str(e)}")
+        logging.error(f"Reddit 학습 데이터 로드 작업 등록 실패: {str(e)}")
         return jsonify({
             'status': 'error',
-            'message': f'데이터 로드 중 오류 발생: {str(e)}'
+            'message': f'작업 등록 중 오류 발생: {str(e)}'
         }), 500
 
 @app.route('/admin/reddit_insights', methods=['GET'])
 def get_reddit_insights():
     """Reddit 데이터 분석 인사이트를 반환합니다."""
     try:
-        insights = session.get('reddit_insights', {})
+        result = job_runner.latest_result('reddit_training') or {}
+        insights = result.get('insights', {})
 
         if not insights:
             return jsonify({
@@ -502,138 +604,142 @@ def get_reddit_insights():
             'message': str(e)
         }), 500
 
+def load_news_youtube_job(job):
+    """[작업] 뉴스/유튜브 댓글 학습 데이터를 로드하고 처리합니다."""
+    from news_youtube_training_processor import NewsYoutubeTrainingProcessor
+
+    processor = NewsYoutubeTrainingProcessor()
+
+    # 뉴스/유튜브 댓글 데이터 로드
+    comment_data = [
+        {
+            "source": "simulated_naver_news_comment",
+            "title": "[속보] 정부, 3기 신도시 추가 공급 및 DSR 규제 완화 발표",
+            "content": "이게 대책이라고 내놓은건가? 집값 잡을 생각은 없고 그냥 건설사들 배만 불려주자는 거잖아. 서민들은 어차피 대출도 안나와서 그림의 떡임.",
+            "score": 5820,
+            "num_comments": 1250,
+            "data_type": "policy_criticism",
+            "speech_pattern": "news_comment_cynical",
+            "emotional_intensity": 9.3,
+            "stance": "negative"
+        },
+        {
+            "source": "simulated_youtube_comment",
+            "title": "영화 '광해 2' 예고편 최초 공개! 배우 이병헌 1인 2역 복귀",
+            "content": "와... 예고편만 봤는데 벌써 명작 스멜이 난다. 이병헌 연기는 진짜 국보급이네. 천만 관객 그냥 넘을 듯 ㄷㄷ",
+            "score": 12000,
+            "num_comments": 3400,
+            "data_type": "entertainment_reaction",
+            "speech_pattern": "youtube_comment_praise",
+            "emotional_intensity": 9.0,
+            "stance": "positive"
+        },
+        {
+            "source": "simulated_daum_news_comment",
+            "title": "역대급 폭염에 전력수급 '경고'… 7월인데 벌써 38도",
+            "content": "지구가 진짜 아프긴 한가 보네요... 다들 더위 조심하시고, 특히 야외에서 일하시는 분들 정말 고생 많으십니다. 정부는 전기세 지원 같은 대책 좀 세워주세요.",
+            "score": 3500,
+            "num_comments": 880,
+            "data_type": "social_concern",
+            "speech_pattern": "news_comment_empathetic",
+            "emotional_intensity": 7.5,
+            "stance": "concerned_neutral"
+        },
+        {
+            "source": "simulated_youtube_comment",
+            "title": "요즘 MZ 신입사원 특징.mp4 (feat. 라떼는 말이야)",
+            "content": "ㅋㅋㅋㅋㅋ 개웃기네 진짜 우리 회사 부장님 보는 줄. 근데 솔직히 서로 이해하려는 노력이 필요함. 저렇게까지 하는 신입은 없지만 어느 정도 공감은 간다.",
+            "score": 8800,
+            "num_comments": 2100,
+            "data_type": "generational_humor",
+            "speech_pattern": "youtube_comment_relatable",
+            "emotional_intensity": 8.2,
+            "stance": "humorous_neutral"
+        },
+        {
+            "source": "simulated_naver_news_comment",
+            "title": "논란의 'OOO법' 국회 통과… 시민단체 강력 반발",
+            "content": "이게 민주주의 국가 맞냐? 국민 의견은 싹 다 무시하고 그냥 밀어붙이네. 다음 선거 때 보자.",
+            "score": 7600,
+            "num_comments": 3200,
+            "data_type": "political_opposition",
+            "speech_pattern": "news_comment_aggressive",
+            "emotional_intensity": 9.8,
+            "stance": "strong_negative"
+        },
+        {
+            "source": "simulated_youtube_comment",
+            "title": "[4K 직캠] XXX 아이돌 신곡 'FANTASY' 쇼케이스 무대",
+            "content": "알고리즘님, 저를 이곳으로 인도해주셔서 감사합니다... 매일 보러 오겠습니다. 1일 1직캠 필수.",
+            "score": 25000,
+            "num_comments": 5500,
+            "data_type": "fandom_worship",
+            "speech_pattern": "youtube_comment_fandom",
+            "emotional_intensity": 9.5,
+            "stance": "strong_positive"
+        },
+        {
+            "source": "simulated_daum_news_comment",
+            "title": "[단독] 유명 연예인 OOO, 100억대 건물 매입",
+            "content": "이런 기사 좀 안 보고 싶다. 상대적 박탈감만 드네. 서민들은 한 평생 모아도 대출 갚기 힘든데...",
+            "score": 4100,
+            "num_comments": 1500,
+            "data_type": "social_criticism",
+            "speech_pattern": "news_comment_despair",
+            "emotional_intensity": 8.0,
+            "stance": "negative"
+        },
+        {
+            "source": "simulated_youtube_comment",
+            "title": "10분만에 이해하는 양자역학",
+            "content": "와... 설명을 너무 잘해주셔서 문과생인데 처음으로 이해했어요. 10분 순삭이네요. 구독하고 갑니다!",
+            "score": 15000,
+            "num_comments": 2800,
+            "data_type": "educational_feedback",
+            "speech_pattern": "youtube_comment_appreciation",
+            "emotional_intensity": 7.0,
+            "stance": "positive"
+        }
+    ]
+
+    # 데이터 처리
+    job.progress(0.1, '뉴스/유튜브 댓글 처리 중')
+    processed_data = processor.process_news_youtube_data(comment_data)
+    job.progress(0.7, '인사이트 생성 중')
+    insights = processor.generate_insights(processed_data)
+
+    return {
+        'message': '뉴스/유튜브 댓글 학습 데이터 로드 완료',
+        'insights': insights,
+        'data': {
+            'total_samples': insights['total_samples'],
+            'platform_distribution': insights['platform_distribution'],
+            'top_psychological_drivers': insights['top_psychological_drivers'][:5],
+            'recommended_tones': insights['recommended_tones'][:5],
+            'viral_analysis': insights['viral_potential_analysis']
+        }
+    }
+
+
 @app.route('/admin/load_news_youtube_data', methods=['POST'])
 def load_news_youtube_data():
-    """뉴스/유튜브 댓글 학습 데이터를 로드하고 처리합니다."""
+    """뉴스/유튜브 댓글 학습 데이터 로드 작업을 등록하고 작업 ID를 바로 반환합니다."""
     try:
-        from news_youtube_training_processor import NewsYoutubeTrainingProcessor
-
-        processor = NewsYoutubeTrainingProcessor()
-
-        # 뉴스/유튜브 댓글 데이터 로드
-        comment_data = [
-            {
-                "source": "simulated_naver_news_comment",
-                "title": "[속보] 정부, 3기 신도시 추가 공급 및 DSR 규제 완화 발표",
-                "content": "이게 대책이라고 내놓은건가? 집값 잡을 생각은 없고 그냥 건설사들 배만 불려주자는 거잖아. 서민들은 어차피 대출도 안나와서 그림의 떡임.",
-                "score": 5820,
-                "num_comments": 1250,
-                "data_type": "policy_criticism",
-                "speech_pattern": "news_comment_cynical",
-                "emotional_intensity": 9.3,
-                "stance": "negative"
-            },
-            {
-                "source": "simulated_youtube_comment",
-                "title": "영화 '광해 2' 예고편 최초 공개! 배우 이병헌 1인 2역 복귀",
-                "content": "와... 예고편만 봤는데 벌써 명작 스멜이 난다. 이병헌 연기는 진짜 국보급이네. 천만 관객 그냥 넘을 듯 ㄷㄷ",
-                "score": 12000,
-                "num_comments": 3400,
-                "data_type": "entertainment_reaction",
-                "speech_pattern": "youtube_comment_praise",
-                "emotional_intensity": 9.0,
-                "stance": "positive"
-            },
-            {
-                "source": "simulated_daum_news_comment",
-                "title": "역대급 폭염에 전력수급 '경고'… 7월인데 벌써 38도",
-                "content": "지구가 진짜 아프긴 한가 보네요... 다들 더위 조심하시고, 특히 야외에서 일하시는 분들 정말 고생 많으십니다. 정부는 전기세 지원 같은 대책 좀 세워주세요.",
-                "score": 3500,
-                "num_comments": 880,
-                "data_type": "social_concern",
-                "speech_pattern": "news_comment_empathetic",
-                "emotional_intensity": 7.5,
-                "stance": "concerned_neutral"
-            },
-            {
-                "source": "simulated_youtube_comment",
-                "title": "요즘 MZ 신입사원 특징.mp4 (feat. 라떼는 말이야)",
-                "content": "ㅋㅋㅋㅋㅋ 개웃기네 진짜 우리 회사 부장님 보는 줄. 근데 솔직히 서로 이해하려는 노력이 필요함. 저렇게까지 하는 신입은 없지만 어느 정도 공감은 간다.",
-                "score": 8800,
-                "num_comments": 2100,
-                "data_type": "generational_humor",
-                "speech_pattern": "youtube_comment_relatable",
-                "emotional_intensity": 8.2,
-                "stance": "humorous_neutral"
-            },
-            {
-                "source": "simulated_naver_news_comment",
-                "title": "논란의 'OOO법' 국회 통과… 시민단체 강력 반발",
-                "content": "이게 민주주의 국가 맞냐? 국민 의견은 싹 다 무시하고 그냥 밀어붙이네. 다음 선거 때 보자.",
-                "score": 7600,
-                "num_comments": 3200,
-                "data_type": "political_opposition",
-                "speech_pattern": "news_comment_aggressive",
-                "emotional_intensity": 9.8,
-                "stance": "strong_negative"
-            },
-            {
-                "source": "simulated_youtube_comment",
-                "title": "[4K 직캠] XXX 아이돌 신곡 'FANTASY' 쇼케이스 무대",
-                "content": "알고리즘님, 저를 이곳으로 인도해주셔서 감사합니다... 매일 보러 오겠습니다. 1일 1직캠 필수.",
-                "score": 25000,
-                "num_comments": 5500,
-                "data_type": "fandom_worship",
-                "speech_pattern": "youtube_comment_fandom",
-                "emotional_intensity": 9.5,
-                "stance": "strong_positive"
-            },
-            {
-                "source": "simulated_daum_news_comment",
-                "title": "[단독] 유명 연예인 OOO, 100억대 건물 매입",
-                "content": "이런 기사 좀 안 보고 싶다. 상대적 박탈감만 드네. 서민들은 한 평생 모아도 대출 갚기 힘든데...",
-                "score": 4100,
-                "num_comments": 1500,
-                "data_type": "social_criticism",
-                "speech_pattern": "news_comment_despair",
-                "emotional_intensity": 8.0,
-                "stance": "negative"
-            },
-            {
-                "source": "simulated_youtube_comment",
-                "title": "10분만에 이해하는 양자역학",
-                "content": "와... 설명을 너무 잘해주셔서 문과생인데 처음으로 이해했어요. 10분 순삭이네요. 구독하고 갑니다!",
-                "score": 15000,
-                "num_comments": 2800,
-                "data_type": "educational_feedback",
-                "speech_pattern": "youtube_comment_appreciation",
-                "emotional_intensity": 7.0,
-                "stance": "positive"
-            }
-        ]
-
-        # 데이터 처리
-        processed_data = processor.process_news_youtube_data(comment_data)
-        insights = processor.generate_insights(processed_data)
-
-        # 세션에 저장
-        session['news_youtube_data'] = processed_data
-        session['news_youtube_insights'] = insights
-
-        return jsonify({
-            'status': 'success',
-            'message': '뉴스/유튜브 댓글 학습 데이터 로드 완료',
-            'data': {
-                'total_samples': insights['total_samples'],
-                'platform_distribution': insights['platform_distribution'],
-                'top_psychological_drivers': insights['top_psychological_drivers'][:5],
-                'recommended_tones': insights['recommended_tones'][:5],
-                'viral_analysis': insights['viral_potential_analysis']
-            }
-        })
-
+        job_id = job_runner.submit('news_youtube_training')
+        return _job_accepted(job_id, '뉴스/유튜브 댓글 학습 데이터 로드 작업이 등록되었습니다.')
     except Exception as e:
-        logging.error(f"뉴스/유튜브 데이터 로드 실패: {str(e)}")
+        logging.error(f"뉴스/유튜브 데이터 로드 작업 등록 실패: {str(e)}")
         return jsonify({
             'status': 'error',
-            'message': f'데이터 로드 중 오류 발생: {str(e)}'
+            'message': f'작업 등록 중 오류 발생: {str(e)}'
         }), 500
 
 @app.route('/admin/news_youtube_insights', methods=['GET'])
 def get_news_youtube_insights():
     """뉴스/유튜브 댓글 데이터 분석 인사이트를 반환합니다."""
     try:
-        insights = session.get('news_youtube_insights', {})
+        result = job_runner.latest_result('news_youtube_training') or {}
+        insights = result.get('insights', {})
 
         if not insights:
             return jsonify({
@@ -675,76 +781,91 @@ def get_news_youtube_insights():
             'message': str(e)
         }), 500
 
+AI_LEARNING_MAX_BUDGET = 5.0
+
+
+def validate_ai_learning_params(params):
+    """AI 학습 작업 파라미터 검증: budget(0 초과 $5 이하), resume만 허용"""
+    unknown = set(params) - {'budget', 'resume'}
+    if unknown:
+        raise ValueError(f"ai_learning 작업에서 허용되지 않는 파라미터입니다: {', '.join(sorted(unknown))}")
+    budget = params.get('budget', 3.0)
+    if isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget <= 0:
+        raise ValueError('예산은 0보다 큰 숫자여야 합니다.')
+    if budget > AI_LEARNING_MAX_BUDGET:
+        raise ValueError(f'예산은 최대 ${AI_LEARNING_MAX_BUDGET:g}까지 설정 가능합니다.')
+    return {'budget': float(budget), 'resume': bool(params.get('resume', False))}
+
+
+def run_ai_learning_job(job, budget=3.0, resume=False):
+    """[작업] 주어진 예산으로 AI 학습 파이프라인을 실행합니다."""
+    from ai_learning_pipeline import AILearningPipeline
+
+    logging.info(f"💰 AI 학습 시작 - 예산: ${budget}")
+    pipeline = AILearningPipeline(budget_usd=budget)
+    # 배치가 반영될 때마다 진행률 보고 (취소 요청이 있으면 여기서 중단)
+    pipeline.progress_callback = job.progress
+    results = pipeline.run_full_pipeline(resume=resume)
+
+    job.check_cancelled()
+    if not results:
+        raise RuntimeError('AI 학습 파이프라인 실행에 실패했습니다.')
+
+    return {
+        'message': f'AI 학습 완료! 총 비용: ${results["total_cost"]:.3f}',
+        'learning_results': results,
+        'results': {
+            'data_processed': results['data_processed'],
+            'requests_used': results['requests_used'],
+            'resumed_items': results['resumed_items'],
+            'total_cost': results['total_cost'],
+            'remaining_budget': results['remaining_budget'],
+            'efficiency_score': results['efficiency_score'],
+            'cost_per_data': results['total_cost'] / results['data_processed'] if results['data_processed'] > 0 else 0
+        },
+        'performance': {
+            'efficiency_rating': 'excellent' if results['efficiency_score'] > 15 else 'good',
+            'budget_utilization': (results['total_cost'] / budget) * 100,
+            'data_density': f"{results['data_processed']} 데이터 / ${results['total_cost']:.3f}"
+        },
+        'cost_breakdown': results['cost_breakdown']
+    }
+
+
 @app.route('/admin/run_ai_learning', methods=['POST'])
 def run_ai_learning():
-    """3$ 예산으로 AI 모델 학습을 실행합니다."""
+    """AI 모델 학습 작업을 등록하고 작업 ID를 바로 반환합니다."""
     try:
-        from ai_learning_pipeline import AILearningPipeline
-
-        data = request.get_json()
+        data = request.get_json() or {}
         budget = data.get('budget', 3.0)
+        job_id = job_runner.submit('ai_learning', {'budget': budget, 'resume': data.get('resume', False)})
+        return _job_accepted(job_id, f'AI 학습 작업이 등록되었습니다. (예산: ${budget})')
 
-        if budget > 5.0:
-            return jsonify({
-                'status': 'error',
-                'message': '예산은 최대 $5까지 설정 가능합니다.'
-            }), 400
-
-        logging.info(f"💰 AI 학습 시작 - 예산: ${budget}")
-
-        # AI 학습 파이프라인 실행
-        pipeline = AILearningPipeline(budget_usd=budget)
-        results = pipeline.run_full_pipeline()
-
-        if results:
-            # 세션에 결과 저장
-            session['ai_learning_results'] = results
-
-            return jsonify({
-                'status': 'success',
-                'message': f'AI 학습 완료! 총 비용: ${results["total_cost"]:.3f}',
-                'results': {
-                    'data_processed': results['data_processed'],
-                    'requests_used': results['requests_used'],
-                    'total_cost': results['total_cost'],
-                    'remaining_budget': results['remaining_budget'],
-                    'efficiency_score': results['efficiency_score'],
-                    'cost_per_data': results['total_cost'] / results['data_processed'] if results['data_processed'] > 0 else 0
-                },
-                'performance': {
-                    'efficiency_rating': 'excellent' if results['efficiency_score'] > 15 else 'good',
-                    'budget_utilization': (results['total_cost'] / budget) * 100,
-                    'data_density': f"{results['data_processed']} 데이터 / ${results['total_cost']:.3f}"
-                }
-            })
-        else:
-            return jsonify({
-                'status': 'error',
-                'message': 'AI 학습 파이프라인 실행에 실패했습니다.'
-            }), 500
-
-    except ImportError:
+    except ValueError as e:
         return jsonify({
             'status': 'error',
-            'message': 'AI 학습 모듈을 찾을 수 없습니다.'
-        }), 500
+            'message': str(e)
+        }), 400
     except Exception as e:
-        logging.error(f"AI 학습 실행 실패: {str(e)}")
+        logging.error(f"AI 학습 작업 등록 실패: {str(e)}")
         return jsonify({
             'status': 'error',
-            'message': f'AI 학습 중 오류 발생: {str(e)}'
+            'message': f'작업 등록 중 오류 발생: {str(e)}'
         }), 500
 
 @app.route('/admin/ai_learning_status', methods=['GET'])
 def get_ai_learning_status():
     """AI 학습 상태 및 결과를 조회합니다."""
     try:
-        results = session.get('ai_learning_results')
+        latest = job_runner.latest_result('ai_learning') or {}
+        results = latest.get('learning_results')
+        recent_jobs = job_runner.list_jobs('ai_learning', limit=1)
 
         if not results:
             return jsonify({
                 'status': 'no_data',
                 'message': 'AI 학습이 아직 실행되지 않았습니다.',
+                'latest_job': recent_jobs[0] if recent_jobs else None,
                 'suggestions': [
                     '/admin/run_ai_learning 엔드포인트로 학습을 시작하세요.',
                     '예산은 $1-5 사이로 설정 가능합니다.',
@@ -755,6 +876,7 @@ def get_ai_learning_status():
         return jsonify({
             'status': 'success',
             'learning_results': results,
+            'latest_job': recent_jobs[0] if recent_jobs else None,
             'insights': {
                 'cost_efficiency': f"${results['total_cost']:.3f}로 {results['data_processed']}개 데이터 처리",
                 'roi_analysis': f"데이터당 비용: ${results['total_cost'] / results['data_processed']:.4f}",
@@ -773,4 +895,68 @@ def get_ai_learning_status():
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+# ====================================================================
+# 관리자 작업 (작업 등록/진행률/취소/결과)
+# ====================================================================
+job_runner.register('reddit_training', load_reddit_training_job)
+job_runner.register('news_youtube_training', load_news_youtube_job)
+job_runner.register('ai_learning', run_ai_learning_job, validate_ai_learning_params)
+
+
+@app.route('/admin/jobs', methods=['GET'])
+def list_admin_jobs():
+    """최근 관리자 작업 목록"""
+    jobs = job_runner.list_jobs(request.args.get('kind'), request.args.get('limit', 20, type=int))
+    return jsonify({'status': 'success', 'jobs': jobs})
+
+
+@app.route('/admin/jobs', methods=['POST'])
+def submit_admin_job():
+    """등록된 종류의 관리자 작업을 실행 큐에 넣습니다. body: {"kind": ..., "params": {...}}"""
+    data = request.get_json() or {}
+    try:
+        job_id = job_runner.submit(data.get('kind'), data.get('params') or {})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return _job_accepted(job_id, '작업이 등록되었습니다.')
+
+
+@app.route('/admin/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """작업 상태와 진행률"""
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify({'status': 'success', 'job': job})
+
+
+@app.route('/admin/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """대기 중인 작업은 바로, 실행 중인 작업은 다음 진행률 보고 시점에 취소합니다."""
+    job = job_runner.cancel(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify({'status': 'success', 'job': job})
+
+
+@app.route('/admin/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """완료된 작업의 결과 (아직 실행 중이면 202)"""
+    job = job_runner.get(job_id, include_result=True)
+    if job is None:
+        return jsonify({'status': 'error', 'message': '작업을 찾을 수 없습니다.'}), 404
+    if job['status'] in ('queued', 'running'):
+        return jsonify({'status': job['status'], 'progress': job['progress'], 'message': job['message']}), 202
+    if job['status'] != 'succeeded':
+        return jsonify({'status': job['status'], 'error': job['error']}), 409
+    return jsonify({'status': 'success', 'job_id': job_id, 'result': job['result']})
+
+
+if __name__ == '__main__':
+    logging.info("⚠️ 연구 데이터베이스 시스템을 사용할 수 없습니다. 기본 모드로 실행합니다.")
+    logging.info("🚀 기본 모드에서도 모든 핵심 기능이 정상 작동합니다!")
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port, debug=False)
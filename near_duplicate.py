@@ -0,0 +1,190 @@
+import os
+import re
+import zlib
+import random
+import logging
+from array import array
+from functools import partial
+
+from analysis_cache import normalize_content
+from processor_pool import map_items, is_parallel
+
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8))
+
+# 한글(음절/자모), 영문, 숫자만 남깁니다. 공백·문장부호·이모지는 표기 차이로 봅니다.
+_NON_CONTENT = re.compile(r'[^가-힣ㄱ-ㅎㅏ-ㅣa-z0-9]+')
+# ㅋㅋㅋㅋ / ㅎㅎㅎ / !!!! 같은 반복은 길이와 상관없이 같은 글로 취급
+_REPEATED_CHAR = re.compile(r'(.)\1{2,}')
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_for_shingles(text):
+    """근접 중복 비교용 정규화: NFKC/소문자/공백 정리 후 한글·영숫자만 남기고 반복 글자를 줄입니다."""
+    text = _NON_CONTENT.sub('', normalize_content(text))
+    return _REPEATED_CHAR.sub(r'\1\1', text)
+
+
+def shingles(text, size=3):
+    """정규화된 텍스트의 글자 단위 k-gram 해시 집합"""
+    text = normalize_for_shingles(text)
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))} if text else set()
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+
+def jaccard(a, b):
+    """두 shingle 해시 모음의 Jaccard 유사도. 집합이나 중복 없는 배열(sketch()의 shingle 배열)을 받습니다."""
+    a = a if isinstance(a, (set, frozenset)) else set(a)
+    if not a and not b:
+        return 1.0
+    intersection = len(a.intersection(b))
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class NearDuplicateFilter:
+    """글자 shingle MinHash + LSH 밴딩으로 근접 중복을 찾아 대표 항목 하나로 묶는 필터"""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=64, bands=16, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands로 나누어떨어져야 합니다.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        # 실행마다 같은 서명이 나오도록 고정 시드로 해시 계수를 만듭니다.
+        rng = random.Random(seed)
+        self.hash_params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                            for _ in range(num_perm)]
+        self.reset()
+
+    def reset(self):
+        self.buckets = [{} for _ in range(self.bands)]     # 밴드별 밴드 해시 → 대표 번호들
+        self.representatives = []                           # 대표 번호 → 정렬된 shingle 해시 배열
+        self.counts = []                                    # 대표 번호 → 묶인 항목 수
+        self._kept = []                                     # 대표 번호 → 내보낸 대표 항목 사본
+
+    def compact(self):
+        """이미 내보낸 대표 항목 사본을 개수만 담은 작은 dict로 바꿔 메모리를 돌려받습니다.
+
+        긴 스트림을 나눠 처리할 때 쓰며, 이후 들어오는 중복은 counts에만 반영됩니다.
+        """
+        self._kept = [{'duplicate_count': kept['duplicate_count']} for kept in self._kept]
+
+    def signature(self, shingle_set):
+        """MinHash 서명 (num_perm개의 61비트 값, array('Q'))"""
+        if not shingle_set:
+            return array('Q', bytes(8 * self.num_perm))
+        return array('Q', [min((a * x + b) % _MERSENNE_PRIME for x in shingle_set) for a, b in self.hash_params])
+
+    def sketch(self, text):
+        """(정렬된 shingle 해시 array('I'), MinHash 서명 array('Q')).
+
+        가장 비싼 부분이라 병렬 모드에서는 워커가 미리 계산합니다. 집합 대신 배열로 돌려줘
+        워커 → 부모 피클 크기와 대표 항목별 메모리를 항목당 4바이트 × shingle 수로 줄입니다.
+        """
+        shingle_set = shingles(text, self.shingle_size)
+        return array('I', sorted(shingle_set)), self.signature(shingle_set)
+
+    def add(self, text, weight=1, sketch=None):
+        """텍스트를 넣고 (대표 번호, 새 대표 여부)를 반환합니다. 후보는 실제 Jaccard로 한 번 더 확인합니다."""
+        shingle_array, signature = sketch or self.sketch(text)
+        band_bytes = self.rows * signature.itemsize
+        raw = signature.tobytes()
+        band_keys = [hash(raw[band * band_bytes:(band + 1) * band_bytes]) for band in range(self.bands)]
+
+        checked = set()
+        shingle_set = None
+        for band, key in enumerate(band_keys):
+            for candidate in self.buckets[band].get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if shingle_set is None:
+                    shingle_set = set(shingle_array)
+                if jaccard(shingle_set, self.representatives[candidate]) >= self.threshold:
+                    self.counts[candidate] += weight
+                    return candidate, False
+
+        representative = len(self.representatives)
+        self.representatives.append(shingle_array)
+        self.counts.append(weight)
+        for band, key in enumerate(band_keys):
+            self.buckets[band].setdefault(key, []).append(representative)
+        return representative, True
+
+    def stream(self, items, text_fn, sketches=None):
+        """대표 항목 사본을 처음 볼 때 바로 내보냅니다. 이후 같은 글이 오면 그 사본의 duplicate_count를 늘립니다.
+
+        앞 단계에서 이미 묶인 항목(duplicate_count 보유)은 그 개수만큼 더해 여러 단계에 걸쳐 써도 합계가 유지됩니다.
+        sketches가 있으면 항목과 같은 순서의 미리 계산한 sketch()를 씁니다.
+        """
+        kept = self._kept
+        for index, item in enumerate(items):
+            weight = item.get('duplicate_count', 1)
+            sketch = sketches[index] if sketches is not None else None
+            representative, is_new = self.add(text_fn(item), weight=weight, sketch=sketch)
+            if is_new:
+                kept.append({**item, 'duplicate_count': weight})
+                yield kept[representative]
+            else:
+                kept[representative]['duplicate_count'] += weight
+
+    def stream_windows(self, items, text_fn, window_size):
+        """window_size개씩 모아 창 안에서 묶고, 창이 닫힐 때 대표 항목을 최종 duplicate_count와 함께 내보냅니다.
+
+        내보낸 항목의 개수는 이후 바뀌지 않고, 색인은 창마다 비우므로 메모리는 창 크기에 비례합니다.
+        창 경계를 넘는 중복은 창마다 따로 대표가 되지만 duplicate_count 합계는 입력 수와 같습니다.
+        """
+        window = []
+        for item in items:
+            window.append(item)
+            if len(window) >= window_size:
+                yield from self.deduplicate(window, text_fn)
+                self.reset()
+                window = []
+        if window:
+            yield from self.deduplicate(window, text_fn)
+            self.reset()
+
+    def sketch_all(self, items, text_fn, workers=None, chunk_size=None, pool=None, method_name='sketch'):
+        """병렬 모드면 항목 순서대로 sketch()를 프로세스 풀에서 계산해 반환하고, 아니면 None
+
+        pool(ProcessorPool)을 주면 그 풀의 워커 처리기에서 method_name(예: 'near_duplicate_filter.sketch')으로
+        계산해 다음 처리 단계와 워커 프로세스를 함께 씁니다. 워커 쪽 필터도 같은 설정이어야 합니다.
+        """
+        if pool is not None:
+            return pool.map(method_name, [text_fn(item) for item in items]) if pool.is_parallel(items) else None
+        if not is_parallel(items, workers, chunk_size):
+            return None
+        return map_items(self, 'sketch', [text_fn(item) for item in items], workers, chunk_size,
+                         worker_factory=partial(NearDuplicateFilter, self.threshold, self.num_perm,
+                                                self.bands, self.shingle_size, self.seed))
+
+    def deduplicate(self, items, text_fn, workers=None, chunk_size=None, pool=None, method_name='sketch'):
+        """근접 중복을 처음 나온 항목으로 묶어 반환합니다. 대표 항목 사본에 duplicate_count(묶인 개수)를 붙입니다.
+
+        병렬 모드에서는 sketch 계산만 프로세스 풀에 나누고, 대표 선택은 입력 순서대로 여기서 해 결과가 같습니다.
+        """
+        self.reset()
+        sketches = self.sketch_all(items, text_fn, workers, chunk_size, pool, method_name)
+        kept = list(self.stream(items, text_fn, sketches))
+        collapsed = len(items) - len(kept)
+        if collapsed:
+            logging.info(f"🧹 근접 중복 {collapsed}개를 묶었습니다 ({len(items)}개 → {len(kept)}개)")
+        return kept
+
+
+if __name__ == "__main__":
+    samples = [
+        {'content': '이거 진짜 개웃기네 ㅋㅋㅋ 완전 레전드'},
+        {'content': '이거 진짜 개웃기네ㅋㅋㅋㅋㅋㅋ 완전 레전드!!'},
+        {'content': '이거  진짜 개웃기네 ㅋㅋ, 완전 레전드'},
+        {'content': '객관적으로 봤을 때 이해가 안 감. 근거가 있나?'},
+        {'content': '객관적으로 봤을때 이해가 안감 근거가 있나'},
+        {'content': '완전 반전 아니야? 이런 일이 실제로?'}
+    ]
+    dedup = NearDuplicateFilter()
+    for item in dedup.deduplicate(samples, lambda item: item['content']):
+        print(f"x{item['duplicate_count']}  {item['content']}")
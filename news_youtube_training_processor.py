@@ -2,12 +2,16 @@ import json
 import logging
 from datetime import datetime
 from typing import List, Dict, Any
-import re
-from collections importCounter
+from collections import Counter
+
+from near_duplicate import NearDuplicateFilter
+from korean_text_kernel import analyze_text
+from processor_pool import ProcessorPool
 
 class NewsYoutubeTrainingProcessor:
     def __init__(self):
         self.processed_data = []
+        self.near_duplicate_filter = NearDuplicateFilter()
 
         # 플랫폼별 언어적 특징 매핑
         self.platform_characteristics = {
@@ -75,7 +79,7 @@ class NewsYoutubeTrainingProcessor:
             psychological_drivers.extend(['긴장_완화', '세대_이해', '균형_감각'])
 
         # 언어적 전략 분석
-        linguistic_strategies = self._extract_linguistic_strategies(content, speech_pattern)
+        linguistic_strategies = self._extract_linguistic_strategies(content, speech_pattern, analyze_text(content))
 
         # 바이럴 요소 식별
         viral_elements = self._identify_viral_elements(comment_data)
@@ -87,16 +91,19 @@ class NewsYoutubeTrainingProcessor:
             'engagement_prediction': self._predict_engagement(comment_data)
         }
 
-    def _extract_linguistic_strategies(self, content: str, speech_pattern: str) -> List[str]:
+    def _extract_linguistic_strategies(self, content: str, speech_pattern: str,
+                                       text_features: Dict[str, Any] = None) -> List[str]:
         """언어적 전략 추출"""
         strategies = []
+        text_features = text_features or analyze_text(content)
+        content = text_features['normalized']
 
         # 수사 기법 분석
-        if '...' in content:
+        if text_features['punctuation']['ellipsis']:
             strategies.append('말줄임_여운')
-        if re.search(r'ㅋ{2,}', content):
+        if text_features['jamo_runs']['ㅋ']['max_run'] >= 2:
             strategies.append('웃음_표현_증폭')
-        if '?' in content and '맞냐' in content:
+        if text_features['punctuation']['?'] and '맞냐' in content:
             strategies.append('반문법_압박')
         if '진짜' in content or '완전' in content:
             strategies.append('강화어_사용')
@@ -191,26 +198,35 @@ class NewsYoutubeTrainingProcessor:
         elif emotional_intensity > 7:
             tone_recommendations.extend(['풍자적', '비꼬는 듯이'])
 
-        return list(set(tone_recommendations))
-
-    def process_news_youtube_data(self, raw_data: List[Dict]) -> List[Dict]:
-        """뉴스/유튜브 댓글 데이터를 학습용으로 변환"""
-        processed_data = []
-
-        for item in raw_data:
-            processed_item = {
-                'raw_data': item,
-                'processed_at': datetime.now().isoformat(),
-                'platform_type': self._identify_platform(item.get('source', '')),
-                'speech_pattern': item.get('speech_pattern', 'unknown'),
-                'emotional_intensity': item.get('emotional_intensity', 5.0),
-                'psychological_drivers': self._extract_psychological_drivers(item),
-                'viral_potential': self._calculate_viral_potential(item),
-                'recommended_adaptations': self._suggest_adaptations(item)
-            }
-            processed_data.append(processed_item)
-
-        return processed_data
+        return list(dict.fromkeys(tone_recommendations))
+
+    def process_news_youtube_data(self, raw_data: List[Dict], workers: int = None,
+                                  chunk_size: int = None) -> List[Dict]:
+        """뉴스/유튜브 댓글 데이터를 학습용으로 변환 (workers가 2 이상이면 청크 단위로 프로세스 풀에서 처리)"""
+        # 복사·붙여넣기 댓글은 대표 하나만 처리하고 묶인 개수를 남깁니다. (청크를 넘나드는 중복도 잡도록 나누기 전에)
+        # sketch 계산과 댓글 처리는 같은 워커 프로세스 풀을 씁니다.
+        with ProcessorPool(self, workers, chunk_size) as pool:
+            distinct_data = self.near_duplicate_filter.deduplicate(
+                raw_data, lambda item: f"{item.get('title', '')} {item.get('content', '')}",
+                pool=pool, method_name='near_duplicate_filter.sketch')
+            return pool.map('process_comment', distinct_data)
+
+    def process_comment(self, item: Dict) -> Dict:
+        """댓글 하나를 학습용 항목으로 변환합니다."""
+        text_features = analyze_text(item.get('content', ''))
+        return {
+            'raw_data': item,
+            'duplicate_count': item.get('duplicate_count', 1),
+            'processed_at': datetime.now().isoformat(),
+            'platform_type': self._identify_platform(item.get('source', '')),
+            'speech_pattern': item.get('speech_pattern', 'unknown'),
+            'emotional_intensity': item.get('emotional_intensity', 5.0),
+            'psychological_drivers': self._extract_psychological_drivers(item, text_features['normalized']),
+            'formality_level': text_features['formality_level'],
+            'hangul_ratio': text_features['hangul_ratio'],
+            'viral_potential': self._calculate_viral_potential(item),
+            'recommended_adaptations': self._suggest_adaptations(item)
+        }
 
     def _extract_platform(self, source: str) -> str:
         """소스에서 플랫폼 추출"""
@@ -233,10 +249,10 @@ class NewsYoutubeTrainingProcessor:
         else:
             return 'unknown'
 
-    def _extract_psychological_drivers(self, item: Dict) -> List[str]:
+    def _extract_psychological_drivers(self, item: Dict, text: str = None) -> List[str]:
         """심리적 동기 요소를 추출합니다."""
         drivers = []
-        content = item.get('content', '').lower()
+        content = text if text is not None else analyze_text(item.get('content', ''))['normalized']
         stance = item.get('stance', 'neutral')
 
         # 심리적 동기 패턴
@@ -493,10 +509,10 @@ def process_news_youtube_training_data():
         print(f"  • {driver}: {count}회")
 
     print(f"\n🎭 추천 톤 분포:")
-        for tone, count in insights['recommended_tones'][:5]:
-            print(f"  • {tone}: {count}회")
+    for tone, count in insights['recommended_tones'][:5]:
+        print(f"  • {tone}: {count}회")
 
-        return processed_data, insights
+    return processed_data, insights
 
 if __name__ == "__main__":
     process_news_youtube_training_data()
\ No newline at end of file
@@ -0,0 +1,345 @@
+import json
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# 내보낸 qa_history에서 분석에 필요한 컬럼 (나머지는 로드 시 버립니다)
+HISTORY_COLUMNS = [
+    'id', 'session_id', 'tone_used', 'target_subject', 'keywords',
+    'response_length', 'quality_metrics', 'safety_analysis', 'created_at'
+]
+
+# user_analytics_report_*.json 덤프의 행 배열을 프레임으로 펼칠 때 쓰는 컬럼 이름
+REPORT_SECTION_COLUMNS = {
+    ('usage_patterns', 'daily_stats'): ['total_requests', 'unique_users', 'avg_response_length', 'date'],
+    ('usage_patterns', 'tone_stats'): ['tone_used', 'usage_count', 'avg_quality', 'avg_length'],
+    ('usage_patterns', 'tone_daily_stats'): ['date', 'tone_used', 'usage_count'],
+    ('usage_patterns', 'target_stats'): ['target_subject', 'frequency', 'tone_used', 'avg_length'],
+    ('safety_analysis', 'safety_stats'): ['is_safe', 'count', 'tone_used', 'avg_length'],
+    ('safety_analysis', 'risk_patterns'): ['safety_message', 'frequency', 'tone_used'],
+    ('preference_analysis', 'user_preferences'): ['session_id', 'tone_used', 'usage_count', 'avg_humor_rating'],
+    ('preference_analysis', 'keyword_trends'): ['keyword', 'frequency', 'date'],
+    ('technique_analysis', 'technique_stats'): ['technique_name', 'usage_count', 'avg_confidence',
+                                                'avg_effectiveness', 'tone_used']
+}
+
+
+def _json_field(series, key):
+    """JSON 문자열/딕셔너리 컬럼에서 키 하나를 한 번에 추출합니다."""
+    def extract(value):
+        if isinstance(value, str) and value:
+            value = json.loads(value)
+        return value.get(key) if isinstance(value, dict) else None
+    return series.map(extract)
+
+
+def _parse_keywords(value):
+    """리스트 또는 Postgres 배열 리터럴('{a,b}')을 키워드 리스트로 변환합니다."""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+    if isinstance(value, str) and value:
+        if value.startswith('['):
+            return json.loads(value)
+        return [keyword.strip().strip('"') for keyword in value.strip('{}').split(',') if keyword.strip()]
+    return []
+
+
+def _rows(frame):
+    """프레임을 기존 보고서와 같은 튜플 행 목록으로 변환합니다.
+
+    DB 결과와 같게 일자 컬럼은 datetime.date로, 결측값(NaN/NaT)은 None으로, numpy 스칼라는 파이썬 값으로 바꿉니다.
+    """
+    columns = []
+    for name in frame.columns:
+        column = frame[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.date
+        column = column.astype(object)
+        columns.append(column.where(column.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+class OfflineAnalytics:
+    """내보낸 사용 이력을 열 기반 프레임으로 한 번 적재해 벡터화 집계하는 오프라인 분석기"""
+
+    def __init__(self, history=None, report_frames=None):
+        self.history = history
+        self.report_frames = report_frames or {}
+
+    @classmethod
+    def from_history_export(cls, *paths):
+        """qa_history 내보내기 파일(csv/json/jsonl/parquet)을 읽어 분석기를 만듭니다."""
+        frames = []
+        for path in paths:
+            extension = os.path.splitext(path)[1].lower()
+            if extension == '.csv':
+                frame = pd.read_csv(path)
+            elif extension in ('.jsonl', '.ndjson'):
+                frame = pd.read_json(path, lines=True)
+            elif extension == '.parquet':
+                frame = pd.read_parquet(path)
+            else:
+                frame = pd.read_json(path)
+            frames.append(frame[[column for column in HISTORY_COLUMNS if column in frame.columns]])
+
+        history = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=HISTORY_COLUMNS)
+        print(f"📥 {len(history)}건의 이력을 오프라인 분석용으로 적재했습니다.")
+        return cls(history=cls._prepare_history(history))
+
+    @classmethod
+    def from_report_dumps(cls, *paths):
+        """user_analytics_report_*.json 덤프들을 섹션별 프레임으로 적재합니다."""
+        collected = {section: [] for section in REPORT_SECTION_COLUMNS}
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+            generated_at = pd.to_datetime(report.get('report_generated'))
+            for (group, name), columns in REPORT_SECTION_COLUMNS.items():
+                rows = report.get(group, {}).get(name) or []
+                if rows:
+                    frame = pd.DataFrame([list(row)[:len(columns)] for row in rows], columns=columns)
+                    frame['report_generated'] = generated_at
+                    collected[(group, name)].append(frame)
+
+        report_frames = {}
+        for (group, name), frames in collected.items():
+            if not frames:
+                continue
+            frame = pd.concat(frames, ignore_index=True)
+            # 덤프에는 Decimal이 문자열로 들어 있으므로 수치 컬럼을 한 번에 변환
+            for column in frame.columns:
+                if column.startswith(('avg_', 'total_', 'unique_')) or column in ('usage_count', 'count', 'frequency'):
+                    frame[column] = pd.to_numeric(frame[column], errors='coerce')
+            report_frames[name] = frame
+
+        print(f"📥 보고서 덤프 {len(paths)}개를 {len(report_frames)}개 섹션 프레임으로 적재했습니다.")
+        return cls(report_frames=report_frames)
+
+    @staticmethod
+    def _prepare_history(history):
+        """JSON 컬럼을 평탄화하고 분석용 파생 컬럼을 미리 계산합니다."""
+        history = history.copy()
+        history['created_at'] = pd.to_datetime(history['created_at'], errors='coerce')
+        history['date'] = history['created_at'].dt.normalize()
+        history['response_length'] = pd.to_numeric(history.get('response_length'), errors='coerce')
+
+        quality = history.get('quality_metrics', pd.Series(index=history.index, dtype=object))
+        history['readability_score'] = pd.to_numeric(_json_field(quality, 'readability_score'), errors='coerce')
+        history['humor_rating'] = pd.to_numeric(_json_field(quality, 'humor_rating'), errors='coerce')
+
+        safety = history.get('safety_analysis', pd.Series(index=history.index, dtype=object))
+        history['has_safety_analysis'] = safety.notna().to_numpy()
+        history['is_safe'] = _json_field(safety, 'is_safe').astype('boolean')
+        history['safety_message'] = _json_field(safety, 'safety_message')
+
+        history['keywords'] = history.get('keywords', pd.Series(index=history.index, dtype=object)).map(_parse_keywords)
+        return history.drop(columns=[column for column in ('quality_metrics', 'safety_analysis')
+                                     if column in history.columns])
+
+    def _window(self, days):
+        """최근 days일 이내의 이력만 반환합니다. (None이면 전체)"""
+        if days is None:
+            return self.history
+        since = pd.Timestamp(datetime.now() - timedelta(days=days))
+        return self.history[self.history['created_at'] >= since]
+
+    def daily_stats(self, days=30):
+        """일별 요청 수, 고유 사용자 수, 평균 응답 길이"""
+        window = self._window(days)
+        daily = window.groupby('date').agg(
+            total_requests=('session_id', 'size'),
+            unique_users=('session_id', 'nunique'),
+            avg_response_length=('response_length', 'mean')
+        ).reset_index()
+        return daily[['total_requests', 'unique_users', 'avg_response_length', 'date']] \
+            .sort_values('date', ascending=False, ignore_index=True)
+
+    def tone_usage(self, days=30):
+        """톤별 사용 횟수, 평균 품질, 평균 길이"""
+        window = self._window(days)
+        return window.dropna(subset=['tone_used']).groupby('tone_used').agg(
+            usage_count=('tone_used', 'size'),
+            avg_quality=('readability_score', 'mean'),
+            avg_length=('response_length', 'mean')
+        ).reset_index().sort_values('usage_count', ascending=False, ignore_index=True)
+
+    def tone_daily_usage(self, days=30):
+        """일자 × 톤별 사용 횟수 (톤 사용 추이)"""
+        window = self._window(days).dropna(subset=['tone_used'])
+        return window.groupby(['date', 'tone_used']).size().rename('usage_count').reset_index() \
+            .sort_values(['date', 'usage_count'], ascending=[True, False], ignore_index=True)
+
+    def target_stats(self, days=30, limit=20):
+        """타겟 주제 × 톤별 빈도 상위 목록"""
+        window = self._window(days).dropna(subset=['target_subject'])
+        targets = window.groupby(['target_subject', 'tone_used'], dropna=False).agg(
+            frequency=('target_subject', 'size'),
+            avg_length=('response_length', 'mean')
+        ).reset_index()
+        return targets[['target_subject', 'frequency', 'tone_used', 'avg_length']] \
+            .nlargest(limit, 'frequency').reset_index(drop=True)
+
+    def safety_stats(self, days=None):
+        """안전 판정 × 톤별 건수와 평균 길이"""
+        window = self._window(days)
+        checked = window[window['has_safety_analysis']]
+        stats = checked.groupby(['is_safe', 'tone_used'], dropna=False).agg(
+            count=('is_safe', 'size'),
+            avg_length=('response_length', 'mean')
+        ).reset_index()
+        return stats[['is_safe', 'count', 'tone_used', 'avg_length']] \
+            .sort_values('count', ascending=False, ignore_index=True)
+
+    def safety_ratio(self, days=None, by_tone=False):
+        """안전 판정 비율 (by_tone=True면 톤별 비율 시리즈)"""
+        window = self._window(days)
+        checked = window.loc[window['has_safety_analysis'], ['tone_used', 'is_safe']]
+        safe = checked['is_safe'].fillna(False).astype(np.float64)
+        if by_tone:
+            return safe.groupby(checked['tone_used']).mean().sort_values(ascending=False)
+        return float(safe.mean()) if len(safe) else 0.0
+
+    def risk_patterns(self, days=None):
+        """위험 판정 메시지 × 톤별 빈도"""
+        window = self._window(days)
+        risky = window[~window['is_safe'].fillna(True).astype(bool)]
+        risks = risky.groupby(['safety_message', 'tone_used'], dropna=False) \
+            .size().reset_index(name='frequency')
+        return risks[['safety_message', 'frequency', 'tone_used']] \
+            .sort_values('frequency', ascending=False, ignore_index=True)
+
+    def keyword_trends(self, days=30, limit=50):
+        """키워드 × 날짜별 등장 빈도 상위 목록"""
+        window = self._window(days)[['keywords', 'date']].explode('keywords').dropna(subset=['keywords'])
+        trends = window.groupby(['keywords', 'date']).size().reset_index(name='frequency') \
+            .rename(columns={'keywords': 'keyword'})
+        return trends[['keyword', 'frequency', 'date']].nlargest(limit, 'frequency').reset_index(drop=True)
+
+    def session_preferences(self, days=None, min_usage=2):
+        """세션별 톤 선호도 (min_usage회 이상 사용한 조합만)"""
+        window = self._window(days).dropna(subset=['session_id', 'tone_used'])
+        preferences = window.groupby(['session_id', 'tone_used']).agg(
+            usage_count=('tone_used', 'size'),
+            avg_humor_rating=('humor_rating', 'mean')
+        ).reset_index()
+        return preferences[preferences['usage_count'] >= min_usage] \
+            .sort_values('usage_count', ascending=False, ignore_index=True)
+
+    def report_trends(self):
+        """여러 보고서 덤프에 걸친 톤 사용량/안전 비율/키워드 추이"""
+        trends = {}
+        tone_stats = self.report_frames.get('tone_stats')
+        if tone_stats is not None:
+            trends['tone_usage'] = tone_stats.pivot_table(
+                index='report_generated', columns='tone_used', values='usage_count',
+                aggfunc='sum', fill_value=0)
+        safety_stats = self.report_frames.get('safety_stats')
+        if safety_stats is not None:
+            is_safe = safety_stats['is_safe'].astype(str).str.lower().isin(['true', '1'])
+            counts = safety_stats['count'].to_numpy(dtype=np.float64)
+            grouped = pd.DataFrame({
+                'report_generated': safety_stats['report_generated'],
+                'safe': np.where(is_safe, counts, 0.0),
+                'total': counts
+            }).groupby('report_generated').sum()
+            trends['safety_ratio'] = grouped['safe'] / grouped['total'].replace(0, np.nan)
+        keyword_trends = self.report_frames.get('keyword_trends')
+        if keyword_trends is not None:
+            trends['keyword_frequency'] = keyword_trends.pivot_table(
+                index='report_generated', columns='keyword', values='frequency',
+                aggfunc='sum', fill_value=0)
+        return trends
+
+    def generate_insights(self, tone_usage, safety_ratio, technique_count=0):
+        """집계 프레임에서 UserAnalytics와 같은 형식의 인사이트를 생성합니다."""
+        insights = []
+
+        if not tone_usage.empty:
+            top_tone = tone_usage.iloc[0]
+            insights.append({
+                'category': '톤 사용 패턴',
+                'insight': f"가장 인기있는 톤은 '{top_tone['tone_used']}'로 {int(top_tone['usage_count'])}회 사용되었습니다.",
+                'recommendation': "이 톤의 성공 요소를 다른 톤에도 적용해보세요."
+            })
+
+        if safety_ratio is not None:
+            insights.append({
+                'category': '안전성',
+                'insight': f"전체 요청의 {safety_ratio*100:.1f}%가 안전한 것으로 판정되었습니다.",
+                'recommendation': "위험 요소 탐지 시스템이 효과적으로 작동하고 있습니다." if safety_ratio > 0.9 else "안전성 필터를 강화할 필요가 있습니다."
+            })
+
+        if technique_count:
+            insights.append({
+                'category': '고급 기법',
+                'insight': f"{technique_count}가지 고급 기법이 탐지되었습니다.",
+                'recommendation': "사용자들이 다양한 고급 기법을 활용하고 있어 시스템이 성숙해지고 있습니다."
+            })
+
+        return insights
+
+    def generate_comprehensive_report(self, days=30):
+        """적재된 이력으로 UserAnalytics와 같은 구조의 종합 보고서를 생성합니다."""
+        print("📋 오프라인 종합 분석 보고서 생성 중...")
+
+        daily = self.daily_stats(days)
+        tones = self.tone_usage(days)
+        safety = self.safety_stats()
+        has_safety = bool(self.history['has_safety_analysis'].any())
+
+        report = {
+            'report_generated': datetime.now().isoformat(),
+            'mode': 'offline',
+            'summary': {
+                'total_users': int(daily['unique_users'].nunique()) if not daily.empty else 0,
+                'total_requests': int(daily['total_requests'].sum()) if not daily.empty else 0,
+                'most_popular_tone': tones['tone_used'].iloc[0] if not tones.empty else 'N/A',
+                'advanced_technique_usage': 0
+            },
+            'usage_patterns': {
+                'daily_stats': _rows(daily),
+                'tone_stats': _rows(tones),
+                'tone_daily_stats': _rows(self.tone_daily_usage(days)),
+                'target_stats': _rows(self.target_stats(days))
+            },
+            'technique_analysis': {
+                'technique_stats': [],
+                'recent_techniques': []
+            },
+            'safety_analysis': {
+                'safety_stats': _rows(safety),
+                'risk_patterns': _rows(self.risk_patterns())
+            },
+            'preference_analysis': {
+                'user_preferences': _rows(self.session_preferences()),
+                'keyword_trends': _rows(self.keyword_trends(days))
+            }
+        }
+        report['insights'] = self.generate_insights(
+            tones, self.safety_ratio() if has_safety else None)
+        return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    paths = sys.argv[1:]
+    if not paths:
+        print("사용법: python offline_analytics.py <qa_history 내보내기 또는 user_analytics_report_*.json> ...")
+        sys.exit(1)
+
+    if all(os.path.basename(path).startswith('user_analytics_report_') for path in paths):
+        analytics = OfflineAnalytics.from_report_dumps(*paths)
+        for name, trend in analytics.report_trends().items():
+            print(f"\n📈 {name}:")
+            print(trend.tail(10))
+    else:
+        analytics = OfflineAnalytics.from_history_export(*paths)
+        report = analytics.generate_comprehensive_report()
+        print(f"\n🎭 톤별 사용 통계 (상위 5개):")
+        print(analytics.tone_usage().head(5).to_string(index=False))
+        print(f"\n🛡️ 톤별 안전 비율:")
+        print(analytics.safety_ratio(by_tone=True).head(10).to_string())
+        for insight in report['insights']:
+            print(f"  🔍 {insight['category']}: {insight['insight']}")
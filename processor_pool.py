@@ -0,0 +1,89 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+
+PROCESSOR_WORKERS = int(os.environ.get('PROCESSOR_WORKERS', 1))
+PROCESSOR_CHUNK_SIZE = int(os.environ.get('PROCESSOR_CHUNK_SIZE', 2000))
+
+# 워커 프로세스마다 한 번만 만드는 처리기 (키워드 표를 청크마다 다시 만들지 않음)
+_worker_processor = None
+
+
+def _init_worker(processor_factory):
+    global _worker_processor
+    _worker_processor = processor_factory()
+
+
+def _process_chunk(method_name, chunk):
+    method = attrgetter(method_name)(_worker_processor)
+    return [method(item) for item in chunk]
+
+
+def chunked(items, chunk_size):
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def is_parallel(items, workers=None, chunk_size=None):
+    """map_items가 프로세스 풀을 쓸 조건인지"""
+    return (workers or PROCESSOR_WORKERS) > 1 and len(items) > max(1, chunk_size or PROCESSOR_CHUNK_SIZE)
+
+
+class ProcessorPool:
+    """한 처리 실행 동안 워커 프로세스를 한 번만 띄워 여러 단계의 map에 재사용하는 풀
+
+    처음 병렬로 나눌 만큼 큰 map이 올 때 풀을 만들고, with 블록이 끝나면 닫습니다. 워커는 시작할 때
+    worker_factory()(기본: 처리기 클래스)로 처리기를 한 번 만들어 이후 모든 청크에 씁니다.
+    method_name은 'near_duplicate_filter.sketch'처럼 처리기 속성의 메서드도 가리킬 수 있습니다.
+    """
+
+    def __init__(self, processor, workers=None, chunk_size=None, worker_factory=None):
+        self.processor = processor
+        self.workers = workers or PROCESSOR_WORKERS
+        self.chunk_size = max(1, chunk_size or PROCESSOR_CHUNK_SIZE)
+        self.worker_factory = worker_factory or type(processor)
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def is_parallel(self, items):
+        return is_parallel(items, self.workers, self.chunk_size)
+
+    def map(self, method_name, items):
+        """processor.method_name(item)을 항목마다 적용한 결과를 입력 순서대로 반환합니다."""
+        if not self.is_parallel(items):
+            method = attrgetter(method_name)(self.processor)
+            return [method(item) for item in items]
+
+        chunks = chunked(items, self.chunk_size)
+        if self._executor is None:
+            workers = min(self.workers, len(chunks))
+            logging.info(f"🧵 {type(self.processor).__name__}: 프로세스 {workers}개 풀 시작")
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                 initargs=(self.worker_factory,))
+        logging.info(f"🧵 {type(self.processor).__name__}.{method_name}: {len(items)}개를 "
+                     f"{len(chunks)}개 청크로 나눠 처리")
+        results = []
+        for chunk_results in self._executor.map(_process_chunk, [method_name] * len(chunks), chunks):
+            results.extend(chunk_results)
+        return results
+
+
+def map_items(processor, method_name, items, workers=None, chunk_size=None, worker_factory=None):
+    """processor.method_name(item)을 항목마다 적용한 결과를 입력 순서대로 반환합니다.
+
+    workers가 2 이상이고 항목이 한 청크보다 많으면 청크로 나눠 프로세스 풀에 보내고,
+    결과는 청크 순서대로 이어 붙여 순차 실행과 같은 순서를 유지합니다. 이 호출에서만 쓰는 풀을
+    만들므로, 같은 실행에서 여러 번 나눠 처리할 때는 ProcessorPool을 한 번 만들어 재사용하세요.
+    """
+    with ProcessorPool(processor, workers, chunk_size, worker_factory) as pool:
+        return pool.map(method_name, items)
@@ -0,0 +1,190 @@
+import os
+import re
+import time
+import random
+import logging
+import threading
+
+GEMINI_INITIAL_RPS = float(os.environ.get('GEMINI_INITIAL_RPS', 2.0))
+GEMINI_MIN_RPS = float(os.environ.get('GEMINI_MIN_RPS', 0.1))
+GEMINI_MAX_RPS = float(os.environ.get('GEMINI_MAX_RPS', 10.0))
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+# 할당량 오류 시 레인별 재시도 횟수 (사용자 요청은 오래 붙잡지 않음)
+LANE_MAX_RETRIES = {INTERACTIVE: 1, BATCH: int(os.environ.get('GEMINI_BATCH_MAX_RETRIES', 5))}
+# 배치 레인은 현재 속도의 일부만 쓰고 나머지는 사용자 요청 몫으로 남겨 둡니다.
+BATCH_RATE_SHARE = float(os.environ.get('GEMINI_BATCH_RATE_SHARE', 0.7))
+# 서버 재시도 힌트/백오프로 모든 레인을 멈추는 최대 시간 (초)
+GEMINI_BACKOFF_MAX_SECONDS = float(os.environ.get('GEMINI_BACKOFF_MAX_SECONDS', 60.0))
+# 사용자 요청이 슬롯을 기다릴 수 있는 최대 시간 (초). 넘으면 기다리지 않고 바로 할당량 오류
+INTERACTIVE_MAX_WAIT_SECONDS = float(os.environ.get('GEMINI_INTERACTIVE_MAX_WAIT_SECONDS', 5.0))
+
+_QUOTA_ERROR_NAMES = ('ResourceExhausted', 'TooManyRequests', 'QuotaWaitExceeded')
+_QUOTA_ERROR_MARKERS = ('429', 'RESOURCE_EXHAUSTED', 'quota', 'rate limit')
+_RETRY_DELAY_PATTERNS = (
+    re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)'),
+    re.compile(r'retry in ([\d.]+)\s*s', re.IGNORECASE),
+    re.compile(r'retry-after:?\s*([\d.]+)', re.IGNORECASE)
+)
+
+
+class QuotaWaitExceeded(Exception):
+    """사용자 요청이 INTERACTIVE_MAX_WAIT_SECONDS 안에 호출 슬롯을 얻지 못할 때 내는 할당량 오류"""
+
+
+def is_quota_error(error):
+    """429 / RESOURCE_EXHAUSTED 계열 오류인지 (google.api_core 예외 이름 또는 메시지로 판단)"""
+    if type(error).__name__ in _QUOTA_ERROR_NAMES or getattr(error, 'code', None) == 429:
+        return True
+    message = str(error)
+    return any(marker.lower() in message.lower() for marker in _QUOTA_ERROR_MARKERS)
+
+
+def retry_after_seconds(error):
+    """오류에 실린 재시도 대기 힌트(초). 없으면 None"""
+    for attribute in ('retry_after', 'retry_delay'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, (int, float)):
+            return float(value)
+        if hasattr(value, 'total_seconds'):
+            return value.total_seconds()
+    response = getattr(error, 'response', None)
+    header = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+    if header and str(header).replace('.', '', 1).isdigit():
+        return float(header)
+    message = str(error)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class QuotaGovernor:
+    """프로세스 전체 Gemini 호출 속도를 AIMD로 조절하는 제어기
+
+    성공하면 초당 호출 수를 조금씩 올리고(가산 증가), 할당량 오류가 나면 절반으로 줄이고(승산 감소)
+    재시도 힌트만큼 모든 호출을 멈춥니다. 사용자 요청(interactive)은 대기 중인 배치 호출보다 먼저 나갑니다.
+    """
+
+    def __init__(self, initial_rate=GEMINI_INITIAL_RPS, min_rate=GEMINI_MIN_RPS, max_rate=GEMINI_MAX_RPS,
+                 increase_step=0.05, decrease_factor=0.5):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.waiting_interactive = 0
+        self.stats = {lane: {'calls': 0, 'throttled': 0, 'failed': 0, 'wait_seconds': 0.0}
+                      for lane in (INTERACTIVE, BATCH)}
+        self._condition = threading.Condition()
+
+    def _acquire(self, lane):
+        """레인 규칙에 맞는 다음 호출 슬롯까지 기다립니다.
+
+        사용자 요청은 INTERACTIVE_MAX_WAIT_SECONDS 안에 슬롯이 나지 않으면 기다리지 않고 QuotaWaitExceeded를 냅니다.
+        """
+        started = time.monotonic()
+        deadline = started + INTERACTIVE_MAX_WAIT_SECONDS
+        with self._condition:
+            if lane == INTERACTIVE:
+                self.waiting_interactive += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    ready_at = max(self.blocked_until, self.next_slot)
+                    if now >= ready_at and (lane == INTERACTIVE or self.waiting_interactive == 0):
+                        rate = self.rate if lane == INTERACTIVE else self.rate * BATCH_RATE_SHARE
+                        self.next_slot = max(now, self.next_slot) + 1.0 / rate
+                        break
+                    if lane == INTERACTIVE and ready_at > deadline:
+                        raise QuotaWaitExceeded(
+                            f"Gemini 호출 슬롯까지 {ready_at - now:.1f}초 남아 사용자 요청을 바로 거절합니다.")
+                    self._condition.wait(timeout=max(ready_at - now, 0.05))
+            finally:
+                if lane == INTERACTIVE:
+                    self.waiting_interactive -= 1
+                    self._condition.notify_all()
+            self.stats[lane]['wait_seconds'] += time.monotonic() - started
+
+    def _on_success(self, lane):
+        with self._condition:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self.stats[lane]['calls'] += 1
+
+    def _on_throttled(self, lane, error, attempt):
+        hint = retry_after_seconds(error)
+        # 힌트가 없으면 지수 백오프 + 지터. 어느 쪽이든 상한으로 잘라 모든 레인이 오래 멈추지 않도록
+        delay = min(GEMINI_BACKOFF_MAX_SECONDS,
+                    hint if hint is not None else (2 ** attempt) + random.uniform(0, 1))
+        with self._condition:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.stats[lane]['throttled'] += 1
+            self._condition.notify_all()
+        logging.warning(f"🚦 Gemini 할당량 초과 ({lane}): {delay:.1f}초 대기, 속도 {self.rate:.2f}회/초로 낮춤")
+
+    def call(self, fn, *args, lane=BATCH, **kwargs):
+        """fn(*args, **kwargs)를 속도 제한 아래에서 호출합니다. 할당량 오류는 레인별 횟수만큼 재시도 후 그대로 던집니다."""
+        for attempt in range(LANE_MAX_RETRIES[lane] + 1):
+            try:
+                self._acquire(lane)
+            except QuotaWaitExceeded:
+                with self._condition:
+                    self.stats[lane]['failed'] += 1
+                raise
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_quota_error(e) or attempt == LANE_MAX_RETRIES[lane]:
+                    with self._condition:
+                        self.stats[lane]['failed'] += 1
+                    raise
+                self._on_throttled(lane, e, attempt)
+                continue
+            self._on_success(lane)
+            return result
+
+    def summary(self):
+        with self._condition:
+            return {
+                'rate_per_second': round(self.rate, 3),
+                'batch_rate_per_second': round(self.rate * BATCH_RATE_SHARE, 3),
+                'blocked_for_seconds': round(max(0.0, self.blocked_until - time.monotonic()), 2),
+                'waiting_interactive': self.waiting_interactive,
+                'lanes': {lane: {**stats, 'wait_seconds': round(stats['wait_seconds'], 3)}
+                          for lane, stats in self.stats.items()}
+            }
+
+
+# 웹 요청, 학습 파이프라인, 스크래퍼가 함께 쓰는 프로세스 단일 제어기
+gemini_governor = QuotaGovernor()
+
+
+if __name__ == "__main__":
+    class ResourceExhausted(Exception):
+        pass
+
+    calls = {'count': 0}
+
+    def flaky_model_call(prompt):
+        calls['count'] += 1
+        if calls['count'] % 7 == 0:
+            raise ResourceExhausted("429 Quota exceeded. retry_delay { seconds: 1 }")
+        return f"응답: {prompt}"
+
+    governor = QuotaGovernor(initial_rate=20, max_rate=40)
+    batch_threads = [threading.Thread(target=lambda i=i: governor.call(flaky_model_call, f"배치 {i}", lane=BATCH))
+                     for i in range(20)]
+    for thread in batch_threads:
+        thread.start()
+    time.sleep(0.2)
+    started = time.monotonic()
+    print(governor.call(flaky_model_call, "사용자 요청", lane=INTERACTIVE),
+          f"(대기 {time.monotonic() - started:.2f}초)")
+    for thread in batch_threads:
+        thread.join()
+    print(f"📊 {governor.summary()}")
@@ -0,0 +1,223 @@
+import os
+import json
+import atexit
+import math
+import logging
+import socket
+import threading
+import time
+
+REALTIME_METRICS_DIR = os.environ.get('REALTIME_METRICS_DIR', 'realtime_metrics')
+REALTIME_FLUSH_INTERVAL_SECONDS = int(os.environ.get('REALTIME_FLUSH_INTERVAL_SECONDS', 5))
+
+SLOT_SECONDS = 10                       # 링 버퍼 칸 하나의 시간 폭
+RING_SLOTS = 3600 // SLOT_SECONDS       # 1시간치
+WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+PERCENTILES = (50, 90, 99)
+
+# 지연 시간 로그 히스토그램: 칸 경계가 1.25배씩 커져 상대 오차 ±12% 이내
+LATENCY_GROWTH = 1.25
+_LOG_GROWTH = math.log(LATENCY_GROWTH)
+
+
+def _latency_bucket(latency_ms):
+    return max(0, int(math.log(max(latency_ms, 1.0)) / _LOG_GROWTH))
+
+
+def _bucket_value(bucket):
+    """칸의 대표값 (기하 중간값)"""
+    return LATENCY_GROWTH ** (bucket + 0.5)
+
+
+def _new_stats():
+    return {'count': 0, 'length_sum': 0, 'unsafe': 0, 'darkness': {}, 'latency': {}}
+
+
+def _merge_stats(target, source):
+    target['count'] += source['count']
+    target['length_sum'] += source['length_sum']
+    target['unsafe'] += source['unsafe']
+    for level, count in source['darkness'].items():
+        target['darkness'][level] = target['darkness'].get(level, 0) + count
+    for bucket, count in source['latency'].items():
+        target['latency'][bucket] = target['latency'].get(bucket, 0) + count
+
+
+def _percentiles(histogram):
+    total = sum(histogram.values())
+    if not total:
+        return {f"p{p}": None for p in PERCENTILES}
+    result = {}
+    ordered = sorted(histogram.items(), key=lambda pair: int(pair[0]))
+    for p in PERCENTILES:
+        rank, seen = total * p / 100, 0
+        for bucket, count in ordered:
+            seen += count
+            if seen >= rank:
+                result[f"p{p}"] = round(_bucket_value(int(bucket)), 1)
+                break
+    return result
+
+
+class RealtimeMetrics:
+    """최근 1시간 생성 이벤트를 시간 칸 링 버퍼에 톤별로 모으는 워커 로컬 지표"""
+
+    def __init__(self, store_dir=REALTIME_METRICS_DIR, flush_interval=REALTIME_FLUSH_INTERVAL_SECONDS,
+                 worker_id=None):
+        self.store_dir = store_dir
+        self.flush_interval = flush_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        # 칸마다 (칸 번호, 톤별 통계); 칸 번호가 다르면 한 바퀴 돈 낡은 칸이므로 재사용
+        self.ring = [(None, {}) for _ in range(RING_SLOTS)]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher = None
+
+    def start(self):
+        """flush_interval마다 저장하는 백그라운드 스레드를 시작합니다 (종료 시 마지막 저장)."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name=f"realtime-flush-{self.worker_id}",
+                                             daemon=True)
+            self._flusher.start()
+            atexit.register(self.stop)
+        return self
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        if self._flusher is not None and not self._stopped.is_set():
+            self._stopped.set()
+            self._flusher.join()
+            self.flush()
+
+    def record(self, tone, darkness_level, length, latency_ms, is_safe, now=None):
+        """생성 이벤트 1건을 현재 시간 칸에 반영합니다."""
+        slot = int((now or time.time()) // SLOT_SECONDS)
+        with self._lock:
+            position = slot % RING_SLOTS
+            slot_id, by_tone = self.ring[position]
+            if slot_id != slot:
+                by_tone = {}
+                self.ring[position] = (slot, by_tone)
+            stats = by_tone.setdefault(tone or 'unknown', _new_stats())
+            stats['count'] += 1
+            stats['length_sum'] += length or 0
+            stats['unsafe'] += 0 if is_safe else 1
+            level = str(darkness_level)
+            stats['darkness'][level] = stats['darkness'].get(level, 0) + 1
+            bucket = str(_latency_bucket(latency_ms))
+            stats['latency'][bucket] = stats['latency'].get(bucket, 0) + 1
+
+    def snapshot(self, now=None):
+        """유효한(최근 1시간) 칸만 {칸 번호: 톤별 통계}로 복사합니다."""
+        oldest = int((now or time.time()) // SLOT_SECONDS) - RING_SLOTS + 1
+        with self._lock:
+            return {
+                str(slot_id): {tone: {**stats, 'darkness': dict(stats['darkness']), 'latency': dict(stats['latency'])}
+                               for tone, stats in by_tone.items()}
+                for slot_id, by_tone in self.ring
+                if slot_id is not None and slot_id >= oldest and by_tone
+            }
+
+    def flush(self):
+        """이 워커의 스냅샷을 파일로 저장합니다 (임시 파일 → rename). 인코딩은 잠금 밖에서 합니다."""
+        with self._flush_lock:
+            payload = json.dumps({'worker_id': self.worker_id, 'saved_at': time.time(),
+                                  'slots': self.snapshot()}, ensure_ascii=False)
+            try:
+                os.makedirs(self.store_dir, exist_ok=True)
+                path = os.path.join(self.store_dir, f"{self.worker_id}.json")
+                with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                logging.error(f"실시간 지표 저장 실패: {e}")
+
+    @classmethod
+    def load_worker_snapshots(cls, store_dir=REALTIME_METRICS_DIR, now=None):
+        """최근 1시간 안에 저장된 모든 워커 스냅샷을 읽습니다."""
+        now = now or time.time()
+        snapshots = []
+        if not os.path.isdir(store_dir):
+            return snapshots
+        for filename in sorted(os.listdir(store_dir)):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(store_dir, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"실시간 지표 파일 {filename} 로드 실패: {e}")
+                continue
+            if now - data.get('saved_at', 0) <= WINDOWS['1h']:
+                snapshots.append(data)
+        return snapshots
+
+    def aggregate(self, now=None):
+        """모든 워커의 칸을 합쳐 1m/5m/1h 창별 처리량·지연 백분위를 톤별로 계산합니다."""
+        now = now or time.time()
+        self.flush()
+        current_slot = int(now // SLOT_SECONDS)
+        snapshots = self.load_worker_snapshots(self.store_dir, now)
+
+        windows = {}
+        for window_name, seconds in WINDOWS.items():
+            oldest = current_slot - seconds // SLOT_SECONDS + 1
+            totals, by_tone = _new_stats(), {}
+            for data in snapshots:
+                for slot_id, slot_tones in data['slots'].items():
+                    if int(slot_id) < oldest:
+                        continue
+                    for tone, stats in slot_tones.items():
+                        _merge_stats(by_tone.setdefault(tone, _new_stats()), stats)
+                        _merge_stats(totals, stats)
+            windows[window_name] = {
+                'overall': self._describe(totals, seconds),
+                'by_tone': {tone: self._describe(stats, seconds)
+                            for tone, stats in sorted(by_tone.items(), key=lambda pair: -pair[1]['count'])}
+            }
+
+        return {
+            'generated_at': now,
+            'workers': [data['worker_id'] for data in snapshots],
+            'slot_seconds': SLOT_SECONDS,
+            'windows': windows
+        }
+
+    @staticmethod
+    def _describe(stats, seconds):
+        count = stats['count']
+        return {
+            'requests': count,
+            'throughput_per_min': round(count * 60 / seconds, 2),
+            'avg_length': round(stats['length_sum'] / count, 1) if count else None,
+            'unsafe_ratio': round(stats['unsafe'] / count, 3) if count else None,
+            'darkness_levels': stats['darkness'],
+            'latency_ms': _percentiles(stats['latency'])
+        }
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    store_dir = tempfile.mkdtemp(prefix='realtime_')
+    workers = [RealtimeMetrics(store_dir=store_dir, worker_id=f"worker-{i}") for i in range(3)]
+    now = time.time()
+    for i in range(30000):
+        workers[i % 3].record(random.choice(['유머러스하게', '풍자적', 'MZ 반말 톤']),
+                              random.randint(1, 5), random.randint(100, 1000),
+                              random.lognormvariate(7, 0.4), random.random() > 0.05,
+                              now=now - random.uniform(0, 3600))
+    for worker in workers[1:]:
+        worker.flush()
+
+    started = time.perf_counter()
+    report = workers[0].aggregate(now)
+    print(f"⏱️ 워커 {len(report['workers'])}개 집계: {(time.perf_counter() - started) * 1000:.1f}ms")
+    for name, window in report['windows'].items():
+        overall = window['overall']
+        print(f"  {name}: {overall['requests']}건, {overall['throughput_per_min']}/분, 지연 {overall['latency_ms']}")
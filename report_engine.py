@@ -0,0 +1,293 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import partial
+
+from psycopg2.extras import register_default_json
+
+# 같은 테이블 스캔을 공유할 수 있는 집계들을 CTE 하나로 묶은 보고서 쿼리 그룹
+# 각 집계 결과는 json_build_array 행 목록으로 돌려받아 COLUMN_TYPES로 기존 튜플 형태·타입을 복원합니다.
+REPORT_QUERIES = {
+    # 최근 N일 qa_history 한 번 스캔 → 일별/톤별(일자별 톤 포함)/타겟/키워드 트렌드
+    'recent_history': """
+        WITH recent AS MATERIALIZED (
+            SELECT session_id, tone_used, target_subject, keywords, response_length,
+                   CAST(quality_metrics->>'readability_score' AS FLOAT) AS readability_score,
+                   created_at
+            FROM qa_history
+            WHERE created_at >= %(since)s
+        )
+        SELECT
+            (SELECT COALESCE(json_agg(json_build_array(
+                        total_requests, unique_users, avg_response_length, date)
+                        ORDER BY date DESC), '[]'::json)
+             FROM (SELECT COUNT(*) AS total_requests,
+                          COUNT(DISTINCT session_id) AS unique_users,
+                          AVG(response_length) AS avg_response_length,
+                          DATE(created_at) AS date
+                   FROM recent
+                   GROUP BY DATE(created_at)) daily) AS daily_stats,
+            (SELECT COALESCE(json_agg(json_build_array(
+                        tone_used, usage_count, avg_quality, avg_length)
+                        ORDER BY usage_count DESC), '[]'::json)
+             FROM (SELECT tone_used,
+                          COUNT(*) AS usage_count,
+                          AVG(readability_score) AS avg_quality,
+                          AVG(response_length) AS avg_length
+                   FROM recent
+                   WHERE tone_used IS NOT NULL
+                   GROUP BY tone_used) tones) AS tone_stats,
+            (SELECT COALESCE(json_agg(json_build_array(
+                        date, tone_used, usage_count)
+                        ORDER BY date, usage_count DESC), '[]'::json)
+             FROM (SELECT DATE(created_at) AS date,
+                          tone_used,
+                          COUNT(*) AS usage_count
+                   FROM recent
+                   WHERE tone_used IS NOT NULL
+                   GROUP BY DATE(created_at), tone_used) tone_days) AS tone_daily_stats,
+            (SELECT COALESCE(json_agg(json_build_array(
+                        target_subject, frequency, tone_used, avg_length)
+                        ORDER BY frequency DESC), '[]'::json)
+             FROM (SELECT target_subject,
+                          COUNT(*) AS frequency,
+                          tone_used,
+                          AVG(response_length) AS avg_length
+                   FROM recent
+                   WHERE target_subject IS NOT NULL
+                   GROUP BY target_subject, tone_used
+                   ORDER BY frequency DESC
+                   LIMIT 20) targets) AS target_stats,
+            (SELECT COALESCE(json_agg(json_build_array(
+                        keyword, frequency, date)
+                        ORDER BY frequency DESC), '[]'::json)
+             FROM (SELECT unnest(keywords) AS keyword,
+                          COUNT(*) AS frequency,
+                          DATE(created_at) AS date
+                   FROM recent
+                   WHERE keywords IS NOT NULL AND array_length(keywords, 1) > 0
+                   GROUP BY unnest(keywords), DATE(created_at)
+                   ORDER BY frequency DESC
+                   LIMIT 50) trends) AS keyword_trends;
+    """,
+    # 전체 qa_history 한 번 스캔 → 안전성 통계/위험 패턴/세션별 톤 선호도
+    'full_history': """
+        WITH history AS MATERIALIZED (
+            SELECT session_id, tone_used, response_length,
+                   safety_analysis IS NOT NULL AS has_safety_analysis,
+                   CAST(safety_analysis->>'is_safe' AS BOOLEAN) AS is_safe,
+                   safety_analysis->>'safety_message' AS safety_message,
+                   CAST(quality_metrics->>'humor_rating' AS FLOAT) AS humor_rating
+            FROM qa_history
+        )
+        SELECT
+            (SELECT COALESCE(json_agg(json_build_array(
+                        is_safe, count, tone_used, avg_length)
+                        ORDER BY count DESC), '[]'::json)
+             FROM (SELECT is_safe,
+                          COUNT(*) AS count,
+                          tone_used,
+                          AVG(response_length) AS avg_length
+                   FROM history
+                   WHERE has_safety_analysis
+                   GROUP BY is_safe, tone_used) safety) AS safety_stats,
+            (SELECT COALESCE(json_agg(json_build_array(
+                        safety_message, frequency, tone_used)
+                        ORDER BY frequency DESC), '[]'::json)
+             FROM (SELECT safety_message,
+                          COUNT(*) AS frequency,
+                          tone_used
+                   FROM history
+                   WHERE is_safe = false
+                   GROUP BY safety_message, tone_used) risks) AS risk_patterns,
+            (SELECT COALESCE(json_agg(json_build_array(
+                        session_id, tone_used, usage_count, avg_humor_rating)
+                        ORDER BY usage_count DESC), '[]'::json)
+             FROM (SELECT session_id,
+                          tone_used,
+                          COUNT(*) AS usage_count,
+                          AVG(humor_rating) AS avg_humor_rating
+                   FROM history
+                   WHERE session_id IS NOT NULL AND tone_used IS NOT NULL
+                   GROUP BY session_id, tone_used
+                   HAVING COUNT(*) >= 2) preferences) AS user_preferences;
+    """,
+    'technique_stats': """
+        SELECT COALESCE(json_agg(json_build_array(
+                    technique_name, usage_count, avg_confidence, avg_effectiveness, tone_used)
+                    ORDER BY usage_count DESC), '[]'::json) AS technique_stats
+        FROM (SELECT technique_name,
+                     COUNT(*) AS usage_count,
+                     AVG(detection_confidence) AS avg_confidence,
+                     AVG(effectiveness_score) AS avg_effectiveness,
+                     tone_used
+              FROM technique_detection_log
+              GROUP BY technique_name, tone_used) techniques;
+    """,
+    'recent_techniques': """
+        SELECT COALESCE(json_agg(json_build_array(
+                    technique_name, detection_confidence, effectiveness_score,
+                    tone_used, target_subject, user_input, created_at)
+                    ORDER BY detection_created_at DESC), '[]'::json) AS recent_techniques
+        FROM (SELECT tdl.technique_name,
+                     tdl.detection_confidence,
+                     tdl.effectiveness_score,
+                     tdl.tone_used,
+                     tdl.target_subject,
+                     qh.user_input,
+                     qh.created_at,
+                     tdl.created_at AS detection_created_at
+              FROM technique_detection_log tdl
+              JOIN qa_history qh ON tdl.qa_history_id = qh.id
+              WHERE tdl.created_at >= %(technique_since)s
+              ORDER BY tdl.created_at DESC
+              LIMIT 10) recent;
+    """
+}
+
+# json_build_array로 돌아온 값을 기존 커서 결과와 같은 파이썬 타입으로 되돌리는 열별 변환
+# (COUNT → int, 정수/DECIMAL 열의 AVG → Decimal, FLOAT 열의 AVG → float, DATE → date, TIMESTAMP → datetime,
+#  JSONB → 이미 디코딩된 dict/list 그대로)
+def _as_date(value):
+    return date.fromisoformat(value)
+
+
+def _as_datetime(value):
+    return datetime.fromisoformat(value)
+
+
+def _as_decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _as_float(value):
+    return float(value)
+
+
+COLUMN_TYPES = {
+    'daily_stats': (int, int, _as_decimal, _as_date),
+    'tone_stats': (str, int, _as_float, _as_decimal),
+    'tone_daily_stats': (_as_date, str, int),
+    'target_stats': (str, int, str, _as_decimal),
+    'keyword_trends': (str, int, _as_date),
+    'safety_stats': (bool, int, str, _as_decimal),
+    'risk_patterns': (str, int, str),
+    'user_preferences': (str, str, int, _as_float),
+    'technique_stats': (str, int, _as_decimal, _as_decimal, str),
+    'recent_techniques': (str, _as_decimal, _as_decimal, str, str, lambda value: value, _as_datetime)
+}
+# JSON 숫자를 float 대신 Decimal로 읽어 NUMERIC 평균의 자릿수를 잃지 않도록 합니다.
+_decimal_json_loads = partial(json.loads, parse_float=Decimal)
+
+
+def restore_row(column_name, values):
+    """JSON 배열 한 행을 열 타입에 맞춘 튜플로 변환합니다 (NULL은 None 유지)."""
+    converters = COLUMN_TYPES[column_name]
+    return tuple(None if value is None else convert(value) for convert, value in zip(converters, values))
+
+
+# 보고서 섹션별로 결과를 공급하는 쿼리 그룹 (섹션 소요 시간 = 해당 그룹 중 가장 느린 것)
+SECTION_QUERIES = {
+    'usage_patterns': ['recent_history'],
+    'technique_analysis': ['technique_stats', 'recent_techniques'],
+    'safety_analysis': ['full_history'],
+    'preference_analysis': ['full_history', 'recent_history']
+}
+
+
+class ReportQueryEngine:
+    """종합 보고서 쿼리를 하나의 스냅샷에서 병렬 실행하는 엔진"""
+
+    def __init__(self, db, max_workers=None):
+        self.db = db
+        self.max_workers = max_workers or len(REPORT_QUERIES)
+
+    def _execute_query(self, cur, query_name, params):
+        """쿼리 그룹 하나를 실행하고 (결과 컬럼, 소요 시간)을 반환합니다."""
+        started = time.perf_counter()
+        register_default_json(cur, loads=_decimal_json_loads)
+        cur.execute(REPORT_QUERIES[query_name], params)
+        row = cur.fetchone()
+        columns = {
+            description[0]: [restore_row(description[0], values) for values in (row[i] or [])]
+            for i, description in enumerate(cur.description)
+        }
+        return columns, (time.perf_counter() - started) * 1000
+
+    def _execute_in_snapshot(self, conn, query_name, params, snapshot_id):
+        """미리 빌려 둔 다른 연결에서 리더 트랜잭션의 스냅샷을 가져와 쿼리를 실행합니다."""
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;")
+                cur.execute("SET TRANSACTION SNAPSHOT %s;", (snapshot_id,))
+                return self._execute_query(cur, query_name, params)
+
+    def run(self, days=30, technique_days=7):
+        """모든 보고서 쿼리를 일관된 스냅샷에서 동시에 실행합니다."""
+        print(f"⚡ 보고서 쿼리 {len(REPORT_QUERIES)}개 병렬 실행 시작...")
+        started = time.perf_counter()
+        now = datetime.now()
+        params = {
+            'since': now - timedelta(days=days),
+            'technique_since': now - timedelta(days=technique_days)
+        }
+
+        results = {}
+        timings = {}
+        query_names = list(REPORT_QUERIES)
+        # 리더 트랜잭션이 스냅샷을 내보내고, 나머지 쿼리가 끝날 때까지 열어 둡니다.
+        with self.db.get_connection() as leader:
+            with leader.cursor() as cur:
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;")
+                cur.execute("SELECT pg_export_snapshot();")
+                snapshot_id = cur.fetchone()[0]
+
+                # 리더를 쥔 채 추가 연결을 기다리면 동시 보고서끼리 교착되므로, 지금 빈 자리만 빌려
+                # 그만큼만 병렬로 돌리고 나머지 쿼리는 리더 연결에서 차례로 실행합니다.
+                spare_count = min(self.max_workers, len(query_names)) - 1
+                with self.db.get_spare_connections(spare_count) as spares:
+                    offloaded = query_names[1:1 + len(spares)]
+                    with ThreadPoolExecutor(max_workers=max(len(spares), 1)) as executor:
+                        futures = {
+                            name: executor.submit(self._execute_in_snapshot, conn, name, params, snapshot_id)
+                            for name, conn in zip(offloaded, spares)
+                        }
+                        for name in [query_names[0], *query_names[1 + len(spares):]]:
+                            results[name], timings[name] = self._execute_query(cur, name, params)
+                        for name, future in futures.items():
+                            results[name], timings[name] = future.result()
+
+        columns = {}
+        for query_columns in results.values():
+            columns.update(query_columns)
+        timings['total'] = (time.perf_counter() - started) * 1000
+
+        return {
+            'usage_patterns': {
+                'daily_stats': columns['daily_stats'],
+                'tone_stats': columns['tone_stats'],
+                'tone_daily_stats': columns['tone_daily_stats'],
+                'target_stats': columns['target_stats']
+            },
+            'technique_analysis': {
+                'technique_stats': columns['technique_stats'],
+                'recent_techniques': columns['recent_techniques']
+            },
+            'safety_analysis': {
+                'safety_stats': columns['safety_stats'],
+                'risk_patterns': columns['risk_patterns']
+            },
+            'preference_analysis': {
+                'user_preferences': columns['user_preferences'],
+                'keyword_trends': columns['keyword_trends']
+            },
+            'timings_ms': {
+                'queries': {name: round(elapsed, 1) for name, elapsed in timings.items()
+                            if name != 'total'},
+                'sections': {section: round(max(timings[name] for name in names), 1)
+                             for section, names in SECTION_QUERIES.items()},
+                'total': round(timings['total'], 1)
+            }
+        }
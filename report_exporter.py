@@ -0,0 +1,162 @@
+import io
+import gzip
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+try:
+    import zstandard
+except ImportError:  # zstd 압축은 선택 사항
+    zstandard = None
+
+# 이보다 긴 리스트는 한 번에 인코딩하지 않고 행 단위로 흘려 씁니다.
+STREAM_MIN_ROWS = 100
+# 최상위에서 몇 단계 깊이까지의 dict를 섹션으로 보고 나눠 쓸지
+SECTION_DEPTH = 2
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+class ReportJSONEncoder(json.JSONEncoder):
+    """DB 결과에 흔한 Decimal/날짜/집합 타입을 str 폴백 없이 직접 변환하는 인코더"""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj, key=str)
+        if isinstance(obj, bytes):
+            return obj.hex()
+        return str(obj)
+
+
+def _open_output(filename, compression):
+    """압축 방식에 맞는 텍스트 출력 스트림을 엽니다."""
+    if compression is None:
+        return open(filename, 'w', encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(filename, 'wt', encoding='utf-8', compresslevel=GZIP_LEVEL)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd 압축에는 zstandard 패키지가 필요합니다. (pip install zstandard)")
+        raw = open(filename, 'wb')
+        writer = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+    raise ValueError(f"지원하지 않는 압축 방식입니다: {compression}")
+
+
+def _is_row_stream(value):
+    """행 단위로 흘려 쓸 값인지 (긴 리스트 또는 제너레이터 같은 이터레이터)"""
+    if isinstance(value, (list, tuple)):
+        return len(value) >= STREAM_MIN_ROWS
+    return hasattr(value, '__next__')
+
+
+class ReportExporter:
+    """보고서를 섹션/행 단위로 나눠 바로 파일에 쓰는 스트리밍 JSON/NDJSON 내보내기"""
+
+    def __init__(self, compression=None, ndjson=False):
+        self.compression = compression
+        self.ndjson = ndjson
+        # indent 없이 쓰면 json이 C 인코더를 사용합니다.
+        self.encoder = ReportJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def default_extension(self):
+        extension = '.ndjson' if self.ndjson else '.json'
+        return extension + {None: '', 'gzip': '.gz', 'zstd': '.zst'}[self.compression]
+
+    def export(self, report, filename):
+        """report(dict)를 filename에 씁니다. 값으로 제너레이터를 넣으면 그대로 흘려 씁니다."""
+        with _open_output(filename, self.compression) as out:
+            if self.ndjson:
+                self._write_ndjson(out, report, [])
+            else:
+                self._write_json(out, report, 0)
+                out.write('\n')
+        return filename
+
+    def _write_json(self, out, value, depth):
+        encode = self.encoder.encode
+        if isinstance(value, dict) and depth < SECTION_DEPTH:
+            out.write('{')
+            for i, (key, section) in enumerate(value.items()):
+                if i:
+                    out.write(',')
+                out.write(encode(str(key)))
+                out.write(':')
+                self._write_json(out, section, depth + 1)
+            out.write('}')
+        elif _is_row_stream(value):
+            out.write('[')
+            for i, row in enumerate(value):
+                if i:
+                    out.write(',')
+                out.write(encode(row))
+            out.write(']')
+        else:
+            out.write(encode(value))
+
+    def _write_ndjson(self, out, value, path):
+        """섹션 경로마다 한 줄씩, 긴 리스트는 행마다 한 줄씩 씁니다."""
+        encode = self.encoder.encode
+        if isinstance(value, dict) and len(path) < SECTION_DEPTH:
+            nested = {key: section for key, section in value.items()
+                      if isinstance(section, dict) or _is_row_stream(section)}
+            scalars = {key: section for key, section in value.items() if key not in nested}
+            if scalars:
+                out.write(encode({'section': '.'.join(path) or None, 'data': scalars}))
+                out.write('\n')
+            for key, section in nested.items():
+                self._write_ndjson(out, section, path + [str(key)])
+        elif _is_row_stream(value):
+            section = '.'.join(path)
+            for row in value:
+                out.write(encode({'section': section, 'row': row}))
+                out.write('\n')
+        else:
+            out.write(encode({'section': '.'.join(path), 'data': value}))
+            out.write('\n')
+
+
+def read_ndjson(filename):
+    """NDJSON 내보내기 파일을 한 줄씩 읽는 제너레이터 (압축 확장자 자동 인식)"""
+    if filename.endswith('.gz'):
+        f = gzip.open(filename, 'rt', encoding='utf-8')
+    elif filename.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstd 압축 파일을 읽으려면 zstandard 패키지가 필요합니다.")
+        f = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb')),
+                             encoding='utf-8')
+    else:
+        f = open(filename, 'r', encoding='utf-8')
+    with f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time as timer
+
+    rows = [{'id': i, 'score': Decimal('0.85'), 'created_at': datetime.now(), 'text': '조롱 샘플 ' * 20}
+            for i in range(100000)]
+    report = {'metadata': {'generated_at': datetime.now()}, 'learning_data': rows}
+    workdir = tempfile.mkdtemp(prefix='export_')
+
+    started = timer.perf_counter()
+    baseline = os.path.join(workdir, 'baseline.json')
+    with open(baseline, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    print(f"📄 기존 방식: {(timer.perf_counter() - started) * 1000:.0f}ms, {os.path.getsize(baseline):,}B")
+
+    for compression, ndjson in [(None, False), ('gzip', False), ('gzip', True)]:
+        exporter = ReportExporter(compression, ndjson)
+        path = os.path.join(workdir, 'report' + exporter.default_extension())
+        started = timer.perf_counter()
+        exporter.export(report, path)
+        print(f"⚡ {os.path.basename(path)}: {(timer.perf_counter() - started) * 1000:.0f}ms, "
+              f"{os.path.getsize(path):,}B")
@@ -0,0 +1,152 @@
+import os
+import json
+import math
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+SCRAPE_STATE_DB = os.environ.get('SCRAPE_STATE_DB', 'scrape_state.sqlite3')
+SCRAPE_STATE_DIR = os.environ.get('SCRAPE_STATE_DIR', 'scrape_state')
+BLOOM_CAPACITY = int(os.environ.get('SCRAPE_BLOOM_CAPACITY', 200000))
+BLOOM_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """본 적 없는 ID를 디스크 조회 없이 걸러내는 블룸 필터 (음성은 확실, 양성은 확인 필요)"""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item_id):
+        digest = hashlib.blake2b(item_id.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item_id):
+        for position in self._positions(item_id):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item_id):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item_id))
+
+
+class ScrapeStateStore:
+    """소스별 페이지 커서와 이미 본 항목 ID(블룸 필터 + SQLite 정확 집합)를 저장하는 저장소"""
+
+    def __init__(self, db_path=SCRAPE_STATE_DB, state_dir=SCRAPE_STATE_DIR):
+        self.db_path = db_path
+        self.state_dir = state_dir
+        self.blooms = {}
+        self._lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+        self._init_tables()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_tables(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scrape_cursors (
+                    source TEXT PRIMARY KEY,
+                    cursor TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen_items (
+                    source TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    seen_at TEXT NOT NULL,
+                    PRIMARY KEY (source, item_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def cursor(self, source):
+        """저장된 커서 (예: {'high_watermark': created_utc, 'newest_id': ...}). 없으면 빈 dict"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT cursor FROM scrape_cursors WHERE source = ?;", (source,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_cursor(self, source, cursor):
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO scrape_cursors (source, cursor, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at;
+            """, (source, json.dumps(cursor, ensure_ascii=False), datetime.now().isoformat()))
+
+    def _bloom_path(self, source):
+        return os.path.join(self.state_dir, f"{hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]}.bloom")
+
+    def _bloom(self, source):
+        """소스의 블룸 필터. 파일이 없거나 크기 설정이 바뀌었으면 정확 집합에서 다시 만듭니다."""
+        with self._lock:
+            if source in self.blooms:
+                return self.blooms[source]
+            bloom = BloomFilter()
+            try:
+                with open(self._bloom_path(source), 'rb') as f:
+                    bits = bytearray(f.read())
+                if len(bits) == len(bloom.bits):
+                    bloom.bits = bits
+                else:
+                    raise ValueError('bloom size changed')
+            except (OSError, ValueError):
+                with self._connect() as conn:
+                    for (item_id,) in conn.execute("SELECT item_id FROM seen_items WHERE source = ?;", (source,)):
+                        bloom.add(item_id)
+            self.blooms[source] = bloom
+            return bloom
+
+    def filter_new(self, source, item_ids):
+        """처음 보는 ID만 입력 순서대로 반환합니다. 블룸 양성인 ID만 SQLite로 확인합니다."""
+        bloom = self._bloom(source)
+        maybe_seen = [item_id for item_id in item_ids if item_id in bloom]
+        confirmed = set()
+        if maybe_seen:
+            with self._connect() as conn:
+                for start in range(0, len(maybe_seen), 500):
+                    chunk = maybe_seen[start:start + 500]
+                    placeholders = ', '.join('?' * len(chunk))
+                    confirmed.update(item_id for (item_id,) in conn.execute(
+                        f"SELECT item_id FROM seen_items WHERE source = ? AND item_id IN ({placeholders});",
+                        (source, *chunk)))
+        return [item_id for item_id in dict.fromkeys(item_ids) if item_id not in confirmed]
+
+    def mark_seen(self, source, item_ids, cursor=None):
+        """처리를 마친 ID들을 기록하고 (있으면) 커서도 같은 시점에 갱신합니다."""
+        item_ids = list(dict.fromkeys(item_ids))
+        seen_at = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO seen_items (source, item_id, seen_at) VALUES (?, ?, ?);",
+                             [(source, item_id, seen_at) for item_id in item_ids])
+        bloom = self._bloom(source)
+        with self._lock:
+            for item_id in item_ids:
+                bloom.add(item_id)
+            temp_path = f"{self._bloom_path(source)}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(bloom.bits)
+            os.replace(temp_path, self._bloom_path(source))
+        if cursor is not None:
+            self.save_cursor(source, cursor)
+        logging.info(f"📌 {source}: 새 항목 {len(item_ids)}개 기록" + (f", 커서 {cursor}" if cursor else ""))
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    state_dir = tempfile.mkdtemp(prefix='scrape_state_')
+    store = ScrapeStateStore(os.path.join(state_dir, 'state.sqlite3'), state_dir)
+    first_run = ['t3_a', 't3_b', 't3_c']
+    print(f"1회차 새 항목: {store.filter_new('reddit_korea', first_run)}")
+    store.mark_seen('reddit_korea', first_run, cursor={'high_watermark': 1700000300, 'newest_id': 't3_c'})
+
+    reopened = ScrapeStateStore(os.path.join(state_dir, 'state.sqlite3'), state_dir)
+    print(f"2회차 새 항목: {reopened.filter_new('reddit_korea', ['t3_b', 't3_c', 't3_d', 't3_e'])}")
+    print(f"커서: {reopened.cursor('reddit_korea')}")
@@ -0,0 +1,167 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 64))
+_POLL_SECONDS = 0.1
+_END = object()
+
+
+class StageStats:
+    """단계별 처리량과 큐 대기 시간 (입력 대기 = 앞 단계가 느림, 출력 대기 = 뒤 단계가 느림)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.dropped = 0
+        self.wait_in_seconds = 0.0
+        self.wait_out_seconds = 0.0
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    def summary(self):
+        elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        return {
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'dropped': self.dropped,
+            'elapsed_seconds': round(elapsed, 3),
+            'busy_seconds': round(max(0.0, elapsed - self.wait_in_seconds - self.wait_out_seconds), 3),
+            'wait_in_seconds': round(self.wait_in_seconds, 3),
+            'wait_out_seconds': round(self.wait_out_seconds, 3),
+            'throughput_per_second': round(self.items_out / elapsed, 2) if elapsed else 0.0,
+            'error': self.error
+        }
+
+
+class StreamingPipeline:
+    """단계마다 스레드 하나를 두고 크기 제한 큐로 연결하는 파이프라인 (큐가 차면 앞 단계가 기다림)
+
+    첫 단계는 인자 없이 호출해 이터러블을 받고, 이후 단계는 앞 단계 출력 이터레이터를 받아
+    이터러블을 반환합니다. 마지막 단계의 출력만 모아서 run()이 돌려줍니다.
+    """
+
+    def __init__(self, queue_size=STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.stages = []
+        self.stats = {}
+        self._stop = threading.Event()
+
+    def add_stage(self, name, transform):
+        self.stages.append((name, transform))
+        self.stats[name] = StageStats(name)
+        return self
+
+    def _get_all(self, inbox, stats):
+        while True:
+            waited = time.perf_counter()
+            while True:
+                try:
+                    item = inbox.get(timeout=_POLL_SECONDS)
+                    break
+                except queue.Empty:
+                    if self._stop.is_set():
+                        stats.wait_in_seconds += time.perf_counter() - waited
+                        return
+            stats.wait_in_seconds += time.perf_counter() - waited
+            if item is _END:
+                return
+            stats.items_in += 1
+            yield item
+
+    def _put(self, outbox, item, stats):
+        waited = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                outbox.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        stats.wait_out_seconds += time.perf_counter() - waited
+
+    def _run_stage(self, name, transform, inbox, outbox, results):
+        stats = self.stats[name]
+        stats.started = time.perf_counter()
+        try:
+            inputs = self._get_all(inbox, stats) if inbox is not None else None
+            outputs = transform(inputs) if inputs is not None else transform()
+            for output in outputs:
+                stats.items_out += 1
+                if outbox is None:
+                    results.append(output)
+                else:
+                    self._put(outbox, output, stats)
+                if self._stop.is_set():
+                    break
+            # 단계가 입력을 다 읽지 않고 끝났으면 나머지를 비워 앞 단계가 막히지 않도록
+            if inputs is not None:
+                for _ in inputs:
+                    stats.dropped += 1
+        except Exception as e:
+            stats.error = str(e)
+            logging.error(f"스트리밍 단계 '{name}' 실패: {str(e)}")
+            self._stop.set()
+        finally:
+            if outbox is not None:
+                self._put(outbox, _END, stats)
+            stats.finished = time.perf_counter()
+
+    def run(self):
+        """모든 단계를 동시에 실행하고 마지막 단계의 출력 목록을 반환합니다."""
+        self._stop.clear()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages[1:]]
+        results = []
+        threads = []
+        for index, (name, transform) in enumerate(self.stages):
+            inbox = queues[index - 1] if index > 0 else None
+            outbox = queues[index] if index < len(queues) else None
+            thread = threading.Thread(target=self._run_stage, args=(name, transform, inbox, outbox, results),
+                                      name=f"stage-{name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return results
+
+    @property
+    def failed(self):
+        return any(stats.error for stats in self.stats.values())
+
+    def metrics(self):
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+
+if __name__ == "__main__":
+    def produce():
+        for number in range(200):
+            time.sleep(0.001)
+            yield number
+
+    def slow_square(numbers):
+        for number in numbers:
+            time.sleep(0.002)
+            yield number * number
+
+    def chunked_sum(values, size=50):
+        chunk = []
+        for value in values:
+            chunk.append(value)
+            if len(chunk) == size:
+                yield sum(chunk)
+                chunk = []
+        if chunk:
+            yield sum(chunk)
+
+    pipeline = (StreamingPipeline(queue_size=8)
+                .add_stage('produce', produce)
+                .add_stage('square', slow_square)
+                .add_stage('save', chunked_sum))
+    started = time.perf_counter()
+    outputs = pipeline.run()
+    print(f"✅ 결과 {outputs} (합계 {sum(outputs)}), {time.perf_counter() - started:.2f}초")
+    for name, summary in pipeline.metrics().items():
+        print(f"  • {name}: {summary}")
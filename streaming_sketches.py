@@ -0,0 +1,382 @@
+import os
+import json
+import atexit
+import logging
+import math
+import base64
+import hashlib
+import socket
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+
+SKETCH_STORE_DIR = os.environ.get('SKETCH_STORE_DIR', 'sketch_store')
+SKETCH_FLUSH_INTERVAL_SECONDS = int(os.environ.get('SKETCH_FLUSH_INTERVAL_SECONDS', 60))
+SKETCH_RETENTION_DAYS = 30
+
+HLL_PRECISION = 14          # 레지스터 16384개, 표준 오차 약 0.8%
+CMS_WIDTH = 2048            # 오차 상한 ≈ 전체 건수 × e / 2048
+CMS_DEPTH = 4
+HEAVY_HITTER_CAPACITY = 50
+
+
+def _hash64(value):
+    return int.from_bytes(
+        hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """고유 세션 수를 고정 메모리로 근사하는 HyperLogLog (레지스터 max 병합 가능)"""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+
+    def add(self, value):
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("정밀도가 다른 HyperLogLog는 병합할 수 없습니다.")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # 소규모 구간은 선형 카운팅이 더 정확합니다.
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def copy(self):
+        return HyperLogLog(self.precision, self.registers)
+
+    def to_dict(self):
+        return {'precision': self.precision,
+                'registers': base64.b64encode(bytes(self.registers)).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['precision'], base64.b64decode(data['registers']))
+
+
+class CountMinSketch:
+    """빈도를 과대 추정만 하는 Count-Min 스케치 + 상위 K개 후보(heavy hitters)"""
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, capacity=HEAVY_HITTER_CAPACITY,
+                 rows=None, heavy_hitters=None, total=0):
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.rows = rows or [array('Q', bytes(8 * width)) for _ in range(depth)]
+        self.heavy_hitters = heavy_hitters or {}
+        self.total = total
+
+    def _indexes(self, item):
+        # 두 해시의 선형 결합으로 depth개 행의 위치를 만듭니다 (Kirsch–Mitzenmacher).
+        digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        indexes = self._indexes(item)
+        for row, index in zip(self.rows, indexes):
+            row[index] += count
+        self.total += count
+        self._offer(item, min(row[index] for row, index in zip(self.rows, indexes)))
+
+    def estimate(self, item):
+        return min(row[index] for row, index in zip(self.rows, self._indexes(item)))
+
+    def _offer(self, item, estimate):
+        if item in self.heavy_hitters or len(self.heavy_hitters) < self.capacity:
+            self.heavy_hitters[item] = estimate
+            return
+        weakest = min(self.heavy_hitters, key=self.heavy_hitters.get)
+        if estimate > self.heavy_hitters[weakest]:
+            del self.heavy_hitters[weakest]
+            self.heavy_hitters[item] = estimate
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("크기가 다른 Count-Min 스케치는 병합할 수 없습니다.")
+        for row, other_row in zip(self.rows, other.rows):
+            for i, value in enumerate(other_row):
+                if value:
+                    row[i] += value
+        self.total += other.total
+        # 병합된 카운터로 양쪽 후보를 다시 추정해 상위 K개만 남깁니다.
+        candidates = set(self.heavy_hitters) | set(other.heavy_hitters)
+        ranked = sorted(((self.estimate(item), item) for item in candidates), reverse=True)
+        self.heavy_hitters = {item: estimate for estimate, item in ranked[:self.capacity]}
+        return self
+
+    def copy(self):
+        return CountMinSketch(self.width, self.depth, self.capacity, [array('Q', row) for row in self.rows],
+                              dict(self.heavy_hitters), self.total)
+
+    def top(self, n=10):
+        return sorted(self.heavy_hitters.items(), key=lambda pair: pair[1], reverse=True)[:n]
+
+    def to_dict(self):
+        return {
+            'width': self.width, 'depth': self.depth, 'capacity': self.capacity, 'total': self.total,
+            'rows': [base64.b64encode(row.tobytes()).decode('ascii') for row in self.rows],
+            'heavy_hitters': self.heavy_hitters
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        rows = []
+        for encoded in data['rows']:
+            row = array('Q')
+            row.frombytes(base64.b64decode(encoded))
+            rows.append(row)
+        return cls(data['width'], data['depth'], data['capacity'], rows,
+                   dict(data['heavy_hitters']), data['total'])
+
+
+class StreamingSketches:
+    """생성 경로에서 갱신되는 일자별 스케치 묶음 (워커별 파일로 주기적 저장, 읽을 때 병합)
+
+    저장은 start()로 띄운 백그라운드 스레드가 flush_interval마다 하므로 record()는 메모리만 갱신합니다.
+    """
+
+    def __init__(self, store_dir=SKETCH_STORE_DIR, flush_interval=SKETCH_FLUSH_INTERVAL_SECONDS,
+                 retention_days=SKETCH_RETENTION_DAYS, worker_id=None):
+        self.store_dir = store_dir
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.days = {}
+        self.last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # 마지막 저장 이후 바뀐 날짜만 다시 인코딩하고 나머지는 이전 인코딩을 재사용합니다.
+        self._dirty_days = set()
+        self._encoded_days = {}
+        self._stopped = threading.Event()
+        self._flusher = None
+
+    def start(self):
+        """flush_interval마다 저장하는 백그라운드 스레드를 시작합니다 (종료 시 마지막 저장)."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name=f"sketch-flush-{self.worker_id}",
+                                             daemon=True)
+            self._flusher.start()
+            atexit.register(self.stop)
+        return self
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        if self._flusher is not None and not self._stopped.is_set():
+            self._stopped.set()
+            self._flusher.join()
+            self.flush()
+
+    def _day_sketches(self, day):
+        sketches = self.days.get(day)
+        if sketches is None:
+            sketches = self.days[day] = {
+                'sessions': HyperLogLog(), 'tone_sessions': {},
+                'keywords': CountMinSketch(), 'targets': CountMinSketch()
+            }
+        return sketches
+
+    def record(self, session_id, tone=None, keywords=None, target=None, when=None):
+        """생성 요청 1건을 스케치에 반영합니다."""
+        day = (when or datetime.now()).date().isoformat()
+        with self._lock:
+            sketches = self._day_sketches(day)
+            if session_id:
+                sketches['sessions'].add(session_id)
+                if tone:
+                    sketches['tone_sessions'].setdefault(tone, HyperLogLog()).add(session_id)
+            for keyword in keywords or []:
+                sketches['keywords'].add(keyword)
+            if target:
+                sketches['targets'].add(target)
+            self._dirty_days.add(day)
+
+    def _prune(self):
+        oldest = (datetime.now() - timedelta(days=self.retention_days)).date().isoformat()
+        for day in [day for day in self.days if day < oldest]:
+            del self.days[day]
+            self._encoded_days.pop(day, None)
+            self._dirty_days.discard(day)
+
+    @staticmethod
+    def _day_to_dict(sketches):
+        return {
+            'sessions': sketches['sessions'].to_dict(),
+            'tone_sessions': {tone: hll.to_dict() for tone, hll in sketches['tone_sessions'].items()},
+            'keywords': sketches['keywords'].to_dict(),
+            'targets': sketches['targets'].to_dict()
+        }
+
+    @staticmethod
+    def _copy_day(sketches):
+        return {
+            'sessions': sketches['sessions'].copy(),
+            'tone_sessions': {tone: hll.copy() for tone, hll in sketches['tone_sessions'].items()},
+            'keywords': sketches['keywords'].copy(),
+            'targets': sketches['targets'].copy()
+        }
+
+    def to_dict(self):
+        return {day: self._day_to_dict(sketches) for day, sketches in self.days.items()}
+
+    @staticmethod
+    def _days_from_dict(data):
+        return {
+            day: {
+                'sessions': HyperLogLog.from_dict(sketches['sessions']),
+                'tone_sessions': {tone: HyperLogLog.from_dict(hll)
+                                  for tone, hll in sketches['tone_sessions'].items()},
+                'keywords': CountMinSketch.from_dict(sketches['keywords']),
+                'targets': CountMinSketch.from_dict(sketches['targets'])
+            }
+            for day, sketches in data.items()
+        }
+
+    def flush(self):
+        """이 워커의 스케치를 파일로 저장합니다 (임시 파일 → rename으로 원자적 교체).
+
+        기록 잠금 안에서는 바뀐 날짜의 복사본만 뜨고, 인코딩과 파일 쓰기는 잠금 밖에서 합니다.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._prune()
+                changed = {day: self._copy_day(self.days[day]) for day in self._dirty_days}
+                self._dirty_days.clear()
+                self.last_flush = time.monotonic()
+            for day, sketches in changed.items():
+                self._encoded_days[day] = self._day_to_dict(sketches)
+            payload = json.dumps({'worker_id': self.worker_id, 'saved_at': datetime.now().isoformat(),
+                                  'days': dict(self._encoded_days)}, ensure_ascii=False)
+            try:
+                os.makedirs(self.store_dir, exist_ok=True)
+                path = os.path.join(self.store_dir, f"{self.worker_id}.json")
+                with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                logging.error(f"스케치 저장 실패: {e}")
+
+    def merge(self, other_days):
+        """다른 워커의 일자별 스케치를 이 묶음에 병합합니다."""
+        for day, sketches in other_days.items():
+            mine = self.days.get(day)
+            if mine is None:
+                self.days[day] = sketches
+                continue
+            mine['sessions'].merge(sketches['sessions'])
+            for tone, hll in sketches['tone_sessions'].items():
+                if tone in mine['tone_sessions']:
+                    mine['tone_sessions'][tone].merge(hll)
+                else:
+                    mine['tone_sessions'][tone] = hll
+            mine['keywords'].merge(sketches['keywords'])
+            mine['targets'].merge(sketches['targets'])
+        return self
+
+    @classmethod
+    def load_merged(cls, store_dir=SKETCH_STORE_DIR, skip_worker_id=None):
+        """모든 워커의 저장 파일을 읽어 하나의 스케치 묶음으로 병합합니다."""
+        merged = cls(store_dir=store_dir, worker_id='merged')
+        if not os.path.isdir(store_dir):
+            return merged
+        for filename in sorted(os.listdir(store_dir)):
+            if not filename.endswith('.json') or filename == f"{skip_worker_id}.json":
+                continue
+            try:
+                with open(os.path.join(store_dir, filename), 'r', encoding='utf-8') as f:
+                    merged.merge(cls._days_from_dict(json.load(f)['days']))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ 스케치 파일 {filename} 로드 실패: {e}")
+        return merged
+
+    def merged_view(self):
+        """다른 워커의 저장 파일에 이 워커의 메모리 상태를 더한 병합본 (저장을 강제하지 않음)"""
+        merged = self.load_merged(self.store_dir, skip_worker_id=self.worker_id)
+        with self._lock:
+            own = {day: self._copy_day(sketches) for day, sketches in self.days.items()}
+        return merged.merge(own)
+
+    def _window(self, days):
+        oldest = (datetime.now() - timedelta(days=days - 1)).date().isoformat()
+        return [sketches for day, sketches in sorted(self.days.items()) if day >= oldest]
+
+    def unique_sessions(self, days=30, tone=None):
+        """최근 N일 고유 세션 수 근사치 (일자별 HLL의 합집합)"""
+        union = HyperLogLog()
+        for sketches in self._window(days):
+            hll = sketches['tone_sessions'].get(tone) if tone else sketches['sessions']
+            if hll is not None:
+                union.merge(hll)
+        return union.count()
+
+    def daily_unique_sessions(self, days=30):
+        oldest = (datetime.now() - timedelta(days=days - 1)).date().isoformat()
+        return [
+            {'date': day, 'unique_users': sketches['sessions'].count(),
+             'by_tone': {tone: hll.count() for tone, hll in sketches['tone_sessions'].items()}}
+            for day, sketches in sorted(self.days.items(), reverse=True) if day >= oldest
+        ]
+
+    def _top(self, field, days, n):
+        combined = CountMinSketch()
+        for sketches in self._window(days):
+            combined.merge(sketches[field])
+        return [{'item': item, 'estimated_count': count} for item, count in combined.top(n)]
+
+    def top_keywords(self, days=30, n=20):
+        return self._top('keywords', days, n)
+
+    def top_targets(self, days=30, n=20):
+        return self._top('targets', days, n)
+
+    def summary(self, days=30, n=20):
+        """분석 보고서용 근사 통계 요약"""
+        return {
+            'unique_users': self.unique_sessions(days),
+            'daily_unique_users': self.daily_unique_sessions(days),
+            'top_keywords': self.top_keywords(days, n),
+            'top_targets': self.top_targets(days, n)
+        }
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    store_dir = tempfile.mkdtemp(prefix='sketches_')
+    workers = [StreamingSketches(store_dir=store_dir, worker_id=f"worker-{i}") for i in range(2)]
+    tones = ['유머러스하게', '풍자적', 'MZ 반말 톤']
+    keywords = [f"키워드{i}" for i in range(500)]
+
+    started = time.perf_counter()
+    for i in range(20000):
+        worker = workers[i % 2]
+        worker.record(f"session-{random.randint(0, 4999)}", random.choice(tones),
+                      [keywords[min(int(random.expovariate(0.05)), 499)]], f"대상{random.randint(0, 30)}")
+    for worker in workers:
+        worker.flush()
+    print(f"⏱️ 20,000건 기록: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    merged = StreamingSketches.load_merged(store_dir)
+    print(f"👥 고유 세션 근사치: {merged.unique_sessions()} (실제 최대 5000)")
+    print(f"🔥 상위 키워드: {merged.top_keywords(n=5)}")
@@ -0,0 +1,173 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_fetcher import CachedHttpFetcher, TokenBucket
+
+
+class StandInServer:
+    """로컬 대역 서버: 응답 순서(responses)를 차례로 돌려주고 받은 요청 헤더를 기록합니다."""
+
+    def __init__(self):
+        self.body = json.dumps({'title': '서울 월세 실화?'}, ensure_ascii=False).encode('utf-8')
+        self.etag = '"v1"'
+        self.responses = []
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((time.monotonic(), dict(self.headers)))
+                status, headers = server.responses.pop(0) if server.responses else (None, {})
+                if status is None:
+                    status = 304 if self.headers.get('If-None-Match') == server.etag else 200
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('ETag', server.etag)
+                if status == 304:
+                    self.end_headers()
+                    return
+                payload = server.body if status == 200 else b'{}'
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/r/korea.json"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
+
+
+@pytest.fixture
+def make_fetcher(tmp_path):
+    fetchers = []
+
+    def make(url, rate_limit=100, **kwargs):
+        fetcher = CachedHttpFetcher({'stand_in': {'api_endpoint': url, 'rate_limit': rate_limit}},
+                                    cache_dir=str(tmp_path / 'http_cache'), **kwargs)
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_etag_revalidation_serves_cached_body_on_304(server, make_fetcher):
+    fetcher = make_fetcher(server.url)
+
+    first = fetcher.fetch(server.url)
+    second = fetcher.fetch(server.url)
+
+    assert first.status_code == 200 and not first.from_cache
+    assert second.status_code == 200 and second.from_cache
+    assert second.json() == {'title': '서울 월세 실화?'}
+    assert 'If-None-Match' not in server.requests[0][1]
+    assert server.requests[1][1]['If-None-Match'] == server.etag
+    assert fetcher.stats['not_modified'] == 1
+
+
+def test_changed_etag_refreshes_cache(server, make_fetcher):
+    fetcher = make_fetcher(server.url)
+    fetcher.fetch(server.url)
+
+    server.etag = '"v2"'
+    server.body = json.dumps({'title': '집값 언제 내려가냐'}, ensure_ascii=False).encode('utf-8')
+    changed = fetcher.fetch(server.url)
+    revalidated = fetcher.fetch(server.url)
+
+    assert not changed.from_cache and changed.json() == {'title': '집값 언제 내려가냐'}
+    assert revalidated.from_cache and revalidated.json() == {'title': '집값 언제 내려가냐'}
+
+
+def test_token_bucket_paces_requests_per_host(server, make_fetcher):
+    fetcher = make_fetcher(server.url, rate_limit=5)
+
+    for _ in range(8):
+        fetcher.fetch(server.url)
+
+    # 버킷 용량(5)만큼은 바로 나가고, 그 뒤로는 초당 5개(0.2초 간격)로 나갑니다.
+    sent = [at for at, _ in server.requests]
+    assert sent[4] - sent[0] < 0.15
+    assert min(later - earlier for earlier, later in zip(sent[4:], sent[5:])) >= 0.15
+    assert fetcher.stats['rate_limit_wait_seconds'] >= 0.5
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    assert bucket.acquire() == 0.0
+    started = time.monotonic()
+    waited = bucket.acquire()
+
+    assert waited == pytest.approx(0.1, abs=0.05)
+    assert time.monotonic() - started >= 0.09
+
+
+def test_retries_server_errors_with_backoff(server, make_fetcher):
+    server.responses = [(503, {}), (502, {})]
+    fetcher = make_fetcher(server.url, max_retries=3, backoff_seconds=0.05)
+
+    result = fetcher.fetch(server.url)
+
+    assert result.status_code == 200
+    assert len(server.requests) == 3
+    assert fetcher.stats['retries'] == 2
+    sent = [at for at, _ in server.requests]
+    # 두 번째 대기는 첫 번째의 두 배 구간(0.05~0.1초)에서 지터가 붙습니다.
+    assert sent[1] - sent[0] >= 0.02
+    assert sent[2] - sent[1] >= 0.045
+
+
+def test_retry_after_header_is_honoured(server, make_fetcher):
+    server.responses = [(429, {'Retry-After': '0.3'})]
+    fetcher = make_fetcher(server.url, max_retries=2, backoff_seconds=0.01)
+
+    result = fetcher.fetch(server.url)
+
+    assert result.status_code == 200
+    sent = [at for at, _ in server.requests]
+    assert sent[1] - sent[0] >= 0.28
+    assert fetcher.stats['backoff_seconds'] == pytest.approx(0.3)
+
+
+def test_gives_up_after_max_retries(server, make_fetcher):
+    server.responses = [(500, {})] * 5
+    fetcher = make_fetcher(server.url, max_retries=2, backoff_seconds=0.01)
+
+    result = fetcher.fetch(server.url)
+
+    assert result.status_code == 500
+    assert len(server.requests) == 3
+    assert fetcher.stats['retries'] == 2
+
+
+def test_connection_errors_are_retried_then_raised(server, make_fetcher):
+    url = server.url
+    server.close()
+    fetcher = make_fetcher(url, max_retries=2, backoff_seconds=0.01)
+
+    with pytest.raises(requests.ConnectionError):
+        fetcher.fetch(url)
+
+    assert fetcher.stats['requests'] == 3
+    assert fetcher.stats['retries'] == 2